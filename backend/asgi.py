@@ -0,0 +1,11 @@
+# coding=utf-8
+# ASGI entry point of the server, run for example with an ASGI server like uvicorn:
+#   uvicorn asgi:asgi_app --host 0.0.0.0 --port 5000
+# Under an ASGI server, the coroutine routes (/async/tasks/...) run on the event loop of the server and share the
+# asyncio MongoDB client of that loop (see src.util.clients.getAsyncClient), while the regular routes are executed in a
+# thread pool.
+from asgiref.wsgi import WsgiToAsgi
+
+from wsgi import app
+
+asgi_app = WsgiToAsgi(app)
@@ -0,0 +1,65 @@
+# coding=utf-8
+"""Benchmark of the response encoding: compares the JSON providers (the default json module and orjson, see
+src.util.jsonprovider) and the content codings (gzip at several levels and, if the brotli package is installed, br, see
+src.util.compression) on the populated task lists of users with 5, 50 and 500 tasks shaped like src/static/data/dummy.json.
+
+run from the backend folder with
+    python -m benchmarks.bench_responses
+"""
+import gzip
+import json
+import timeit
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from src.util.jsonprovider import OrjsonProvider, orjson
+from src.util.compression import brotli
+from src.util.serializer import bsonToJson
+from benchmarks.bench_serializer import loadDocuments
+
+
+def payload(size: int):
+    """Build the JSON response body of GET /tasks/ofuser/<id> for a user with the given number of tasks."""
+    documents = loadDocuments()
+    return [bsonToJson(documents[i % len(documents)]) for i in range(size)]
+
+
+def measure(function, number: int):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    app = Flask('bench')
+    providers = {'default': DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers['orjson'] = OrjsonProvider(app)
+    else:
+        print('orjson is not installed (pip install orjson), skipping it')
+
+    codings = {f'gzip level {level}': (lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0)) for level in [1, 6, 9]}
+    if brotli is not None:
+        for quality in [1, 4, 11]:
+            codings[f'br quality {quality}'] = lambda data, quality=quality: brotli.compress(data, quality=quality)
+    else:
+        print('brotli is not installed (pip install brotli), skipping it')
+
+    for size in [5, 50, 500]:
+        tasks = payload(size)
+        number = max(10, 5000 // size)
+        print(f'\n{size} tasks')
+
+        with app.app_context():
+            bodies = {name: provider.response(tasks).get_data() for name, provider in providers.items()}
+            for name, provider in providers.items():
+                assert json.loads(bodies[name]) == tasks, f'{name} output differs'
+                print(f'  {name + " provider":<22} {measure(lambda: provider.response(tasks), number):10.1f} us  {len(bodies[name]):8d} bytes')
+
+        body = bodies['default']
+        for name, coding in codings.items():
+            compressed = coding(body)
+            print(f'  {name:<22} {measure(lambda: coding(body), number):10.1f} us  {len(compressed):8d} bytes ({len(compressed) / len(body):.0%})')
+
+
+if __name__ == '__main__':
+    main()
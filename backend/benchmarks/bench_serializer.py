@@ -0,0 +1,64 @@
+# coding=utf-8
+"""Benchmark of the BSON to JSON conversion of DAO.to_json: compares the former json_util dumps/loads round trip with the
+direct conversion of src.util.serializer on documents shaped like the populated tasks of src/static/data/dummy.json.
+
+run from the backend folder with
+    python -m benchmarks.bench_serializer
+"""
+import json
+import timeit
+from datetime import datetime
+
+from bson import json_util
+from bson.objectid import ObjectId
+
+from src.util.serializer import bsonToJson
+
+
+def loadDocuments():
+    """Build one populated task document per task of the dummy data, as returned by the database.
+
+    returns:
+        [dict] -- list of task documents
+    """
+    with open('./src/static/data/dummy.json', 'r') as f:
+        dummydata = json.load(f)
+
+    documents = []
+    for userdata in dummydata:
+        for taskdata in userdata['tasks']:
+            documents.append({
+                '_id': ObjectId(),
+                'title': taskdata['title'],
+                'description': taskdata['description'],
+                'startdate': datetime.utcnow(),
+                'categories': [],
+                'video': {'_id': ObjectId(), 'url': taskdata['url']},
+                'todos': [{'_id': ObjectId(), 'description': todo, 'done': False} for todo in taskdata['todos']]
+            })
+    return documents
+
+
+def roundtrip(data):
+    return json.loads(json_util.dumps(data))
+
+
+def main(number: int = 2000):
+    documents = loadDocuments()
+
+    # equivalence
+    for document in documents:
+        assert bsonToJson(document) == roundtrip(document), f'outputs differ for {document}'
+    print(f'equivalent output for {len(documents)} documents')
+
+    # speed
+    before = min(timeit.repeat(lambda: [roundtrip(d) for d in documents], number=number, repeat=5))
+    after = min(timeit.repeat(lambda: [bsonToJson(d) for d in documents], number=number, repeat=5))
+    perdoc = 1e6 / (number * len(documents))
+    print(f'json_util dumps/loads: {before * perdoc:8.2f} us/document')
+    print(f'bsonToJson:            {after * perdoc:8.2f} us/document')
+    print(f'speedup:               {before / after:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+# coding=utf-8
+"""Load test of the REST API: seeds users x tasks x todos shaped like src/static/data/dummy.json, drives the most important
+endpoints and reports the latency percentiles (p50/p95/p99) and the throughput of each of them. The results can be saved as a
+baseline and later runs can be checked against it, such that a regression fails the check (exit code 1).
+
+By default the application runs in-process (via the flask test client) on an in-memory stand-in of MongoDB (requires the
+mongomock package, see requirements.pip). Alternatively, it runs in-process on a real MongoDB (--mongo URL, which writes into
+the edutask database of that server) or drives a running server over HTTP (--url, e.g. a gunicorn started with gunicorn.conf.py).
+As the stand-in answers without any network round trip, --latency delays each of its operations to compare the number of round
+trips of the endpoints.
+
+run from the backend folder with e.g.
+    python -m benchmarks.loadtest --users 50 --tasks 5 --todos 4 --requests 200
+    python -m benchmarks.loadtest --latency 1
+    python -m benchmarks.loadtest --save-baseline
+    python -m benchmarks.loadtest --check
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+# operations of the in-memory stand-in, each of which is a round trip to a real MongoDB
+ROUND_TRIPS = ['find', 'find_one', 'aggregate', 'insert_one', 'insert_many', 'update_one', 'update_many', 'delete_one', 'delete_many',
+               'find_one_and_update', 'bulk_write', 'count_documents']
+
+
+class InProcessClient:
+    """Drives the flask application of main.py in this process."""
+
+    def __init__(self):
+        from main import create_app
+        self.client = create_app().test_client()
+
+    def request(self, method: str, path: str, form: dict = None):
+        response = self.client.open(path, method=method, data=form)
+        return response.status_code, response.get_data()
+
+
+class HttpClient:
+    """Drives a running server over HTTP."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip('/')
+
+    def request(self, method: str, path: str, form: dict = None):
+        data = urllib.parse.urlencode(form, doseq=True).encode() if form is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method)
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+def useInMemoryMongo():
+    """Register an in-memory stand-in of MongoDB as the client of the process (see src.util.clients), on which all collections
+    already exist (mongomock does not support collection validators).
+    """
+    try:
+        import mongomock
+    except ImportError:
+        sys.exit('The in-memory MongoDB requires the mongomock package (pip install -r requirements.pip), or use --mongo or --url')
+    from src.util import clients
+
+    client = mongomock.MongoClient()
+    for filename in os.listdir('./src/static/validators'):
+        client.edutask.create_collection(os.path.splitext(filename)[0])
+    clients.clients[clients.getMongoUrl()] = client
+
+
+def simulateLatency(latency: float):
+    """Delay every operation of the in-memory stand-in by the given number of milliseconds, mimicking the network round trip to
+    a MongoDB server, which the stand-in lacks. Operations which mongomock performs within another one (e.g., the find of a
+    $lookup) are not delayed.
+    """
+    from mongomock.collection import Collection
+    local = threading.local()
+
+    def delayed(method):
+        def wrapper(*args, **kwargs):
+            if getattr(local, 'active', False):
+                return method(*args, **kwargs)
+            local.active = True
+            try:
+                time.sleep(latency / 1000)
+                return method(*args, **kwargs)
+            finally:
+                local.active = False
+        return wrapper
+
+    for name in ROUND_TRIPS:
+        setattr(Collection, name, delayed(getattr(Collection, name)))
+
+
+def call(client, method: str, path: str, form: dict = None):
+    status, body = client.request(method, path, form)
+    if status >= 400:
+        raise RuntimeError(f'{method} {path} failed with status {status}: {body[:200]}')
+    return json.loads(body)
+
+
+def seed(client, users: int, tasks: int, todos: int):
+    """Create users with tasks and todos via the API, cycling through the tasks of the dummy data.
+
+    returns:
+        users -- list of the ids of the created users
+        tasks -- list of the ids of the created tasks
+        todos -- list of the ids of the created todos
+    """
+    with open('./src/static/data/dummy.json', 'r') as f:
+        dummytasks = [task for user in json.load(f) for task in user['tasks']]
+
+    run = int(time.time() * 1000)
+    userids, taskids, todoids = [], [], []
+    for i in range(users):
+        user = call(client, 'POST', '/users/create', {'firstName': 'Load', 'lastName': f'Test {i}', 'email': f'loadtest.{run}.{i}@example.com'})
+        userid = user['_id']['$oid']
+        for j in range(tasks):
+            dummytask = dummytasks[(i * tasks + j) % len(dummytasks)]
+            descriptions = (dummytask['todos'] * todos)[:todos]
+            call(client, 'POST', '/tasks/create', {
+                'userid': userid,
+                'title': f"{dummytask['title']} ({i}.{j})",
+                'description': dummytask['description'],
+                'url': dummytask['url'],
+                'todos': descriptions
+            })
+        for task in call(client, 'GET', f'/tasks/ofuser/{userid}'):
+            taskids.append(task['_id']['$oid'])
+            todoids.extend(todo['_id']['$oid'] for todo in task['todos'])
+        userids.append(userid)
+    return userids, taskids, todoids
+
+
+def scenarios(users: list, tasks: list, todos: list):
+    """The driven endpoints, each given as a function mapping the number of a request to its method, path and form data. The
+    deletion comes last, as it consumes the seeded users.
+    """
+    return [
+        ('GET /users/all', lambda i: ('GET', '/users/all', None)),
+        ('GET /tasks/ofuser/<id>', lambda i: ('GET', f'/tasks/ofuser/{users[i % len(users)]}', None)),
+        ('GET /tasks/byid/<id>', lambda i: ('GET', f'/tasks/byid/{tasks[i % len(tasks)]}', None)),
+        ('GET /todos/byid/<id>', lambda i: ('GET', f'/todos/byid/{todos[i % len(todos)]}', None)),
+        ('POST /tasks/create', lambda i: ('POST', '/tasks/create', {
+            'userid': users[i % len(users)], 'title': f'Load test task {time.time_ns()}', 'description': 'Created by the load test',
+            'url': 'dQw4w9WgXcQ', 'todos': ['Watch video']})),
+        ('DELETE /users/<id>', lambda i: ('DELETE', f'/users/{users[i]}', None))
+    ]
+
+
+def percentile(values: list, p: float):
+    """Nearest-rank percentile of a sorted list."""
+    return values[max(0, min(len(values) - 1, int(round(p / 100 * len(values) + 0.5)) - 1))]
+
+
+def drive(client, request, count: int, concurrency: int, warmup: int):
+    """Send count requests (after warmup unrecorded ones) with the given number of threads.
+
+    returns:
+        result -- dict containing the number of requests and errors, the latency percentiles in ms and the throughput
+    """
+    def send(i):
+        method, path, form = request(i)
+        start = time.perf_counter()
+        status, _ = client.request(method, path, form)
+        return time.perf_counter() - start, status
+
+    for i in range(warmup):
+        send(i)
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(send, range(warmup, warmup + count)))
+    else:
+        outcomes = [send(i) for i in range(warmup, warmup + count)]
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency * 1000 for latency, _ in outcomes)
+    return {
+        'requests': count,
+        'errors': sum(1 for _, status in outcomes if status >= 400),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'throughput_rps': round(count / elapsed, 1)
+    }
+
+
+def check(results: dict, baseline: dict, tolerance: float):
+    """Compare the results to a baseline: a scenario regresses if its p50 or p95 latency grew, or its throughput shrank, by more
+    than the tolerance (relative), or if it has more errors.
+
+    returns:
+        regressions -- list of messages, empty if there is no regression
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for key in ['p50_ms', 'p95_ms']:
+            if result[key] > base[key] * (1 + tolerance):
+                regressions.append(f'{name}: {key} {result[key]} > {base[key]} (+{tolerance:.0%})')
+        if result['throughput_rps'] < base['throughput_rps'] / (1 + tolerance):
+            regressions.append(f"{name}: throughput_rps {result['throughput_rps']} < {base['throughput_rps']} (-{tolerance:.0%})")
+        if result['errors'] > base['errors']:
+            regressions.append(f"{name}: errors {result['errors']} > {base['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--mongo', help='URL of a MongoDB to run the application on in-process (default: in-memory stand-in)')
+    parser.add_argument('--url', help='URL of a running server to drive over HTTP instead of running the application in-process')
+    parser.add_argument('--users', type=int, default=50, help='number of seeded users')
+    parser.add_argument('--tasks', type=int, default=5, help='number of tasks per user')
+    parser.add_argument('--todos', type=int, default=4, help='number of todos per task')
+    parser.add_argument('--requests', type=int, default=200, help='number of requests per endpoint (the deletion is limited to the number of users)')
+    parser.add_argument('--warmup', type=int, default=10, help='number of unrecorded requests per endpoint')
+    parser.add_argument('--latency', type=float, default=0, help='simulated round trip in ms of every operation of the in-memory stand-in (default: 0)')
+    parser.add_argument('--concurrency', type=int, default=1, help='number of threads sending requests')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline JSON file (default: benchmarks/baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='save the results as the new baseline')
+    parser.add_argument('--check', action='store_true', help='fail if the results regressed compared to the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='relative tolerance of the check (default: 0.5, i.e. 50%%)')
+    args = parser.parse_args()
+
+    if args.url is not None:
+        client = HttpClient(args.url)
+        backend = 'http'
+    else:
+        if args.mongo is not None:
+            os.environ['MONGO_URL'] = args.mongo
+            backend = 'mongod'
+        else:
+            useInMemoryMongo()
+            backend = 'inmemory'
+            if args.latency > 0:
+                simulateLatency(args.latency)
+                backend += f' ({args.latency:g} ms latency)'
+        client = InProcessClient()
+
+    config = {'backend': backend, 'users': args.users, 'tasks': args.tasks, 'todos': args.todos, 'requests': args.requests, 'concurrency': args.concurrency}
+    print(f'Seeding {args.users} users x {args.tasks} tasks x {args.todos} todos')
+    users, tasks, todos = seed(client, args.users, args.tasks, args.todos)
+
+    results = {}
+    print(f"{'endpoint':<25} {'requests':>8} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    for name, request in scenarios(users, tasks, todos):
+        count = args.requests
+        warmup = args.warmup
+        if name.startswith('DELETE'):
+            # every seeded user can be deleted only once
+            warmup = 0
+            count = min(count, len(users))
+        result = drive(client, request, count, args.concurrency, warmup)
+        results[name] = result
+        print(f"{name:<25} {result['requests']:>8} {result['errors']:>6} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['throughput_rps']:>9.1f}")
+
+    report = {'config': config, 'results': results}
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f'Saved the baseline to {args.baseline}')
+
+    if args.check:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        if baseline['config'] != config:
+            sys.exit(f"The baseline was measured with a different configuration ({baseline['config']}), run with the same options or save a new baseline")
+        regressions = check(results, baseline['results'], args.tolerance)
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        if len(regressions) > 0:
+            sys.exit(1)
+        print('No regression compared to the baseline')
+
+
+if __name__ == '__main__':
+    main()
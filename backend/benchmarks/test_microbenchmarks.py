@@ -0,0 +1,106 @@
+# coding=utf-8
+"""Microbenchmarks of the hot paths of the data access objects and controllers, each measured on a mocked collection (which
+isolates the cost of the application code) and on the in-memory stand-in mongomock (which adds query evaluation). No services
+are required. They are not part of the test suite (see testpaths in pytest.ini), run them from the backend folder with
+    python -m pytest benchmarks --no-cov
+"""
+import json
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from bson.objectid import ObjectId
+
+from src.util.dao import DAO
+from src.util.clients import getGeneration
+from src.controllers.taskcontroller import TaskController
+from src.controllers.usercontroller import UserController
+
+USERS = 1000
+TODOS = 10
+
+
+def collections(backend: str):
+    """Create the task, video, todo and user collections of the given backend ('mock' or 'mongomock') and fill them with one
+    task (with a video and TODOS todos) and USERS users.
+
+    returns:
+        collections -- dict mapping each collection name to the collection
+        task -- the task document
+        user -- the last user document
+    """
+    with open('./src/static/data/dummy.json', 'r') as f:
+        dummytask = json.load(f)[0]['tasks'][0]
+
+    video = {'_id': ObjectId(), 'url': dummytask['url']}
+    todos = [{'_id': ObjectId(), 'description': f'{description} {i}', 'done': False} for i, description in enumerate(dummytask['todos'] * TODOS)][:TODOS]
+    task = {'_id': ObjectId(), 'title': dummytask['title'], 'description': dummytask['description'], 'startdate': datetime(2023, 1, 1),
+            'categories': [], 'video': video['_id'], 'todos': [todo['_id'] for todo in todos]}
+    users = [{'_id': ObjectId(), 'firstName': 'Jane', 'lastName': f'Doe {i}', 'email': f'jane.doe{i}@gmail.com', 'tasks': []} for i in range(USERS)]
+
+    if backend == 'mock':
+        result = {name: MagicMock() for name in ['task', 'video', 'todo', 'user']}
+        result['task'].find.return_value = [task]
+        result['task'].find_one.return_value = task
+        result['video'].find.return_value = [video]
+        result['todo'].find.return_value = todos
+        result['user'].find.return_value = users[-1:]
+    else:
+        mongomock = pytest.importorskip('mongomock')
+        database = mongomock.MongoClient().edutask
+        result = {name: database[name] for name in ['task', 'video', 'todo', 'user']}
+        result['task'].insert_one(task)
+        result['video'].insert_one(video)
+        result['todo'].insert_many(todos)
+        result['user'].insert_many(users)
+        result['user'].create_index('email', unique=True)
+    return result, task, users[-1]
+
+
+def dao(collection_name: str, collection):
+    """Create a data access object which is bound to the given collection without any database operation."""
+    obj = DAO(collection_name=collection_name)
+    obj._collection = collection
+    obj.generation = getGeneration()
+    return obj
+
+
+@pytest.fixture(params=['mock', 'mongomock'])
+def backend(request):
+    return collections(request.param)
+
+
+def test_to_json(benchmark):
+    _, task, _ = collections('mock')
+    populated = dict(task, video={'_id': ObjectId(), 'url': 'U_gANjtv28g'},
+                     todos=[{'_id': todo, 'description': 'Watch video', 'done': False} for todo in task['todos']])
+    taskdao = DAO(collection_name='task')
+
+    result = benchmark(taskdao.to_json, populated)
+    assert result['_id'] == {'$oid': str(task['_id'])}
+
+def test_find_with_toid(benchmark, backend):
+    colls, task, _ = backend
+    tododao = dao('todo', colls['todo'])
+    ids = [{'$oid': str(id)} for id in task['todos']]
+
+    # convert_ids replaces the filter values, hence every round builds a new filter
+    result = benchmark(lambda: tododao.find(filter={'_id': list(ids)}, toid=['_id']))
+    assert len(result) == TODOS
+
+def test_populate_task(benchmark, backend):
+    colls, task, _ = backend
+    controller = TaskController(tasks_dao=dao('task', colls['task']), videos_dao=dao('video', colls['video']),
+                                todos_dao=dao('todo', colls['todo']), users_dao=dao('user', colls['user']))
+    reference = DAO(collection_name='task').to_json(task)
+
+    # populate_task replaces the references of the given task, hence every round populates a new copy
+    result = benchmark(lambda: controller.populate_task(dict(reference)))
+    assert len(result['todos']) == TODOS
+
+def test_get_user_by_email(benchmark, backend):
+    colls, _, user = backend
+    controller = UserController(dao=dao('user', colls['user']))
+
+    result = benchmark(controller.get_user_by_email, user['email'])
+    assert result['email'] == user['email']
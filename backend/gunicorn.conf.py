@@ -0,0 +1,49 @@
+# coding=utf-8
+# configuration of the production server (see https://docs.gunicorn.org/en/stable/settings.html), each value can be
+# overridden by the environment variable given in the comment. Send SIGHUP to the master process for a graceful reload,
+# which starts new workers with the reloaded code and configuration before stopping the old ones. Send SIGUSR2 to a worker
+# to reload its settings (see src.util.settings) without restarting it.
+import multiprocessing
+import os
+
+from src.util.clients import reinitAfterFork
+from src.util.settings import reloadSettings, installReloadSignal
+
+# address to bind to (FLASK_BIND_IP, PORT)
+bind = f"{os.environ.get('FLASK_BIND_IP', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
+
+# number of worker processes (GUNICORN_WORKERS) and threads per worker (GUNICORN_THREADS)
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+
+# seconds to keep idle client connections open (GUNICORN_KEEPALIVE)
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# seconds after which a silent worker is restarted (GUNICORN_TIMEOUT), and seconds a worker may finish its requests
+# when stopped or reloaded (GUNICORN_GRACEFUL_TIMEOUT)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# recycle each worker after a (jittered) number of requests to bound memory growth (GUNICORN_MAX_REQUESTS, 0 disables it)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# load the application once in the master process and fork the workers afterwards; this is safe, since the application
+# does not connect to the database before the first request
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # every worker must use its own MongoDB clients (os.register_at_fork already covers this, the explicit call makes it independent of the fork mechanism)
+    reinitAfterFork()
+    # the settings may have been loaded by the master process before a reload (SIGHUP) changed the environment
+    reloadSettings()
+
+
+def post_worker_init(worker):
+    # gunicorn resets the signal handlers of a worker after the fork, hence the handler is installed here
+    installReloadSignal()
@@ -1,56 +1,141 @@
 # coding=utf-8
-import os, json
-from dotenv import dotenv_values, load_dotenv
+import os, json, time
+from dotenv import load_dotenv
 load_dotenv()
 
-from flask import Flask, jsonify
-from flask_cors import CORS, cross_origin
-
-from src.blueprints.userblueprint import user_blueprint
-from src.blueprints.taskblueprint import task_blueprint
-from src.blueprints.todoblueprint import todo_blueprint
-
-from src.controllers.usercontroller import UserController
-from src.controllers.taskcontroller import TaskController
-from src.util.daos import getDao
-
-
-app = Flask('todoapp')
-
-# configure CORS for cross-origin resource sharing (between the frontend and backend)
-cors = CORS(app)
-app.config['CORS_HEADERS'] = 'Content-Type'
-
-# register blueprints
-app.register_blueprint(blueprint=user_blueprint, url_prefix='/users')
-app.register_blueprint(blueprint=task_blueprint, url_prefix='/tasks')
-app.register_blueprint(blueprint=todo_blueprint, url_prefix='/todos')
+from src.util.timing import timed, printTimings
+
+with timed('import modules'):
+    from flask import Flask, current_app, jsonify, request, g
+    from flask_cors import CORS, cross_origin
+
+    from src.blueprints.userblueprint import user_blueprint
+    from src.blueprints.taskblueprint import task_blueprint
+    from src.blueprints.todoblueprint import todo_blueprint
+    from src.blueprints.asynctaskblueprint import async_task_blueprint
+    from src.blueprints.batchblueprint import batch_blueprint
+
+    from src.util.controllers import getUserController, getTaskController
+    from src.util.daos import getDao
+    from src.util.indexes import ensureIndexes, getIndexedCollections
+    from src.util.settings import getSettings, installReloadSignal
+    from src.util.clients import getPoolStats, connectInBackground
+    from src.util.timing import getTimings
+    from src.util.metrics import observeRequest, renderMetrics
+    from src.util.commands import startQueries, finishQueries
+    from src.util.jsonprovider import getJsonProvider
+    from src.util.compression import compressResponse
+
+
+def create_app():
+    """Create and configure the flask application. No database connection is established here: the data access objects
+    connect on their first use, such that the application can be created before a server forks its worker processes
+    (see wsgi.py).
+
+    returns:
+        app -- the flask application
+    """
+    with timed('create app'):
+        app = Flask('todoapp')
+
+        # serialize the responses with the configured JSON backend
+        app.json = getJsonProvider(app)
+
+        # configure CORS for cross-origin resource sharing (between the frontend and backend)
+        CORS(app)
+        app.config['CORS_HEADERS'] = 'Content-Type'
+
+        # register blueprints
+        app.register_blueprint(blueprint=user_blueprint, url_prefix='/users')
+        app.register_blueprint(blueprint=task_blueprint, url_prefix='/tasks')
+        app.register_blueprint(blueprint=todo_blueprint, url_prefix='/todos')
+        app.register_blueprint(blueprint=async_task_blueprint, url_prefix='/async/tasks')
+        app.register_blueprint(blueprint=batch_blueprint, url_prefix='/batch')
+
+        # register the methods of this module
+        app.add_url_rule('/', view_func=ping)
+        app.add_url_rule('/ready', view_func=ready)
+        app.add_url_rule('/metrics', view_func=metrics)
+        app.add_url_rule('/populate', view_func=populate, methods=['POST'])
+        app.cli.command('ensure-indexes')(ensure_indexes)
+        app.cli.command('rebuild-task-view')(rebuild_task_view)
+
+        # measure the duration (and, if enabled, count the database commands) of every request
+        app.before_request(start_request)
+        app.after_request(observe_request)
+        # compress the responses (registered last, such that it runs before the request is observed)
+        app.after_request(compressResponse)
+
+    printTimings()
+    return app
 
 
 # simple heartbeat method to check if the server is running
-@app.route('/')
 @cross_origin()
 def ping():
-    VERSION = dotenv_values('.env').get('VERSION')
-    return jsonify({'version': VERSION}), 200
+    return jsonify({'version': getSettings().version}), 200
+
+# readiness check that reports the state of the MongoDB connection pools of this process from the cached monitoring events,
+# hence it never waits for the database; ready once a heartbeat of a server succeeded and the latest heartbeat of no server failed
+@cross_origin()
+def ready():
+    pools = getPoolStats()
+    heartbeats = [server['heartbeat'] for server in pools.values()]
+    if 'succeeded' not in heartbeats:
+        # the client connects lazily, hence no server is monitored before the first database operation
+        connectInBackground()
+    isready = 'succeeded' in heartbeats and 'failed' not in heartbeats
+    return jsonify({
+        'ready': isready,
+        'version': getSettings().version,
+        'pid': os.getpid(),
+        'mongo': pools,
+        'startup': getTimings()
+    }), 200 if isready else 503
+
+# metrics of this process in the Prometheus text format (request latencies per route, data access object operations per
+# collection, connection pools and cache), see src.util.metrics
+def metrics():
+    return current_app.response_class(renderMetrics(), mimetype='text/plain; version=0.0.4')
+
+def start_request():
+    g.requeststart = time.perf_counter()
+    if getSettings().mongo_command_monitoring:
+        startQueries()
+
+def observe_request(response):
+    if 'requeststart' in g:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        observeRequest(request.method, route, response.status_code, time.perf_counter() - g.requeststart)
+        count = finishQueries(route)
+        if count is not None:
+            response.headers['X-Query-Count'] = str(count)
+    return response
 
 # simple population method that adds initial data to the database
-@app.route('/populate', methods=['POST'])
 @cross_origin()
 def populate():
-    usercontroller = UserController(getDao(collection_name='user'))
-    taskcontroller = TaskController(tasks_dao=getDao(collection_name='task'), videos_dao=getDao(collection_name='video'), todos_dao=getDao(collection_name='todo'), users_dao=getDao(collection_name='user'))
+    usercontroller = getUserController()
+    taskcontroller = getTaskController()
 
-    response = {'users': []}
+    response = {'users': [], 'errors': []}
     with open(f'./src/static/data/dummy.json', 'r') as f:
         dummydata = json.load(f)
 
-        for userdata in dummydata:
-            user = usercontroller.create({
-                'firstName': userdata['firstName'], 
-                'lastName': userdata['lastName'], 
-                'email': userdata['email']
-            })
+        # create all users at once
+        result = usercontroller.create_many([{
+            'firstName': userdata['firstName'], 
+            'lastName': userdata['lastName'], 
+            'email': userdata['email']
+        } for userdata in dummydata], ordered=False)
+        users = iter(result['created'])
+        failed = [error['index'] for error in result['errors']]
+        response['errors'] = result['errors']
+
+        for index, userdata in enumerate(dummydata):
+            if index in failed:
+                continue
+            user = next(users)
 
             for taskdata in userdata['tasks']:
                 taskcontroller.create({
@@ -65,8 +150,23 @@ def populate():
 
     return jsonify(response), 200
 
-# main loop
+# command line interface method that creates all indexes (run with 'flask --app main ensure-indexes')
+def ensure_indexes():
+    for collection_name in getIndexedCollections():
+        names = ensureIndexes(getDao(collection_name=collection_name))
+        print(f'{collection_name}: {names}')
+
+# command line interface method that rebuilds the read model of the tasks (run with 'flask --app main rebuild-task-view')
+def rebuild_task_view():
+    if not getSettings().task_view:
+        print('The task read model is disabled, set TASK_VIEW=true to enable it')
+        return
+    print(f'task_view: {getTaskController().rebuild_views()} tasks')
+
+# main loop (development server, see wsgi.py for production); the flask command line finds the application factory itself
 if __name__ == '__main__':
+    app = create_app()
+
     # print the URL map, which lists all API endpoints of this flask server
     print(app.url_map)
 
@@ -76,5 +176,6 @@ if __name__ == '__main__':
         host = os.environ.get('FLASK_BIND_IP')
 
     port = os.environ.get('PORT')
+    installReloadSignal()
     app.run(host, port)
     
\ No newline at end of file
@@ -0,0 +1,36 @@
+from flask import Blueprint, jsonify, abort, request
+
+from src.controllers.asynctaskcontroller import AsyncTaskController
+from src.util.daos import getAsyncDao
+from src.util.projection import parseFields
+from src.util.settings import getSettings
+
+async def getController():
+    return AsyncTaskController(tasks_dao=await getAsyncDao(collection_name='task'), videos_dao=await getAsyncDao(collection_name='video'), todos_dao=await getAsyncDao(collection_name='todo'), users_dao=await getAsyncDao(collection_name='user'), lookup=getSettings().task_lookup)
+
+# instantiate the flask blueprint, which offers the read routes of the task blueprint as coroutines
+# (best served by an ASGI server, see asgi.py; CORS is handled app-wide, since cross_origin does not support coroutines)
+async_task_blueprint = Blueprint('async_task_blueprint', __name__)
+
+# get a specific task
+@async_task_blueprint.route('/byid/<id>', methods=['GET'])
+async def get(id):
+    try:
+        controller = await getController()
+        task = await controller.get(id, projection=parseFields(request.args.get('fields')))
+        return jsonify(task), 200
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
+
+# obtain all tasks associated to a specific user
+@async_task_blueprint.route('/ofuser/<id>', methods=['GET'])
+async def get_tasks_of_user(id):
+    try:
+        controller = await getController()
+        lookup = request.args.get('lookup', 'false').lower() == 'true'
+        tasks = await controller.get_tasks_of_user(id, lookup=lookup, projection=parseFields(request.args.get('fields')))
+        return jsonify(tasks), 200
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
@@ -0,0 +1,33 @@
+from flask import Blueprint, jsonify, abort, request
+from flask_cors import cross_origin
+
+from werkzeug.local import LocalProxy
+
+from src.util.controllers import getBatchController
+# the controller is created on its first use
+controller = LocalProxy(getBatchController)
+
+# instantiate the flask blueprint
+batch_blueprint = Blueprint('batch_blueprint', __name__)
+
+# execute an ordered list of operations on users, tasks and todos in one request and respond with the result of each operation
+@batch_blueprint.route('', methods=['POST'])
+@cross_origin()
+def batch():
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        abort(400, 'The body must be a JSON object')
+
+    try:
+        transaction = body.get('transaction', False) is True
+        results = controller.execute(body.get('operations'), transaction=transaction)
+        # the causes of failed operations are logged instead of returned
+        for result in results:
+            if 'error' in result:
+                print(result.pop('error'))
+        return jsonify({'results': results}), 200
+    except ValueError as e:
+        abort(400, str(e))
+    except Exception as e:
+        print(f'{e.__class__.__name__}: {e}')
+        abort(500, 'Unknown server error')
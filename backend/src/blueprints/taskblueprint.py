@@ -4,15 +4,19 @@ from flask_cors import cross_origin
 from pymongo.errors import WriteError
 import json
 
-#import src.controllers.taskcontroller as controller
-from src.controllers.taskcontroller import TaskController
-from src.util.daos import getDao
-controller = TaskController(tasks_dao=getDao(collection_name='task'), videos_dao=getDao(collection_name='video'), todos_dao=getDao(collection_name='todo'), users_dao=getDao(collection_name='user'))
+from werkzeug.exceptions import HTTPException
+from werkzeug.local import LocalProxy
+
+from src.util.controllers import getTaskController
+from src.util.projection import parseFields
+from src.util.etags import conditionalResponse, withVersion
+# the controller is created on its first use
+controller = LocalProxy(getTaskController)
 
 # instantiate the flask blueprint
 task_blueprint = Blueprint('task_blueprint', __name__)
 
-# create a new task
+# create a new task and respond with the new, populated task (or, with ?response=list, with all tasks of the user)
 @task_blueprint.route('/create', methods=['POST'])
 @cross_origin()
 def create():
@@ -24,9 +28,14 @@ def create():
             if key in data and isinstance(data[key], list):
                 data[key] = data[key][0]
 
-        taskid = controller.create(data)
-        tasks = controller.get_tasks_of_user(userid)
-        return jsonify(tasks), 200
+        if request.args.get('response') == 'list':
+            # legacy response, the cost of which grows with the number of tasks of the user
+            controller.create(data)
+            tasks = controller.get_tasks_of_user(userid)
+            return jsonify(tasks), 200
+
+        task = controller.create(data, return_task=True)
+        return jsonify(task), 200
     except WriteError as e:
         abort(400, 'Invalid input data')
     except Exception as e:
@@ -39,17 +48,22 @@ def create():
 def get(id):
     try:
         if request.method == 'GET':
-            task = controller.get(id)
-            return jsonify(task), 200
+            projection = parseFields(request.args.get('fields'))
+            task = controller.get(id, projection=withVersion(projection))
+            return conditionalResponse(task, projection=projection)
         elif request.method == 'PUT':
             data = request.form.to_dict(flat=True)['data']
             data = json.loads(data.replace("'", "\""))
 
-            task = controller.update(id, data)
+            task = controller.update(id, data, return_document=True)
+            if task is None:
+                abort(404, 'Task not found')
             return jsonify(task), 200
         elif request.method == 'DELETE':
             result = controller.delete(id=id)
             return jsonify({"success": result}), 200
+    except HTTPException:
+        raise
     except Exception as e:
         print(f'{e.__class__.__name__}: {e}')
         abort(500, 'Unknown server error')
@@ -59,8 +73,10 @@ def get(id):
 @cross_origin()
 def get_tasks_of_user(id):
     try:
-        tasks = controller.get_tasks_of_user(id)
-        return jsonify(tasks), 200
+        lookup = request.args.get('lookup', 'false').lower() == 'true'
+        projection = parseFields(request.args.get('fields'))
+        tasks = controller.get_tasks_of_user(id, lookup=lookup, projection=withVersion(projection))
+        return conditionalResponse(tasks, projection=projection)
     except Exception as e:
         print(f'{e.__class__.__name__}: {e}')
         abort(500, 'Unknown server error')
\ No newline at end of file
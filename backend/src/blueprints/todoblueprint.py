@@ -5,9 +5,14 @@ import json
 
 from pymongo.errors import WriteError
 
-from src.controllers.todocontroller import TodoController
-from src.util.daos import getDao
-controller = TodoController(todo_dao=getDao(collection_name='todo'), tasks_dao=getDao(collection_name='task'))
+from werkzeug.exceptions import HTTPException
+from werkzeug.local import LocalProxy
+
+from src.util.controllers import getTodoController
+from src.util.projection import parseFields
+from src.util.etags import conditionalResponse, withVersion
+# the controller is created on its first use
+controller = LocalProxy(getTodoController)
 
 # instantiate the flask blueprint
 todo_blueprint = Blueprint('todo_blueprint', __name__)
@@ -33,19 +38,24 @@ def get_todo(id):
     try:
         # get a specific todo
         if request.method == 'GET':
-            todo = controller.get(id)
-            return jsonify(todo), 200
+            projection = parseFields(request.args.get('fields'))
+            todo = controller.get(id, projection=withVersion(projection))
+            return conditionalResponse(todo, projection=projection)
         # update the todo
         elif request.method == 'PUT':
             data = request.form.to_dict(flat=True)['data']
             data = json.loads(data.replace("'", "\""))
 
-            todo = controller.update(id, data)
+            todo = controller.update(id, data, return_document=True)
+            if todo is None:
+                abort(404, 'Todo not found')
             return jsonify(todo), 200
         # delete an existing todo
         elif request.method == 'DELETE':
             controller.delete(id)
             return jsonify({'id': id}), 200
+    except HTTPException:
+        raise
     except Exception as e:
         print(f'{e.__class__.__name__}: {e}')
         abort(500, 'Unknown server error')
\ No newline at end of file
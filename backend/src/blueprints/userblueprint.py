@@ -1,13 +1,18 @@
-from flask import Blueprint, jsonify, abort, request
+from flask import Blueprint, Response, current_app, jsonify, abort, request, stream_with_context
 from flask_cors import cross_origin
 
 from pymongo.errors import WriteError
+from bson.objectid import ObjectId
 
-from src.util.daos import getDao
-from src.controllers.usercontroller import UserController
-from src.controllers.taskcontroller import TaskController
-controller = UserController(getDao(collection_name='user'))
-taskcontroller = TaskController(tasks_dao=getDao(collection_name='task'), videos_dao=getDao(collection_name='video'), todos_dao=getDao(collection_name='todo'), users_dao=getDao(collection_name='user'))
+from werkzeug.exceptions import HTTPException
+from werkzeug.local import LocalProxy
+
+from src.util.controllers import getUserController, getTaskController
+from src.util.projection import parseFields
+from src.util.etags import conditionalResponse, withVersion
+# the controllers are created on their first use
+controller = LocalProxy(getUserController)
+taskcontroller = LocalProxy(getTaskController)
 
 # instantiate the flask blueprint
 user_blueprint = Blueprint('user_blueprint', __name__)
@@ -34,19 +39,24 @@ def get_user(id):
     try:
         # get a specific user
         if request.method == 'GET':
-            user = controller.get(id)
-            return jsonify(user), 200
+            projection = parseFields(request.args.get('fields'))
+            user = controller.get(id, projection=withVersion(projection))
+            return conditionalResponse(user, projection=projection)
         # update the user
         elif request.method == 'PUT':
             data = request.form
-            update_result = controller.update(id, data)
-            user = controller.get(id)
+            user = controller.update(id, data, return_document=True)
+            if user is None:
+                abort(404, 'User not found')
             return jsonify(user), 200
         # delete a user
         elif request.method == 'DELETE':
-            taskcontroller.delete_of_user(id=id)
+            transaction = request.args.get('transaction', 'false').lower() == 'true'
+            deleted = taskcontroller.delete_of_user(id=id, transaction=transaction)
             result = controller.delete(id=id)
-            return jsonify({"success": result}), 200
+            return jsonify({"success": result, "deleted": deleted}), 200
+    except HTTPException:
+        raise
     except Exception as e:
         print(f'{e.__class__.__name__}: {e}')
         abort(500, 'Unknown server error')
@@ -66,9 +76,29 @@ def get_user_by_mail(email):
 @user_blueprint.route('/all', methods=['GET'])
 @cross_origin()
 def get_users():
+    # the pagination parameters are checked before a (streamed) response is started
+    limit = request.args.get('limit', type=int)
+    after = request.args.get('after')
+    if ('limit' in request.args and limit is None) or (limit is not None and limit <= 0):
+        abort(400, 'The limit must be a positive integer')
+    if after is not None and not ObjectId.is_valid(after):
+        abort(400, 'Invalid cursor')
+
     try:
-        users = controller.get_all()
-        return jsonify(users), 200
+        projection = parseFields(request.args.get('fields'))
+
+        # stream all users as newline-delimited JSON
+        if request.args.get('format') == 'ndjson':
+            users = controller.iter_all(after=after, projection=projection)
+            lines = (current_app.json.dumps(user) + '\n' for user in users)
+            return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+        users = controller.get_all(limit=limit, after=after, projection=projection)
+        response = jsonify(users)
+        if limit is not None and len(users) > 0 and len(users) == limit:
+            # the id of the last user serves as cursor to the next page
+            response.headers['X-Next-Cursor'] = users[-1]['_id']['$oid']
+        return response, 200
     except Exception as e:
         print(f'{e.__class__.__name__}: {e}')
         abort(500, 'Unknown server error')
\ No newline at end of file
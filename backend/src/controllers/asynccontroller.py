@@ -0,0 +1,40 @@
+from src.controllers.controller import Controller
+from src.util.asyncdao import AsyncDAO
+
+class AsyncController(Controller):
+    def __init__(self, dao: AsyncDAO):
+        """Instantiate an asynchronous controller, which offers the same methods as Controller as coroutines on top of an
+        asynchronous data access object (see src.util.asyncdao).
+
+        parameters:
+            dao -- asynchronous data access object, which has to grant access to the specific collection of the database
+        """
+        super().__init__(dao=dao)
+
+    async def create(self, data: dict):
+        """Asynchronous variant of Controller.create"""
+        return await self.dao.create(data)
+
+    async def create_many(self, data: list, ordered: bool = True):
+        """Asynchronous variant of Controller.create_many"""
+        return await self.dao.create_many(data, ordered=ordered)
+
+    async def get(self, id: str, projection: dict = None):
+        """Asynchronous variant of Controller.get"""
+        return await self.dao.findOne(id, projection=projection)
+
+    async def get_all(self, limit: int = None, after: str = None, projection: dict = None):
+        """Asynchronous variant of Controller.get_all"""
+        return await self.dao.find(limit=limit, after=after, projection=projection)
+
+    def iter_all(self, after: str = None, projection: dict = None):
+        """Asynchronous variant of Controller.iter_all (returns an asynchronous generator)"""
+        return self.dao.find_iter(after=after, projection=projection)
+
+    async def update(self, id: str, data: dict, return_document: bool = False):
+        """Asynchronous variant of Controller.update"""
+        return await self.dao.update(id=id, update_data=data, return_document=return_document)
+
+    async def delete(self, id: str):
+        """Asynchronous variant of Controller.delete"""
+        return await self.dao.delete(id=id)
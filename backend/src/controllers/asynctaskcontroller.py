@@ -0,0 +1,123 @@
+import asyncio
+
+from bson.objectid import ObjectId
+from pymongo.errors import OperationFailure, WriteError
+
+from src.controllers.taskcontroller import TaskController
+from src.util.asyncdao import AsyncDAO
+
+class AsyncTaskController(TaskController):
+    def __init__(self, tasks_dao: AsyncDAO, videos_dao: AsyncDAO, todos_dao: AsyncDAO, users_dao: AsyncDAO, lookup: bool = False):
+        """Instantiate an asynchronous task controller, which offers the reading methods of TaskController (and the creation of
+        tasks and the deletion of the tasks of a user) as coroutines on top of asynchronous data access objects. Independent
+        database operations (e.g., fetching the video and the todos of a task) are executed concurrently. It does not maintain
+        the task read model, hence the other writing methods are not offered and raise NotImplementedError.
+        """
+        super().__init__(tasks_dao=tasks_dao, videos_dao=videos_dao, todos_dao=todos_dao, users_dao=users_dao, lookup=lookup)
+
+    async def create(self, data: dict):
+        """Asynchronous variant of TaskController.create, which creates the video and the todos of the task concurrently"""
+        uid = self.prepare_task(data)
+
+        video, result = await asyncio.gather(
+            self.videos_dao.create({'url': data['url']}),
+            self.todos_dao.create_many([{'description': todo, 'done': False} for todo in data['todos']]))
+        if len(result['errors']) > 0:
+            error = result['errors'][0]
+            raise WriteError(error['message'], code=error['code'])
+        del data['url']
+        data['video'] = ObjectId(video['_id']['$oid'])
+        data['todos'] = [ObjectId(todoobj['_id']['$oid']) for todoobj in result['created']]
+
+        task = await self.dao.create(data)
+        await self.users_dao.update(uid, {'$push': {'tasks': ObjectId(task['_id']['$oid'])}})
+        return task['_id']['$oid']
+
+    async def get(self, id: str, projection: dict = None):
+        """Asynchronous variant of TaskController.get"""
+        if self.lookup and self.dao.cache is None:
+            try:
+                tasks = await self.find_populated(filter={'_id': ObjectId(id)}, projection=projection)
+                return tasks[0] if len(tasks) > 0 else None
+            except (NotImplementedError, OperationFailure) as e:
+                self.lookup_failed(e)
+
+        task = await self.dao.findOne(id, projection=projection)
+        if task is None:
+            return None
+        return await self.populate_task(task)
+
+    async def get_tasks_of_user(self, id: str, lookup: bool = False, projection: dict = None):
+        """Asynchronous variant of TaskController.get_tasks_of_user"""
+        user = await self.users_dao.findOne(id, projection={'tasks': 1})
+        if lookup:
+            return await self.find_populated(filter={'_id': {'$in': [ObjectId(task['$oid']) for task in user['tasks']]}}, projection=projection)
+
+        tasks = await self.dao.find(filter={'_id': user['tasks']}, toid=['_id'], projection=projection)
+        return await self.populate_tasks(tasks)
+
+    async def populate_task(self, task):
+        """Asynchronous variant of TaskController.populate_task"""
+        return (await self.populate_tasks([task]))[0]
+
+    async def populate_tasks(self, tasks: list):
+        """Asynchronous variant of TaskController.populate_tasks, which fetches the videos and the todos concurrently"""
+        videoids, todoids = self.collect_references(tasks)
+
+        async def nothing():
+            return []
+
+        videos, todos = await asyncio.gather(
+            self.videos_dao.find(filter={'_id': videoids}, toid=['_id']) if len(videoids) > 0 else nothing(),
+            self.todos_dao.find(filter={'_id': todoids}, toid=['_id']) if len(todoids) > 0 else nothing())
+        return self.assign_references(tasks, videos, todos)
+
+    async def find_populated(self, filter: dict, projection: dict = None):
+        """Asynchronous variant of TaskController.find_populated"""
+        return [self.order_todos(task) for task in await self.dao.aggregate(self.populate_pipeline(filter, projection))]
+
+    async def delete_of_user(self, id: str):
+        """Asynchronous variant of TaskController.delete_of_user (without transaction support), which deletes the tasks, videos and todos concurrently"""
+        user = await self.users_dao.findOne(id, projection={'tasks': 1})
+        if user is None or 'tasks' not in user or len(user['tasks']) == 0:
+            return {'tasks': 0, 'videos': 0, 'todos': 0}
+
+        tasks = await self.dao.find(filter={'_id': user['tasks']}, toid=['_id'], projection={'video': 1, 'todos': 1})
+        videos, todos, tasks = await asyncio.gather(
+            self.videos_dao.delete_many([task['video']['$oid'] for task in tasks if 'video' in task]),
+            self.todos_dao.delete_many([todo['$oid'] for task in tasks for todo in task.get('todos', [])]),
+            self.dao.delete_many([task['_id']['$oid'] for task in tasks]))
+        return {'tasks': tasks, 'videos': videos, 'todos': todos}
+
+    def not_offered(self, method: str):
+        return NotImplementedError(f'{method} is not offered asynchronously, use TaskController.{method}')
+
+    def get_all(self, limit: int = None, after: str = None, projection: dict = None):
+        raise self.not_offered('get_all')
+
+    def iter_all(self, after: str = None, projection: dict = None):
+        raise self.not_offered('iter_all')
+
+    def create_many(self, data: list, ordered: bool = True):
+        raise self.not_offered('create_many')
+
+    def update(self, id: str, data: dict, return_document: bool = False):
+        raise self.not_offered('update')
+
+    def delete(self, id: str):
+        raise self.not_offered('delete')
+
+    def bulk_write(self, operations: list, session=None):
+        raise self.not_offered('bulk_write')
+
+    def after_bulk_write(self, operations: list):
+        raise self.not_offered('after_bulk_write')
+
+    def refresh_views(self, ids: list):
+        raise self.not_offered('refresh_views')
+
+    def delete_views(self, ids: list, session=None):
+        raise self.not_offered('delete_views')
+
+    def rebuild_views(self, batch_size: int = 100):
+        raise self.not_offered('rebuild_views')
@@ -0,0 +1,208 @@
+from bson.objectid import ObjectId
+from pymongo.errors import WriteError
+
+from src.controllers.controller import Controller
+from src.controllers.taskcontroller import TaskController
+
+# kinds of operations of a batch
+OPERATIONS = ('create', 'update', 'delete')
+
+class BatchController:
+    def __init__(self, controllers: dict, taskcontroller: TaskController):
+        """Instantiate the batch controller, which executes an ordered list of operations on several collections with as few
+        database operations as possible.
+
+        parameters:
+            controllers -- dict mapping the name of each collection which can be written by a batch (e.g., 'todo') to its controller
+            taskcontroller -- the task controller, which creates tasks and deletes the tasks of deleted users
+        """
+        self.controllers = controllers
+        self.taskcontroller = taskcontroller
+
+    def validate(self, operations: list):
+        """Check the structure of the operations of a batch before any of them is executed.
+
+        parameters:
+            operations -- list of dicts, each containing the kind of operation under the key op ('create', 'update' or 'delete'),
+                the name of the collection under the key collection (e.g., 'todo'), the unique identifier of the object under the
+                key id (update and delete) and the data of the new object (create) or the update (update, update operators except
+                for users) under the key data
+
+        raises:
+            ValueError -- in case an operation is malformed
+        """
+        if not isinstance(operations, list) or len(operations) == 0:
+            raise ValueError('A batch must contain a list of operations')
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict) or operation.get('op') not in OPERATIONS:
+                raise ValueError(f'Operation {index}: op must be one of {", ".join(OPERATIONS)}')
+            if operation.get('collection') not in self.controllers:
+                raise ValueError(f'Operation {index}: collection must be one of {", ".join(self.controllers)}')
+            if operation['op'] != 'delete' and not isinstance(operation.get('data'), dict):
+                raise ValueError(f'Operation {index}: data must be an object')
+            # the update of a user consists of the new values of its fields (see UserController.update), any other of update operators
+            if operation['op'] == 'update' and operation['collection'] != 'user' and (
+                    len(operation['data']) == 0 or not all(key.startswith('$') for key in operation['data'])):
+                raise ValueError(f'Operation {index}: data of an update must consist of update operators (e.g., $set)')
+            if operation['op'] != 'create' and not ObjectId.is_valid(operation.get('id')):
+                raise ValueError(f'Operation {index}: id must be a valid object id')
+
+    def is_bulk(self, operation: dict):
+        """Determine whether an operation can be executed by a bulk write on its collection (see Controller.bulk_write), which is
+        not the case for operations which write to several collections: the creation of a task (and its video and todos), the
+        creation of a todo which is added to a task (data containing a taskid), and the deletion of a user (and its tasks).
+
+        parameters:
+            operation -- the operation (see validate)
+
+        returns:
+            True -- if the operation can be executed by a bulk write
+            False -- if the operation has to be executed by the controller of its collection
+        """
+        if operation['op'] == 'create':
+            return operation['collection'] == 'user' or (operation['collection'] == 'todo' and 'taskid' not in operation['data'])
+        return not (operation['op'] == 'delete' and operation['collection'] == 'user')
+
+    def group(self, operations: list):
+        """Split the operations of a batch into groups which are executed one after the other: consecutive operations on the same
+        collection which can be executed by a bulk write form a group (see is_bulk), every other operation forms its own group.
+
+        parameters:
+            operations -- list of operations (see validate)
+
+        returns:
+            groups -- list of lists of the indexes of the operations
+        """
+        groups = []
+        for index, operation in enumerate(operations):
+            previous = operations[groups[-1][-1]] if len(groups) > 0 else None
+            if previous is not None and self.is_bulk(operation) and self.is_bulk(previous) and operation['collection'] == previous['collection']:
+                groups[-1].append(index)
+            else:
+                groups.append([index])
+        return groups
+
+    def execute(self, operations: list, transaction: bool = False):
+        """Execute the operations of a batch in the given order, each group of operations on the same collection with a single bulk
+        write (see group). The execution stops at the first failure, all following operations are skipped. If transaction is True,
+        the batch is executed within a multi-document transaction, such that either all or no operations take effect (requires a
+        replica set), which is only possible for operations which can be executed by a bulk write (see is_bulk).
+
+        parameters:
+            operations -- list of operations (see validate)
+            transaction -- if True, execute all operations or none of them
+
+        returns:
+            results -- list with the result of each operation, a dict containing the status ('ok', 'error', 'skipped' or, if the
+                transaction is aborted, 'aborted') under the key status, and either the result of the respective controller
+                method (e.g., the created object) under the key result, or the status code and message with which the
+                respective route would have responded under the keys code and message and the cause of the failure under
+                the key error (to be logged, not to be returned to the client)
+
+        raises:
+            ValueError -- in case an operation is malformed or cannot be executed within a transaction
+            Exception -- in case a transaction cannot be committed
+        """
+        self.validate(operations)
+        groups = self.group(operations)
+
+        if not transaction:
+            results = [{'status': 'skipped'} for operation in operations]
+            for indexes in groups:
+                failed = self.execute_group(operations, indexes, results)
+                if failed:
+                    break
+            return results
+
+        for index, operation in enumerate(operations):
+            if not self.is_bulk(operation):
+                raise ValueError(f'Operation {index}: {operation["op"]} of a {operation["collection"]} cannot be executed within a transaction')
+
+        def run(session):
+            # the transaction may be retried, hence every attempt starts with fresh results
+            results = [{'status': 'aborted'} for operation in operations]
+            for indexes in groups:
+                if self.execute_group(operations, indexes, results, session=session):
+                    failure = next(result for result in results if result['status'] == 'error')
+                    raise WriteError(failure['message'], code=failure['code'], details={'results': results})
+            return results
+
+        try:
+            with self.taskcontroller.dao.start_session() as session:
+                results = session.with_transaction(run)
+        except WriteError as e:
+            if e.details is None or 'results' not in e.details:
+                raise
+            # the transaction is aborted, only the failure is reported
+            return [result if result['status'] == 'error' else {'status': 'aborted'} for result in e.details['results']]
+
+        # the dependent objects are maintained once the transaction is committed
+        for indexes in groups:
+            controller = self.controllers[operations[indexes[0]]['collection']]
+            controller.after_bulk_write([operations[index] for index in indexes])
+        return results
+
+    def execute_group(self, operations: list, indexes: list, results: list, session=None):
+        """Execute a group of operations (see group) and store the result of each operation in the list of results.
+
+        parameters:
+            operations -- list of operations (see validate)
+            indexes -- list of the indexes of the operations of the group
+            results -- list of the results of all operations (see execute), which is modified in place
+            session -- optional pymongo.client_session.ClientSession of a transaction
+
+        returns:
+            True -- if an operation of the group failed
+            False -- otherwise
+        """
+        group = [operations[index] for index in indexes]
+        controller = self.controllers[group[0]['collection']]
+
+        if not self.is_bulk(group[0]):
+            try:
+                results[indexes[0]] = {'status': 'ok', 'result': self.execute_one(controller, group[0])}
+                return False
+            except (WriteError, KeyError) as e:
+                results[indexes[0]] = {'status': 'error', 'code': 400, 'message': 'Invalid input data', 'error': f'{e.__class__.__name__}: {e}'}
+            except Exception as e:
+                results[indexes[0]] = {'status': 'error', 'code': 500, 'message': 'Unknown server error', 'error': f'{e.__class__.__name__}: {e}'}
+            return True
+
+        try:
+            written = controller.bulk_write(group, session=session)
+        except Exception as e:
+            if session is not None:
+                # the transaction decides whether to retry or abort
+                raise
+            for index in indexes:
+                results[index] = {'status': 'error', 'code': 500, 'message': 'Unknown server error', 'error': f'{e.__class__.__name__}: {e}'}
+            return True
+
+        for index, result in zip(indexes, written['results']):
+            if result is not None:
+                results[index] = {'status': 'ok', 'result': result}
+        for error in written['errors']:
+            results[indexes[error['index']]] = {'status': 'error', 'code': 400, 'message': 'Invalid input data', 'error': f'WriteError: {error["message"]}'}
+
+        executed = [operation for operation, result in zip(group, written['results']) if result is not None]
+        if session is None and len(executed) > 0:
+            controller.after_bulk_write(executed)
+        return len(written['errors']) > 0
+
+    def execute_one(self, controller: Controller, operation: dict):
+        """Execute an operation which writes to several collections (see is_bulk) with the respective controller method.
+
+        parameters:
+            controller -- the controller of the collection of the operation
+            operation -- the operation (see validate)
+
+        returns:
+            result -- the created task (populated like by TaskController.get) or todo, or the numbers of deleted objects of a user
+        """
+        if operation['op'] == 'create' and operation['collection'] == 'task':
+            return self.taskcontroller.create(dict(operation['data']), return_task=True)
+        if operation['op'] == 'create':
+            return controller.create(dict(operation['data']))
+        deleted = self.taskcontroller.delete_of_user(id=operation['id'])
+        controller.delete(id=operation['id'])
+        return deleted
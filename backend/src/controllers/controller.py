@@ -26,13 +26,34 @@ class Controller:
         except Exception as e:
             raise
 
+    def create_many(self, data: list, ordered: bool = True):
+        """Create several new objects in the database at once and return the newly created objects together with the
+        objects that could not be created.
+
+        parameters:
+            data -- list of dicts, each containing all relevant fields of data according to the validator
+            ordered -- if True, stop at the first object that cannot be created, otherwise create all valid objects
+
+        returns:
+            result -- dict containing the list of created objects under the key 'created' and the list of failures
+                (index, code and message) under the key 'errors'
+
+        raises:
+            Exception -- in case the database operation fails, raise an exception
+        """
+        try:
+            return self.dao.create_many(data, ordered=ordered)
+        except Exception as e:
+            raise
+
     # get a user by id
-    def get(self, id: str):
+    def get(self, id: str, projection: dict = None):
         """Search for an object by id and return the associated database object. The database object will contain
         a unique id, which is accessible at ob['_id']['$oid] in the jsonified form.
 
         parameters:
             id -- the unique identifier of the object
+            projection -- optional MongoDB projection which limits the returned fields (e.g., {'email': 1})
 
         returns:
             user -- if an object associated to the given id can be found
@@ -42,13 +63,18 @@ class Controller:
             Exception -- in case the database operation fails, raise an exception
         """
         try:
-            return self.dao.findOne(id)
+            return self.dao.findOne(id, projection=projection)
         except Exception as e:
             raise
 
-    def get_all(self):
+    def get_all(self, limit: int = None, after: str = None, projection: dict = None):
         """Gathers all object in the respective collection of the database. The database object will contain
         a unique id, which is accessible at ob['_id']['$oid] in the jsonified form.
+
+        parameters:
+            limit -- maximum number of objects to return (the objects are ordered by their id)
+            after -- the unique identifier of the last object of the previous page
+            projection -- optional MongoDB projection which limits the returned fields (e.g., {'email': 1})
         
         returns:
             users -- array of all objects in the respective collection in the database
@@ -57,11 +83,23 @@ class Controller:
             Exception -- in case the database operation fails, raise an exception
         """
         try:
-            return self.dao.find()
+            return self.dao.find(limit=limit, after=after, projection=projection)
         except Exception as e:
             raise
 
-    def update(self, id: str, data: dict):
+    def iter_all(self, after: str = None, projection: dict = None):
+        """Iterate over all objects in the respective collection of the database without loading them into memory at once.
+
+        parameters:
+            after -- the unique identifier of the object after which the iteration starts
+            projection -- optional MongoDB projection which limits the returned fields (e.g., {'email': 1})
+
+        returns:
+            generator -- yields all objects in the respective collection in the database
+        """
+        return self.dao.find_iter(after=after, projection=projection)
+
+    def update(self, id: str, data: dict, return_document: bool = False):
         """Locates an object in the respective collection of the database and updates it with the given data 
         values.
 
@@ -69,20 +107,55 @@ class Controller:
             id -- the unique identifier of the object
             data -- a dict where the top level keys are valid MongoDB update operators (e.g., $set, $push), 
                 and the values of those keys again dicts where the keys are fieldnames and the values the new values.
+            return_document -- if True, return the updated object, obtained in the same round trip as the update
 
         returns: 
             True -- if the update was successful
             False -- if the update failed
+            object -- the updated object (or None if it does not exist) if return_document is True
             
         raises:
             Exception -- in case the database operation fails, raise an exception
         """
         try:
-            update_result = self.dao.update(id=id, update_data=data)
+            update_result = self.dao.update(id=id, update_data=data, return_document=return_document)
             return update_result
         except Exception as e:
             raise
 
+    def bulk_write(self, operations: list, session=None):
+        """Execute several create, update and delete operations on the respective collection of the database with a
+        single database operation. The operations are executed in the given order and the execution stops at the first
+        failure. Dependent objects are not maintained (see after_bulk_write).
+
+        parameters:
+            operations -- list of dicts, each containing the kind of operation under the key op ('create', 'update' or
+                'delete'), the unique identifier of the object under the key id (update and delete) and the data of the
+                new object (create) or the update operation (update, see update) under the key data
+            session -- optional pymongo.client_session.ClientSession (e.g., to write within a transaction)
+
+        returns:
+            result -- dict containing the result of each operation under the key 'results' (the created object, True, or
+                None if the operation failed or was not executed) and the list of failures (index, code and message)
+                under the key 'errors'
+
+        raises:
+            Exception -- in case the database operation fails, raise an exception
+        """
+        try:
+            return self.dao.bulk_write(operations, ordered=True, session=session)
+        except Exception as e:
+            raise
+
+    def after_bulk_write(self, operations: list):
+        """Maintain the objects which depend on the objects written by bulk_write (e.g., a read model). Called with the
+        executed operations once they are committed.
+
+        parameters:
+            operations -- list of the executed operations (see bulk_write)
+        """
+        pass
+
     def delete(self, id: str):
         """Delete an object from the respective collection of the database
 
@@ -1,77 +1,179 @@
 from bson.objectid import ObjectId
 from datetime import datetime
+from pymongo.errors import OperationFailure, WriteError
 
 from src.controllers.controller import Controller
 from src.util.dao import DAO
+from src.util.serializer import jsonToBson
+
+# field of the aggregated tasks which temporarily holds the todos resolved by $lookup (see find_populated)
+LOOKUP_TODOS = '_populated_todos'
+# error codes with which a database rejects an aggregation it does not support (unrecognized pipeline stage, command not supported)
+UNSUPPORTED = (40324, 115)
 
 class TaskController(Controller):
-    def __init__(self, tasks_dao: DAO, videos_dao: DAO, todos_dao: DAO, users_dao: DAO):
+    def __init__(self, tasks_dao: DAO, videos_dao: DAO, todos_dao: DAO, users_dao: DAO, views_dao: DAO = None, lookup: bool = False):
+        """Instantiate the task controller.
+
+        parameters:
+            tasks_dao, videos_dao, todos_dao, users_dao -- data access objects of the respective collections
+            views_dao -- optional data access object of the task read model (see refresh_views), which is not maintained if None
+            lookup -- if True, get populates a task with a single aggregation instead of separate queries (see TASK_LOOKUP)
+        """
         super().__init__(dao=tasks_dao)
         self.videos_dao = videos_dao
         self.todos_dao = todos_dao
         self.users_dao = users_dao
+        self.views_dao = views_dao
+        # cleared once the database turns out not to support $lookup (e.g., a stand-in), see get
+        self.lookup = lookup
 
-    def create(self, data: dict):
+    def create(self, data: dict, return_task: bool = False):
         """Create a new task object based on the data contained in the dict. The data must contain at least a userid, a video url and a title. If todos are contained in the data, create todo objects and associate them to the task
 
         attributes:
             data -- dict containing the data of the new task (at least a title, url, and userid)
+            return_task -- if True, return the new task populated like by get, which is built from the created objects without reading them back
 
         returns:
-            task -- newly created task object
+            id -- the id of the newly created task object
+            task -- the newly created, populated task object if return_task is True
         
         raises:
             KeyError -- in case an important key is missing in the data dict
             Exception -- in case any database operation fails
         """
 
+        uid = self.prepare_task(data)
+
+        try:
+            # add the video url
+            video = self.videos_dao.create({'url': data['url']})
+            del data['url']
+            data['video'] = ObjectId(video['_id']['$oid'])
+
+            # create and add todos
+            result = self.todos_dao.create_many([{'description': todo, 'done': False} for todo in data['todos']])
+            if len(result['errors']) > 0:
+                error = result['errors'][0]
+                raise WriteError(error['message'], code=error['code'])
+            data['todos'] = [ObjectId(todoobj['_id']['$oid']) for todoobj in result['created']]
+
+            # create the task object and assign it to the user
+            task = self.dao.create(data)
+            self.users_dao.update(
+                uid, {'$push': {'tasks': ObjectId(task['_id']['$oid'])}})
+
+            # the populated task is known without reading it back
+            populated = dict(task, video=video, todos=result['created'])
+            if self.views_dao is not None:
+                self.views_dao.create(self.build_views([populated], {task['_id']['$oid']: uid})[0])
+            return populated if return_task else task['_id']['$oid']
+        except Exception as e:
+            raise
+
+    def prepare_task(self, data: dict):
+        """Prepare the data of a new task object: remove the userid and fill default values for missing values.
+
+        attributes:
+            data -- dict containing the data of the new task, which is modified in place
+
+        returns:
+            uid -- the userid of the associated user
+
+        raises:
+            KeyError -- in case the userid is missing in the data dict
+        """
         # store the userid
         if 'userid' not in data:
             raise KeyError('When creating a task object, the userid of the associated user must be given')
         uid = data['userid']
         del data['userid']
 
-        
         # fill default values for missing values
         if 'startdate' not in data:
             data['startdate'] = datetime.today()
         if 'categories' not in data:
             data['categories'] = []
+        return uid
+
+    def get(self, id: str, projection: dict = None):
+        """Obtain a task populated with its video and todos (see populate_task). The task is fetched first, and its video and
+        todos afterwards. If lookup is enabled and the DAO of the tasks has no read cache, the task is obtained with a single
+        aggregation using $lookup stages instead (see find_populated). If the aggregation fails, the separate queries are used,
+        which is remembered for all further calls if the database does not support $lookup (see lookup_failed).
+
+        parameters:
+            id -- the unique identifier of the task
+            projection -- optional MongoDB projection which limits the returned fields of the task (e.g., {'title': 1})
 
+        returns:
+            task -- the populated task object
+            None -- if no task is associated to the given id
+
+        raises:
+            Exception -- in case any database operation fails
+        """
         try:
-            # add the video url
-            video = self.videos_dao.create({'url': data['url']})
-            del data['url']
-            data['video'] = ObjectId(video['_id']['$oid'])
+            # the aggregation bypasses the read cache, which serves the task without a round trip
+            if self.lookup and self.dao.cache is None:
+                try:
+                    tasks = self.find_populated(filter={'_id': ObjectId(id)}, projection=projection)
+                    return tasks[0] if len(tasks) > 0 else None
+                except (NotImplementedError, OperationFailure) as e:
+                    self.lookup_failed(e)
 
-            # create and add todos
-            todos = []
-            for todo in data['todos']:
-                todoobj = self.todos_dao.create({'description': todo, 'done': False})
-                todos.append(ObjectId(todoobj['_id']['$oid']))
-            data['todos'] = todos
+            task = super().get(id, projection=projection)
+            if task is None:
+                return None
+            return self.populate_task(task)
+        except Exception as e:
+            raise
 
-            # create the task object and assign it to the user
-            task = self.dao.create(data)
-            self.users_dao.update(
-                uid, {'$push': {'tasks': ObjectId(task['_id']['$oid'])}})
-            return task['_id']['$oid']
+
+    def update(self, id: str, data: dict, return_document: bool = False):
+        """Update a task like Controller.update. If return_document is True, the updated task is returned populated like by get."""
+        try:
+            result = super().update(id, data, return_document=return_document)
+            self.refresh_views([id])
+            if return_document and result is not None:
+                return self.populate_task(result)
+            return result
         except Exception as e:
             raise
 
-    def get(self, id: str):
+    def delete(self, id: str):
         try:
-            task = super().get(id)
-            return self.populate_task(task)
+            result = super().delete(id)
+            self.delete_views([id])
+            return result
         except Exception as e:
             raise
 
+    def after_bulk_write(self, operations: list):
+        """Keep the task read model consistent with the tasks updated and deleted by bulk_write (see refresh_views)."""
+        self.refresh_views([operation['id'] for operation in operations if operation['op'] == 'update'])
+        self.delete_views([operation['id'] for operation in operations if operation['op'] == 'delete'])
 
-    def get_tasks_of_user(self, id: str):
-        """Return all task objects that are associated to a specific user.
+    def lookup_failed(self, e: Exception):
+        """Handle the failure of an aggregation of get: if the database does not support the aggregation (e.g., a stand-in which
+        lacks $lookup), the tasks are populated without $lookup from now on.
+
+        parameters:
+            e -- the NotImplementedError or pymongo.errors.OperationFailure raised by the aggregation
+        """
+        print(f'{e.__class__.__name__}: {e}')
+        if isinstance(e, NotImplementedError) or e.code in UNSUPPORTED:
+            print('Populating tasks without $lookup')
+            self.lookup = False
+
+    def get_tasks_of_user(self, id: str, lookup: bool = False, projection: dict = None):
+        """Return all task objects that are associated to a specific user. If the read model is enabled, the populated tasks are obtained from it with a single query (see refresh_views).
 
         attributes:
             id -- the unique identifier of a user object
+            lookup -- if True, resolve the video and todos of all tasks within the database using a single $lookup aggregation, otherwise fetch them in bulk (see populate_tasks), ignored if the read model is enabled
+            projection -- optional MongoDB projection which limits the returned fields of the tasks (e.g., {'title': 1})
 
         returns:
             tasks -- list of tasks associated to that user
@@ -80,13 +182,16 @@ class TaskController(Controller):
             Exception -- in case any database operation fails
         """
         try:
-            user = self.users_dao.findOne(id)
-            tasks = self.dao.find(filter={'_id': user['tasks']}, toid=['_id'])
+            if self.views_dao is not None:
+                return self.views_dao.find(filter={'userid': ObjectId(id)}, projection=self.view_projection(projection))
 
-            for task in tasks:
-                self.populate_task(task)
+            # only the task references of the user are needed
+            user = self.users_dao.findOne(id, projection={'tasks': 1})
+            if lookup:
+                return self.find_populated(filter={'_id': {'$in': [ObjectId(task['$oid']) for task in user['tasks']]}}, projection=projection)
 
-            return tasks
+            tasks = self.dao.find(filter={'_id': user['tasks']}, toid=['_id'], projection=projection)
+            return self.populate_tasks(tasks)
         except Exception as e:
             raise
 
@@ -99,41 +204,250 @@ class TaskController(Controller):
         returns:
             task -- task object with resolved references        
         """
-        # populate the video of the task
-        video = self.videos_dao.findOne(task['video']['$oid'])
-        task['video'] = video
+        return self.populate_tasks([task])[0]
+
+    def populate_tasks(self, tasks: list):
+        """Populate a list of task objects like populate_task, but with a constant number of database operations: the ids of all videos and of all todos are collected first, each collection is queried once, and the results are assigned to the tasks in memory.
+
+        parameters:
+            tasks -- list of task objects with reference ids (external keys)
+
+        returns:
+            tasks -- the same list of task objects with resolved references
+        """
+        videoids, todoids = self.collect_references(tasks)
+
+        # fetch all referenced videos and todos at once
+        videos, todos = [], []
+        if len(videoids) > 0:
+            videos = self.videos_dao.find(filter={'_id': videoids}, toid=['_id'])
+        if len(todoids) > 0:
+            todos = self.todos_dao.find(filter={'_id': todoids}, toid=['_id'])
 
-        # populate the todos of the task
-        todos = self.todos_dao.find(filter={'_id': task['todos']}, toid=['_id'])
-        task['todos'] = todos
+        return self.assign_references(tasks, videos, todos)
 
+    def collect_references(self, tasks: list):
+        """Collect the ids of all videos and todos referenced by a list of task objects.
+
+        parameters:
+            tasks -- list of task objects with reference ids (external keys)
+
+        returns:
+            videoids -- list of referenced video ids (in the jsonified form)
+            todoids -- list of referenced todo ids (in the jsonified form)
+        """
+        videoids = [task['video'] for task in tasks if 'video' in task]
+        todoids = [todo for task in tasks for todo in task.get('todos', [])]
+        return videoids, todoids
+
+    def assign_references(self, tasks: list, videos: list, todos: list):
+        """Replace the reference ids of a list of task objects by the given video and todo objects.
+
+        parameters:
+            tasks -- list of task objects with reference ids (external keys)
+            videos -- list of video objects referenced by the tasks
+            todos -- list of todo objects referenced by the tasks
+
+        returns:
+            tasks -- the same list of task objects with resolved references
+        """
+        videos = {video['_id']['$oid']: video for video in videos}
+        todos = {todo['_id']['$oid']: todo for todo in todos}
+
+        for task in tasks:
+            if 'video' in task:
+                task['video'] = videos.get(task['video']['$oid'])
+            if 'todos' in task:
+                task['todos'] = [todos[todo['$oid']] for todo in task['todos'] if todo['$oid'] in todos]
+
+        return tasks
+
+    def find_populated(self, filter: dict, projection: dict = None):
+        """Find all tasks which comply to the given filter and resolve their video and todos within the database using $lookup stages, such that the populated tasks are obtained in a single database operation.
+
+        parameters:
+            filter -- dict containing a MongoDB query on the task collection (ids must already be converted to ObjectIds)
+            projection -- optional MongoDB projection which limits the returned fields of the tasks (e.g., {'title': 1})
+
+        returns:
+            tasks -- list of populated task objects
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        pipeline = self.populate_pipeline(filter, projection)
+        try:
+            return [self.order_todos(task) for task in self.dao.aggregate(pipeline)]
+        except Exception as e:
+            raise
+
+    def populate_pipeline(self, filter: dict, projection: dict = None):
+        """Build the aggregation pipeline of find_populated.
+
+        parameters:
+            filter -- dict containing a MongoDB query on the task collection (ids must already be converted to ObjectIds)
+            projection -- optional MongoDB projection which limits the returned fields of the tasks
+
+        returns:
+            pipeline -- list of aggregation stages
+        """
+        pipeline = [{'$match': filter}]
+        if projection is not None:
+            # only the references of the projected fields are resolved
+            pipeline.append({'$project': projection})
+        pipeline += [
+            {'$lookup': {'from': self.videos_dao.collection_name, 'localField': 'video', 'foreignField': '_id', 'as': 'video'}},
+            {'$unwind': {'path': '$video', 'preserveNullAndEmptyArrays': True}},
+            # $lookup does not preserve the order of the references, the todos are put in order by order_todos
+            {'$lookup': {'from': self.todos_dao.collection_name, 'localField': 'todos', 'foreignField': '_id', 'as': LOOKUP_TODOS}}
+        ]
+        return pipeline
+
+    def order_todos(self, task: dict):
+        """Replace the todo ids of a task obtained by the pipeline of find_populated by the todos resolved by $lookup, in the order
+        of the ids.
+
+        parameters:
+            task -- task object with a resolved video, but todo ids (and the resolved todos in an additional field)
+
+        returns:
+            task -- the same task object with resolved todos
+        """
+        todos = {todo['_id']['$oid']: todo for todo in task.pop(LOOKUP_TODOS, [])}
+        if 'todos' in task:
+            task['todos'] = [todos[todo['$oid']] for todo in task['todos'] if todo['$oid'] in todos]
         return task
 
-    def delete_of_user(self, id: str):
-        """Delete all tasks that are associated to a user with the given ID. This includes each video and all todo items associated to each of the tasks.
+    def delete_of_user(self, id: str, transaction: bool = False):
+        """Delete all tasks that are associated to a user with the given ID. This includes each video and all todo items associated to each of the tasks. All dependent ids are gathered first, then each collection is cleaned up with a single delete_many operation.
         
         parameters:
             id -- the unique identifier of a user object
+            transaction -- if True, perform the deletions within a multi-document transaction, such that either all or no objects are deleted (requires a replica set)
             
         returns:
-            n -- number of deleted tasks
+            counts -- dict containing the number of deleted objects per collection (keys tasks, videos, and todos), which are
+                zero if no user is associated to the given id
         
         raises:
             Exception -- in case any database operation fails
         """
         try:
-            user = self.users_dao.findOne(id)
-            if 'tasks' in user:
-                tasks = self.dao.find(filter={'_id': user['tasks']}, toid=['_id'])
-
-                for task in tasks:
-                    self.videos_dao.delete(id=task['video']['$oid'])
-                    for todo in task['todos']:
-                        self.todos_dao.delete(id=todo['$oid'])
-                    self.dao.delete(id=task['_id']['$oid'])
-
-                return len(tasks)
-            else:
+            user = self.users_dao.findOne(id, projection={'tasks': 1})
+            if user is None or 'tasks' not in user or len(user['tasks']) == 0:
+                return {'tasks': 0, 'videos': 0, 'todos': 0}
+
+            tasks = self.dao.find(filter={'_id': user['tasks']}, toid=['_id'], projection={'video': 1, 'todos': 1})
+            taskids = [task['_id']['$oid'] for task in tasks]
+            videoids = [task['video']['$oid'] for task in tasks if 'video' in task]
+            todoids = [todo['$oid'] for task in tasks for todo in task.get('todos', [])]
+
+            def cascade(session=None):
+                self.delete_views(taskids, session=session)
+                return {
+                    'videos': self.videos_dao.delete_many(videoids, session=session),
+                    'todos': self.todos_dao.delete_many(todoids, session=session),
+                    'tasks': self.dao.delete_many(taskids, session=session)
+                }
+
+            if transaction:
+                with self.dao.start_session() as session:
+                    return session.with_transaction(cascade)
+            return cascade()
+        except Exception as e:
+            raise
+
+    def build_views(self, tasks: list, owners: dict):
+        """Build the documents of the task read model from populated task objects.
+
+        parameters:
+            tasks -- list of populated task objects
+            owners -- dict mapping the id of each task to the id of its user
+
+        returns:
+            views -- list of MongoDB documents, each consisting of a task with its video and todos inlined and the id of its user
+        """
+        return [jsonToBson(dict(task, userid={'$oid': owners[task['_id']['$oid']]})) for task in tasks if task['_id']['$oid'] in owners]
+
+    def view_projection(self, projection: dict = None):
+        """Extend a projection of the tasks such that the user id of the read model is excluded (unless requested explicitly)."""
+        if projection is None:
+            return {'userid': 0}
+        if all(not value for key, value in projection.items() if key != '_id'):
+            return dict(projection, userid=0)
+        return projection
+
+    def refresh_views(self, ids: list):
+        """Replace the documents of the given tasks in the task read model (the task_view collection), which holds every task with its video and todos inlined and the id of its user, such that the tasks of a user are obtained with a single query. The documents are rebuilt from the task, video, todo and user collections, a document of a task which no longer exists is removed. Does nothing if the read model is disabled.
+
+        parameters:
+            ids -- list of the ids of the modified tasks
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        if self.views_dao is None or len(ids) == 0:
+            return
+        try:
+            taskids = [ObjectId(id) for id in ids]
+            tasks = self.populate_tasks(self.dao.find(filter={'_id': {'$in': taskids}}))
+            users = self.users_dao.find(filter={'tasks': {'$in': taskids}}, projection={'tasks': 1})
+            owners = {task['$oid']: user['_id']['$oid'] for user in users for task in user.get('tasks', [])}
+
+            for view in self.build_views(tasks, owners):
+                # the document is replaced as a whole, such that fields removed from the task are removed from it as well;
+                # it carries the version counter of its task, which every write of the task increments (the inlined video
+                # and todos carry their own), hence its entity tag changes with every change of its content
+                self.views_dao.replace(str(view['_id']), view, upsert=True)
+            existing = [task['_id']['$oid'] for task in tasks if task['_id']['$oid'] in owners]
+            self.delete_views([id for id in ids if id not in existing])
+        except Exception as e:
+            raise
+
+    def delete_views(self, ids: list, session=None):
+        """Remove the documents of the given tasks from the task read model (if enabled).
+
+        parameters:
+            ids -- list of the ids of the deleted tasks
+            session -- optional pymongo.client_session.ClientSession (e.g., to delete within a transaction)
+        """
+        if self.views_dao is not None and len(ids) > 0:
+            self.views_dao.delete_many(ids, session=session)
+
+    def rebuild_views(self, batch_size: int = 100):
+        """Rebuild the entire task read model from the task, video, todo and user collections, e.g. after enabling it (see TASK_VIEW). The users are processed in batches, such that the number of database operations grows with the number of batches instead of the number of tasks.
+
+        parameters:
+            batch_size -- number of users per batch
+
+        returns:
+            n -- number of documents of the rebuilt read model
+
+        raises:
+            ValueError -- in case the read model is disabled
+            Exception -- in case any database operation fails
+        """
+        if self.views_dao is None:
+            raise ValueError('The task read model is disabled (see TASK_VIEW)')
+
+        def rebuild(users):
+            owners = {task['$oid']: user['_id']['$oid'] for user in users for task in user.get('tasks', [])}
+            if len(owners) == 0:
                 return 0
+            tasks = self.populate_tasks(self.dao.find(filter={'_id': [{'$oid': id} for id in owners]}, toid=['_id']))
+            return len(self.views_dao.create_many(self.build_views(tasks, owners), ordered=False)['created'])
+
+        try:
+            # recreate the collection with its validator and indexes
+            self.views_dao.drop()
+            self.views_dao.bind()
+
+            count, users = 0, []
+            for user in self.users_dao.find_iter(projection={'tasks': 1}, batch_size=batch_size):
+                users.append(user)
+                if len(users) == batch_size:
+                    count += rebuild(users)
+                    users = []
+            return count + rebuild(users)
         except Exception as e:
-            raise
\ No newline at end of file
+            raise
@@ -1,12 +1,20 @@
 from src.controllers.controller import Controller
 from  src.util.dao import DAO
+from src.controllers.taskcontroller import TaskController
 
 from bson.objectid import ObjectId
 
 class TodoController(Controller):
-    def __init__(self, todo_dao: DAO, tasks_dao: DAO):
+    def __init__(self, todo_dao: DAO, tasks_dao: DAO, taskcontroller: TaskController = None):
+        """Instantiate the todo controller.
+
+        parameters:
+            todo_dao, tasks_dao -- data access objects of the respective collections
+            taskcontroller -- optional task controller, the read model of which is kept consistent with the todos (see TaskController.refresh_views)
+        """
         super().__init__(dao=todo_dao)
         self.tasks_dao = tasks_dao
+        self.taskcontroller = taskcontroller
 
     def create(self, data: dict):
         """Given a valid dict containing the data of the new todo item create a new todo item and return the newly created item. If in addition a taskid attribute is given, then the new todo object will be automatically associated to the task object.
@@ -32,9 +40,46 @@ class TodoController(Controller):
 
                 todo = self.dao.create(data)
                 self.tasks_dao.update(id=task['_id']['$oid'], update_data={'$push' : {'todos': ObjectId(todo['_id']['$oid'])}})
+                if self.taskcontroller is not None:
+                    self.taskcontroller.refresh_views([task['_id']['$oid']])
 
                 return todo
             else:
                 return self.dao.create(data)
         except Exception as e:
-            raise
\ No newline at end of file
+            raise
+
+    def update(self, id: str, data: dict, return_document: bool = False):
+        try:
+            result = super().update(id, data, return_document=return_document)
+            self.refresh_views(id)
+            return result
+        except Exception as e:
+            raise
+
+    def delete(self, id: str):
+        try:
+            result = super().delete(id)
+            self.refresh_views(id)
+            return result
+        except Exception as e:
+            raise
+
+    def after_bulk_write(self, operations: list):
+        """Keep the task read model consistent with the todos updated and deleted by bulk_write (see refresh_views)."""
+        ids = [operation['id'] for operation in operations if operation['op'] != 'create']
+        if self.taskcontroller is None or self.taskcontroller.views_dao is None or len(ids) == 0:
+            return
+        tasks = self.tasks_dao.find(filter={'todos': {'$in': [ObjectId(id) for id in ids]}}, projection={'_id': 1})
+        self.taskcontroller.refresh_views([task['_id']['$oid'] for task in tasks])
+
+    def refresh_views(self, id: str):
+        """Update the documents of all tasks referencing the given todo in the task read model (if enabled).
+
+        parameters:
+            id -- the unique identifier of a todo object
+        """
+        if self.taskcontroller is None or self.taskcontroller.views_dao is None:
+            return
+        tasks = self.tasks_dao.find(filter={'todos': ObjectId(id)}, projection={'_id': 1})
+        self.taskcontroller.refresh_views([task['_id']['$oid'] for task in tasks])
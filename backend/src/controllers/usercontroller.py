@@ -55,9 +55,14 @@ class UserController(Controller):
             raise
 
     
-    def update(self, id, data):
+    def update(self, id, data, return_document: bool = False):
         try:
-            update_result = super().update(id=id, data={'$set': data})
+            update_result = super().update(id=id, data={'$set': data}, return_document=return_document)
             return update_result
         except Exception as e:
             raise
+
+    def bulk_write(self, operations: list, session=None):
+        # the data of an update consists of the new values of the fields (see update)
+        operations = [dict(operation, data={'$set': operation['data']}) if operation['op'] == 'update' else operation for operation in operations]
+        return super().bulk_write(operations, session=session)
@@ -0,0 +1,197 @@
+# coding=utf-8
+# create an asynchronous data access object
+from src.util.dao import DAO
+from src.util.validators import getValidator
+from src.util.indexes import getIndexes
+from src.util.clients import getAsyncClient, getGeneration
+from src.util.projection import isSimple, project
+from src.util.metrics import instrumented
+from src.util.etags import versionUpdate
+
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure
+
+
+class AsyncDAO(DAO):
+    """Data access object with the same interface as DAO, but every database operation is a coroutine executed with the asyncio
+    driver motor, such that a worker can serve other requests while waiting for the database. Obtain instances via
+    src.util.daos.getAsyncDao, which provides one per event loop and prepares the collection before its first use.
+    """
+
+    def bind(self):
+        """Bind this data access object to its collection using the shared asyncio client of the process. In contrast to DAO.bind,
+        this does not perform any database operation (see prepare).
+        """
+        generation = getGeneration()
+        self._collection = getAsyncClient().edutask[self.collection_name]
+        self.generation = generation
+
+    async def prepare(self):
+        """Create the collection with its validator if it does not yet exist and ensure its indexes (see src.util.indexes).
+        """
+        database = self.collection.database
+        if self.collection_name not in await database.list_collection_names():
+            await database.create_collection(self.collection_name, validator=getValidator(self.collection_name))
+
+        for spec in getIndexes(self.collection_name):
+            options = {key: value for key, value in spec.items() if key != 'keys'}
+            try:
+                await self.collection.create_index(list(spec['keys'].items()), **options)
+            except OperationFailure as e:
+                print(f'Warning: could not create index {spec} on collection {self.collection_name}: {e}')
+
+    @instrumented('create')
+    async def create(self, data: dict, refetch: bool = None):
+        """Asynchronous variant of DAO.create"""
+        localdata = dict(data)
+        if refetch is None:
+            refetch = self.refetch
+
+        result = await self.collection.insert_one(localdata)
+        if refetch:
+            return self.to_json(await self.collection.find_one({'_id': result.inserted_id}))
+        return self.to_json(self.apply_defaults(localdata))
+
+    @instrumented('create_many')
+    async def create_many(self, data: list, ordered: bool = True, refetch: bool = None):
+        """Asynchronous variant of DAO.create_many"""
+        localdata = [dict(obj) for obj in data]
+        if refetch is None:
+            refetch = self.refetch
+        if len(localdata) == 0:
+            return {'created': [], 'errors': []}
+
+        errors = []
+        try:
+            await self.collection.insert_many(localdata, ordered=ordered)
+            inserted = localdata
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                errors.append({'index': error['index'], 'code': error['code'], 'message': error['errmsg']})
+            failed = [error['index'] for error in errors]
+
+            if ordered:
+                inserted = localdata[:min(failed, default=len(localdata))]
+            else:
+                inserted = [obj for index, obj in enumerate(localdata) if index not in failed]
+
+        if refetch:
+            cursor = self.collection.find({'_id': {'$in': [obj['_id'] for obj in inserted]}})
+            objs = {obj['_id']: obj async for obj in cursor}
+            created = [self.to_json(objs[obj['_id']]) for obj in inserted if obj['_id'] in objs]
+        else:
+            created = [self.to_json(self.apply_defaults(obj)) for obj in inserted]
+        return {'created': created, 'errors': errors}
+
+    @instrumented('findOne')
+    async def findOne(self, id: str, projection: dict = None):
+        """Asynchronous variant of DAO.findOne"""
+        id = ObjectId(id)
+        cacheable = self.cache is not None and (projection is None or isSimple(projection))
+        if cacheable:
+            cached = self.cache.get(self.collection_name, str(id))
+            if cached is not None:
+                return project(cached, projection)
+
+        obj = self.to_json(await self.collection.find_one({'_id': id}, projection))
+        if cacheable and projection is None and obj is not None:
+            self.cache.set(self.collection_name, str(id), obj)
+        return obj
+
+    @instrumented('find')
+    async def find(self, filter=None, toid: list = None, limit: int = None, after: str = None, projection: dict = None):
+        """Asynchronous variant of DAO.find"""
+        return [obj async for obj in self.find_iter(filter=filter, toid=toid, limit=limit, after=after, projection=projection)]
+
+    async def find_iter(self, filter=None, toid: list = None, limit: int = None, after: str = None, projection: dict = None, batch_size: int = None):
+        """Asynchronous variant of DAO.find_iter (an asynchronous generator)"""
+        filter = self.convert_ids(filter, toid)
+
+        if after is not None:
+            filter = {'$and': [filter, {'_id': {'$gt': ObjectId(after)}}]}
+
+        cursor = self.collection.find(filter, projection)
+        if limit is not None or after is not None:
+            cursor = cursor.sort('_id', 1)
+            if limit is not None:
+                cursor = cursor.limit(limit)
+        if batch_size is not None:
+            cursor = cursor.batch_size(batch_size)
+
+        async for obj in cursor:
+            yield self.to_json(obj)
+
+    @instrumented('aggregate')
+    async def aggregate(self, pipeline: list):
+        """Asynchronous variant of DAO.aggregate"""
+        return [self.to_json(obj) async for obj in self.collection.aggregate(pipeline)]
+
+    @instrumented('update')
+    async def update(self, id: str, update_data: dict, upsert: bool = False, return_document: bool = False):
+        """Asynchronous variant of DAO.update"""
+        update_data = versionUpdate(update_data)
+        if return_document:
+            obj = await self.collection.find_one_and_update({'_id': ObjectId(id)}, update_data, upsert=upsert, return_document=ReturnDocument.AFTER)
+            self.invalidate(id)
+            return self.to_json(obj)
+        update_result = await self.collection.update_one({'_id': ObjectId(id)}, update_data, upsert=upsert)
+        self.invalidate(id)
+        return update_result.acknowledged
+
+    @instrumented('replace')
+    async def replace(self, id: str, document: dict, upsert: bool = False):
+        """Asynchronous variant of DAO.replace"""
+        result = await self.collection.replace_one({'_id': ObjectId(id)}, document, upsert=upsert)
+        self.invalidate(id)
+        return result.acknowledged
+
+    @instrumented('delete')
+    async def delete(self, id: str):
+        """Asynchronous variant of DAO.delete"""
+        result = await self.collection.delete_one({'_id': ObjectId(id)})
+        self.invalidate(id)
+        return result.acknowledged
+
+    @instrumented('delete_many')
+    async def delete_many(self, ids: list, session=None):
+        """Asynchronous variant of DAO.delete_many"""
+        if len(ids) == 0:
+            return 0
+        result = await self.collection.delete_many({'_id': {'$in': [ObjectId(id) for id in ids]}}, session=session)
+        for id in ids:
+            self.invalidate(id)
+        return result.deleted_count
+
+    @instrumented('bulk_write')
+    async def bulk_write(self, operations: list, ordered: bool = True, session=None):
+        """Asynchronous variant of DAO.bulk_write"""
+        requests, documents = self.bulk_requests(operations)
+        if len(requests) == 0:
+            return {'results': [], 'errors': []}
+
+        errors = []
+        try:
+            await self.collection.bulk_write(requests, ordered=ordered, session=session)
+        except BulkWriteError as e:
+            errors = self.bulk_errors(e)
+        results = self.bulk_results(operations, documents, errors, ordered)
+
+        created = [document for document in results if isinstance(document, dict)]
+        if self.refetch and len(created) > 0:
+            cursor = self.collection.find({'_id': {'$in': [obj['_id'] for obj in created]}}, session=session)
+            objs = {obj['_id']: obj async for obj in cursor}
+            results = [self.to_json(objs.get(obj['_id'])) if isinstance(obj, dict) else obj for obj in results]
+        else:
+            results = [self.to_json(self.apply_defaults(obj)) if isinstance(obj, dict) else obj for obj in results]
+        return {'results': results, 'errors': errors}
+
+    async def start_session(self):
+        """Asynchronous variant of DAO.start_session"""
+        return await self.collection.database.client.start_session()
+
+    async def drop(self):
+        """Asynchronous variant of DAO.drop"""
+        await self.collection.drop()
+        if self.cache is not None:
+            self.cache.clear(self.collection_name)
@@ -0,0 +1,183 @@
+# coding=utf-8
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from src.util.settings import getSettings
+
+
+class Cache:
+    """Base class of the caches in front of the reads of the data access objects. Documents are stored in their serialized form,
+    such that every read obtains a fresh copy which the caller may modify. The cache counts hits and misses per collection.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.counterlock = threading.Lock()
+
+    def get(self, collection_name: str, id: str):
+        """Obtain a cached document.
+
+        parameters:
+            collection_name -- the name of the collection of the document
+            id -- id value of the document
+
+        returns:
+            object -- a copy of the cached document
+            None -- if the document is not cached (or expired)
+        """
+        value = self.load(f'{collection_name}:{id}')
+        self.count(collection_name, 'hits' if value is not None else 'misses')
+        return json.loads(value) if value is not None else None
+
+    def set(self, collection_name: str, id: str, obj):
+        """Store a document in the cache.
+
+        parameters:
+            collection_name -- the name of the collection of the document
+            id -- id value of the document
+            obj -- the document (parsed to a JSON object)
+        """
+        self.store(f'{collection_name}:{id}', json.dumps(obj))
+
+    def delete(self, collection_name: str, id: str):
+        """Invalidate a cached document.
+
+        parameters:
+            collection_name -- the name of the collection of the document
+            id -- id value of the document
+        """
+        self.remove(f'{collection_name}:{id}')
+
+    def count(self, collection_name: str, counter: str):
+        with self.counterlock:
+            counters = self.counters.setdefault(collection_name, {'hits': 0, 'misses': 0})
+            counters[counter] += 1
+
+    def stats(self):
+        """Obtain the hit and miss counters of the cache.
+
+        returns:
+            stats -- dict mapping each collection name to a dict containing the number of hits and misses
+        """
+        with self.counterlock:
+            return {collection_name: dict(counters) for collection_name, counters in self.counters.items()}
+
+    def load(self, key: str):
+        raise NotImplementedError
+
+    def store(self, key: str, value: str):
+        raise NotImplementedError
+
+    def remove(self, key: str):
+        raise NotImplementedError
+
+    def clear(self, collection_name: str):
+        """Invalidate all cached documents of a collection.
+
+        parameters:
+            collection_name -- the name of the collection
+        """
+        raise NotImplementedError
+
+
+class LRUCache(Cache):
+    def __init__(self, maxsize: int = 1024, ttl: float = 30):
+        """In-process cache which holds at most maxsize documents and evicts the least recently used one first.
+
+        parameters:
+            maxsize -- maximum number of cached documents
+            ttl -- number of seconds after which a cached document expires
+        """
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def load(self, key: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def store(self, key: str, value: str):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def remove(self, key: str):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self, collection_name: str):
+        with self.lock:
+            for key in [key for key in self.entries if key.startswith(f'{collection_name}:')]:
+                del self.entries[key]
+
+
+class RedisCache(Cache):
+    def __init__(self, url: str, ttl: float = 30, prefix: str = 'edutask:'):
+        """Cache backed by a Redis-compatible server, which can be shared by all worker processes on a host.
+        Requires the optional redis package (pip install redis).
+
+        parameters:
+            url -- the URL of the Redis server (e.g., redis://localhost:6379/0)
+            ttl -- number of seconds after which a cached document expires
+            prefix -- prefix of all keys written by this cache
+        """
+        super().__init__()
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError('The redis cache backend requires the redis package (pip install redis)') from e
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def load(self, key: str):
+        return self.client.get(self.prefix + key)
+
+    def store(self, key: str, value: str):
+        self.client.set(self.prefix + key, value, ex=max(1, int(self.ttl)))
+
+    def remove(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def clear(self, collection_name: str):
+        keys = list(self.client.scan_iter(match=f'{self.prefix}{collection_name}:*'))
+        if len(keys) > 0:
+            self.client.delete(*keys)
+
+
+caches = {}
+def getCache():
+    """Obtain the process-wide cache as configured by the settings (see src.util.settings): DAO_CACHE selects the backend
+    ('none', 'lru' or 'redis'), DAO_CACHE_SIZE the maximum number of documents of the lru backend, DAO_CACHE_TTL the expiry in
+    seconds and REDIS_URL the server of the redis backend. Note that the lru backend is local to each process, so with several
+    worker processes a document may be stale for up to DAO_CACHE_TTL seconds after another worker modified it.
+
+    returns:
+        cache -- the configured Cache
+        None -- if caching is disabled
+    """
+    settings = getSettings()
+    backend = settings.dao_cache.lower()
+
+    if backend not in caches:
+        if backend == 'lru':
+            caches[backend] = LRUCache(maxsize=settings.dao_cache_size, ttl=settings.dao_cache_ttl)
+        elif backend == 'redis':
+            caches[backend] = RedisCache(url=settings.redis_url, ttl=settings.dao_cache_ttl)
+        else:
+            caches[backend] = None
+    return caches[backend]
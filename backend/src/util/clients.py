@@ -0,0 +1,284 @@
+# coding=utf-8
+import asyncio
+import os
+import threading
+import time
+
+import pymongo
+from pymongo import monitoring
+from motor import motor_asyncio
+
+from src.util.settings import getSettings, onReload
+from src.util.commands import commandmonitor
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener, monitoring.ServerHeartbeatListener):
+    """Listener attached to all clients of the process, which keeps track of the state of the connection pools and of the
+    latest heartbeat of each server. The state is maintained by the monitoring events of the driver, such that it can be
+    reported (e.g., by a readiness check) without any database operation.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.servers = {}
+
+    def server(self, address):
+        return self.servers.setdefault(f'{address[0]}:{address[1]}', {
+            'pool': 'closed', 'connections': 0, 'checked_out': 0, 'checkout_failures': 0,
+            'heartbeat': None, 'heartbeat_ms': None, 'heartbeat_at': None})
+
+    def update(self, address, **changes):
+        with self.lock:
+            server = self.server(address)
+            for key, value in changes.items():
+                server[key] = server[key] + value if key in ('connections', 'checked_out', 'checkout_failures') else value
+
+    def stats(self):
+        """Obtain the cached state of all servers.
+
+        returns:
+            stats -- dict mapping each server address to its pool state ('ready', 'cleared' or 'closed'), number of open
+                and checked out connections, number of failed checkouts and the result and duration of the latest heartbeat
+        """
+        with self.lock:
+            return {address: dict(server) for address, server in self.servers.items()}
+
+    def pool_created(self, event):
+        self.update(event.address, pool='created')
+
+    def pool_ready(self, event):
+        self.update(event.address, pool='ready')
+
+    def pool_cleared(self, event):
+        self.update(event.address, pool='cleared')
+
+    def pool_closed(self, event):
+        self.update(event.address, pool='closed')
+
+    def connection_created(self, event):
+        self.update(event.address, connections=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.update(event.address, connections=-1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self.update(event.address, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self.update(event.address, checked_out=1)
+
+    def connection_checked_in(self, event):
+        self.update(event.address, checked_out=-1)
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.update(event.connection_id, heartbeat='succeeded', heartbeat_ms=round(event.duration * 1000, 2), heartbeat_at=time.time())
+
+    def failed(self, event):
+        self.update(event.connection_id, heartbeat='failed', heartbeat_ms=round(event.duration * 1000, 2), heartbeat_at=time.time())
+
+
+monitor = PoolMonitor()
+clients = {}
+# the asyncio clients of each event loop (see getAsyncClient)
+asyncclients = {}
+lock = threading.Lock()
+generation = 0
+# generation of the client the background connection of which was started (see connectInBackground)
+connecting = None
+# seconds after which the clients replaced by a reload of the settings are closed
+RELOAD_GRACE = 60
+
+
+def getMongoUrl():
+    """Determine the URL of the MongoDB. The local .env file provides the default value (something like mongodb://localhost:27017),
+    which can be overridden by the environment (e.g., by the docker-compose file), see src.util.settings.
+
+    returns:
+        url -- the URL of the MongoDB
+    """
+    return getSettings().mongo_url
+
+
+def getPoolOptions():
+    """Collect the connection pool configuration of the MongoClient from the settings (see src.util.settings).
+
+    returns:
+        options -- dict of keyword arguments for the pymongo.MongoClient constructor
+    """
+    settings = getSettings()
+    return {
+        'maxPoolSize': settings.mongo_max_pool_size,
+        'minPoolSize': settings.mongo_min_pool_size,
+        'waitQueueTimeoutMS': settings.mongo_wait_queue_timeout_ms,
+        'maxIdleTimeMS': settings.mongo_max_idle_time_ms,
+        'event_listeners': [monitor, commandmonitor] if settings.mongo_command_monitoring else [monitor]
+    }
+
+
+def getPoolStats():
+    """Obtain the cached state of the connection pools of the process (see PoolMonitor.stats) without any database operation.
+
+    returns:
+        stats -- dict mapping each server address to the state of its pool and its latest heartbeat
+    """
+    return monitor.stats()
+
+
+def getClient(url: str = None):
+    """Obtain the process-wide MongoClient connected to the given URL. The purpose of the realization using the singleton pattern is
+    to share one connection pool (and one set of monitor threads) among all data access objects of a process instead of opening
+    a separate pool per collection.
+
+    parameters:
+        url -- the URL of the MongoDB (defaults to the URL determined by getMongoUrl)
+
+    returns:
+        client -- pooled pymongo.MongoClient
+    """
+    if url is None:
+        url = getMongoUrl()
+
+    if url not in clients:
+        with lock:
+            if url not in clients:
+                print(f'Connecting to MongoDB at url {url}')
+                # connect=False defers the connection to the first operation, such that a client created before a fork is never used by a child
+                clients[url] = pymongo.MongoClient(url, connect=False, **getPoolOptions())
+    return clients[url]
+
+
+def getAsyncClient(url: str = None):
+    """Obtain the asyncio client (motor.motor_asyncio.AsyncIOMotorClient) of the running event loop connected to the given URL,
+    which is configured with the same connection pool options as the client of getClient. A motor client is bound to the event
+    loop of its first operation and fails on any other loop, hence every event loop obtains its own client. Under an ASGI
+    server (see asgi.py), all coroutines run on the event loop of the server and share one client. Under a WSGI server, flask
+    runs every coroutine route on a new event loop, hence every such request opens a client of its own; the clients of closed
+    event loops are closed by the next call.
+
+    parameters:
+        url -- the URL of the MongoDB (defaults to the URL determined by getMongoUrl)
+
+    returns:
+        client -- pooled motor.motor_asyncio.AsyncIOMotorClient
+
+    raises:
+        RuntimeError -- if called outside of a running event loop
+    """
+    if url is None:
+        url = getMongoUrl()
+    loop = asyncio.get_running_loop()
+
+    with lock:
+        discarded = []
+        for other in [other for other in asyncclients if other.is_closed()]:
+            discarded += asyncclients.pop(other).values()
+
+        loopclients = asyncclients.setdefault(loop, {})
+        if url not in loopclients:
+            print(f'Connecting asynchronously to MongoDB at url {url}')
+            loopclients[url] = motor_asyncio.AsyncIOMotorClient(url, connect=False, **getPoolOptions())
+        client = loopclients[url]
+
+    closeClients(discarded)
+    return client
+
+
+def connectInBackground():
+    """Connect the client of the process in a background thread, such that its servers are monitored (see PoolMonitor) without
+    waiting for the database. Does nothing if the connection of the current client was already started.
+    """
+    global connecting
+    with lock:
+        if connecting == generation:
+            return
+        connecting = generation
+
+    def ping():
+        try:
+            getClient().admin.command('ping')
+        except Exception as e:
+            print(f'{e.__class__.__name__}: {e}')
+
+    threading.Thread(target=ping, daemon=True).start()
+
+
+def getGeneration():
+    """Obtain the generation of the client registry, which increases every time the registry is reset. Data access objects
+    compare it to the generation they were bound at to detect that they need to rebind to a fresh client.
+
+    returns:
+        generation -- int counter of registry resets
+    """
+    return generation
+
+
+def resetClients(close: bool = True, grace: float = 0):
+    """Discard all registered clients such that the next call of getClient creates a fresh client.
+
+    parameters:
+        close -- whether to close the discarded clients (must be False in a forked child, as the sockets belong to the parent process)
+        grace -- number of seconds after which the discarded clients are closed (in a background thread), such that requests
+            still using them can complete
+    """
+    global generation
+    with lock:
+        discarded = list(clients.values()) + [client for loopclients in asyncclients.values() for client in loopclients.values()]
+        clients.clear()
+        asyncclients.clear()
+        generation += 1
+
+    if close and grace > 0:
+        timer = threading.Timer(grace, closeClients, [discarded])
+        timer.daemon = True
+        timer.start()
+    elif close:
+        closeClients(discarded)
+
+
+def closeClients(discarded: list):
+    for client in discarded:
+        client.close()
+
+
+def reinitAfterFork():
+    """Fork hook for pre-fork WSGI servers: a MongoClient must not be shared between a parent process and its children, hence
+    every forked worker starts with an empty registry. This hook is registered via os.register_at_fork and can also be called
+    explicitly from a post_fork hook of the server.
+    """
+    global lock
+    # the lock might have been held by another thread of the parent at the time of the fork
+    lock = threading.Lock()
+    monitor.lock = threading.Lock()
+    resetClients(close=False)
+    monitor.reset()
+
+
+def reconnectOnReload(old, new):
+    """Replace the clients when the MongoDB settings change on a reload of the settings (see src.util.settings.onReload). The
+    replaced clients are closed after RELOAD_GRACE seconds, since requests of other threads may still be using them.
+    """
+    if old is None or any(getattr(old, field) != getattr(new, field) for field in
+            ['mongo_url', 'mongo_max_pool_size', 'mongo_min_pool_size', 'mongo_wait_queue_timeout_ms', 'mongo_max_idle_time_ms',
+             'mongo_command_monitoring']):
+        resetClients(grace=RELOAD_GRACE)
+        monitor.reset()
+
+
+onReload(reconnectOnReload)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reinitAfterFork)
@@ -0,0 +1,116 @@
+# coding=utf-8
+import json
+import threading
+import time
+from contextvars import ContextVar
+
+from pymongo import monitoring
+
+from src.util.settings import getSettings
+
+# location of the filter of each command within the command document
+FILTERS = {
+    'find': lambda command: command.get('filter'),
+    'count': lambda command: command.get('query'),
+    'distinct': lambda command: command.get('query'),
+    'findAndModify': lambda command: command.get('query'),
+    'aggregate': lambda command: command.get('pipeline'),
+    'update': lambda command: [update.get('q') for update in command.get('updates', [])],
+    'delete': lambda command: [delete.get('q') for delete in command.get('deletes', [])]
+}
+
+# commands counted by the query tracking of the current request (see startQueries)
+queries = ContextVar('queries', default=None)
+
+
+def redact(value):
+    """Reduce a filter (or pipeline) to its shape by replacing all values with '?', such that it can be logged without exposing
+    any data. Field names and operators are kept, lists of values are collapsed.
+
+    parameters:
+        value -- the filter
+
+    returns:
+        shape -- the redacted filter, e.g. {'_id': {'$in': '?'}} for {'_id': {'$in': [ObjectId(...), ...]}}
+    """
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+        return [redact(item) for item in value]
+    return '?'
+
+
+def log(event: str, **fields):
+    print(json.dumps({'event': event, 'time': round(time.time(), 3), **fields}, default=str), flush=True)
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Listener attached to the clients of the process if MONGO_COMMAND_MONITORING is enabled (see src.util.clients). It measures
+    each command, logs every command slower than MONGO_SLOW_QUERY_MS as a JSON line (event 'slow_query') and counts the
+    commands of the current request (see startQueries).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def started(self, event):
+        command = event.command
+        collection = command.get(event.command_name)
+        collection = collection if isinstance(collection, str) else None
+        shape = redact(FILTERS[event.command_name](command)) if event.command_name in FILTERS else None
+
+        with self.lock:
+            self.pending[(event.connection_id, event.request_id)] = (collection, shape)
+
+        counter = queries.get()
+        if counter is not None:
+            key = (event.command_name, collection)
+            counter[key] = counter.get(key, 0) + 1
+
+    def succeeded(self, event):
+        self.finish(event, 'succeeded')
+
+    def failed(self, event):
+        self.finish(event, 'failed')
+
+    def finish(self, event, outcome: str):
+        with self.lock:
+            collection, shape = self.pending.pop((event.connection_id, event.request_id), (None, None))
+
+        duration_ms = event.duration_micros / 1000
+        if duration_ms >= getSettings().mongo_slow_query_ms:
+            log('slow_query', command=event.command_name, collection=collection, filter=shape, duration_ms=round(duration_ms, 3),
+                outcome=outcome, server=f'{event.connection_id[0]}:{event.connection_id[1]}')
+
+
+commandmonitor = CommandMonitor()
+
+
+def startQueries():
+    """Start counting the commands executed by the current request (or any other unit of work running in the current context).
+    Commands of the asyncio client are executed in other threads and hence are not counted.
+    """
+    queries.set({})
+
+def finishQueries(route: str):
+    """Stop counting the commands of the current request and flag N+1 patterns: if the same command was executed on the same
+    collection at least MONGO_NPLUSONE_THRESHOLD times, this is logged as a JSON line (event 'n_plus_one').
+
+    parameters:
+        route -- the URL rule of the request (included in the log)
+
+    returns:
+        n -- the number of commands executed by the request
+        None -- if the commands of the request were not counted
+    """
+    counter = queries.get()
+    if counter is None:
+        return None
+    queries.set(None)
+
+    threshold = getSettings().mongo_nplusone_threshold
+    for (command, collection), count in counter.items():
+        if collection is not None and count >= threshold:
+            log('n_plus_one', route=route, command=command, collection=collection, count=count)
+    return sum(counter.values())
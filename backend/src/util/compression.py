@@ -0,0 +1,77 @@
+# coding=utf-8
+import gzip
+
+from flask import request
+
+from src.util.settings import getSettings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# mimetypes of the responses worth compressing
+COMPRESSIBLE = ('application/json', 'application/x-ndjson', 'text/')
+
+
+def negotiateEncoding(accepted: list):
+    """Select the content coding of a response: the first of the configured codings (see COMPRESSION) which is available and
+    accepted by the client.
+
+    parameters:
+        accepted -- werkzeug.datastructures.Accept of the Accept-Encoding header
+
+    returns:
+        encoding -- 'br' or 'gzip'
+        None -- if the response is not to be compressed
+    """
+    for encoding in [encoding.strip() for encoding in getSettings().compression.split(',')]:
+        if encoding == 'br' and brotli is None:
+            continue
+        if encoding in ('br', 'gzip') and accepted[encoding] > 0:
+            return encoding
+    return None
+
+def compress(data: bytes, encoding: str):
+    """Compress data with the given content coding at the configured level (COMPRESSION_LEVEL for gzip, BROTLI_QUALITY for br).
+
+    parameters:
+        data -- the uncompressed data
+        encoding -- 'br' or 'gzip'
+
+    returns:
+        bytes -- the compressed data
+    """
+    settings = getSettings()
+    if encoding == 'br':
+        return brotli.compress(data, quality=settings.brotli_quality)
+    return gzip.compress(data, compresslevel=settings.compression_level, mtime=0)
+
+def compressResponse(response):
+    """Compress a response (for flask.Flask.after_request) if its body is at least COMPRESSION_MIN_SIZE bytes long, its mimetype
+    is compressible and the client accepts one of the configured content codings. A strong entity tag of the response becomes
+    weak, since it identifies the uncompressed representation (see src.util.etags).
+
+    parameters:
+        response -- flask.Response
+
+    returns:
+        response -- the (compressed) flask.Response
+    """
+    if response.direct_passthrough or response.is_streamed or response.status_code < 200 or response.status_code in (204, 304) \
+            or 'Content-Encoding' in response.headers or not response.mimetype.startswith(COMPRESSIBLE):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if response.content_length is None or response.content_length < getSettings().compression_min_size:
+        return response
+    encoding = negotiateEncoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    response.set_data(compress(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,55 @@
+from src.controllers.usercontroller import UserController
+from src.controllers.taskcontroller import TaskController
+from src.controllers.todocontroller import TodoController
+from src.controllers.batchcontroller import BatchController
+from src.util.daos import getDao
+from src.util.settings import getSettings
+from src.util.timing import timed
+
+controllers = {}
+def getUserController():
+    """Obtain the controller of the user collection. Like the data access objects (see getDao), the controllers are singletons
+    which are created on their first use rather than when the blueprints are imported.
+
+    returns:
+        controller -- UserController
+    """
+    if 'user' not in controllers:
+        with timed('create controller user'):
+            controllers['user'] = UserController(getDao(collection_name='user'))
+    return controllers['user']
+
+def getTaskController():
+    """Obtain the controller of the task collection (see getUserController).
+
+    returns:
+        controller -- TaskController
+    """
+    if 'task' not in controllers:
+        with timed('create controller task'):
+            # the read model of the tasks is only maintained if it is enabled (see TASK_VIEW)
+            views_dao = getDao(collection_name='task_view') if getSettings().task_view else None
+            controllers['task'] = TaskController(tasks_dao=getDao(collection_name='task'), videos_dao=getDao(collection_name='video'), todos_dao=getDao(collection_name='todo'), users_dao=getDao(collection_name='user'), views_dao=views_dao, lookup=getSettings().task_lookup)
+    return controllers['task']
+
+def getTodoController():
+    """Obtain the controller of the todo collection (see getUserController).
+
+    returns:
+        controller -- TodoController
+    """
+    if 'todo' not in controllers:
+        with timed('create controller todo'):
+            taskcontroller = getTaskController() if getSettings().task_view else None
+            controllers['todo'] = TodoController(todo_dao=getDao(collection_name='todo'), tasks_dao=getDao(collection_name='task'), taskcontroller=taskcontroller)
+    return controllers['todo']
+
+def getBatchController():
+    """Obtain the controller of batches of operations on the user, task and todo collections (see getUserController).
+
+    returns:
+        controller -- BatchController
+    """
+    if 'batch' not in controllers:
+        controllers['batch'] = BatchController(controllers={'user': getUserController(), 'task': getTaskController(), 'todo': getTodoController()}, taskcontroller=getTaskController())
+    return controllers['batch']
@@ -1,49 +1,85 @@
 # coding=utf-8
-import os
-
-import pymongo
-from dotenv import dotenv_values
-
 # create a data access object
 from src.util.validators import getValidator
-
-import json
-from bson import json_util
+from src.util.indexes import ensureIndexes
+from src.util.clients import getClient, getGeneration
+from src.util.serializer import bsonToJson
+from src.util.timing import timed
+from src.util.cache import Cache
+from src.util.projection import isSimple, project
+from src.util.metrics import instrumented
+from src.util.etags import versionUpdate
+
+import copy
+import threading
 from bson.objectid import ObjectId
+from pymongo import ReturnDocument, InsertOne, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError
 
 
 class DAO:
 
-    def __init__(self, collection_name: str):
-        """Establish a data access object to a collection of the given name in the MongoDB database as specified in the environment variables. When the collection is first creted, it will be associated to a validator (see https://www.mongodb.com/docs/manual/core/schema-validation/) to ensure some basic data compliance.
+    def __init__(self, collection_name: str, refetch: bool = False, defaults: dict = None, cache: Cache = None):
+        """Establish a data access object to a collection of the given name in the MongoDB database as specified in the environment variables. When the collection is first creted, it will be associated to a validator (see https://www.mongodb.com/docs/manual/core/schema-validation/) to ensure some basic data compliance. The connection is established lazily on the first database operation (see bind), such that a data access object can be created before the server forks its worker processes.
 
         parameters:
             collection_name -- the name of the collection (a collection validator of the same name must be available)
+            refetch -- if True, create returns the newly created document as stored in the database (one additional round trip), otherwise it is built locally
+            defaults -- dict of values which the locally built document obtains for absent fields, mirroring defaults applied on the server
+            cache -- optional cache in front of findOne (see src.util.cache), which is invalidated by every write through this data access object
         """
 
-        # load the local mongo URL (something like mongodb://localhost:27017)
-        LOCAL_MONGO_URL = dotenv_values('.env').get('MONGO_URL')
-        # check out of the environment (which can be overridden by the docker-compose file) also specifies an URL, and use that instead if it exists
-        MONGO_URL = os.environ.get('MONGO_URL', LOCAL_MONGO_URL)
-
-        # connect to the MongoDB and select the appropriate database
-        print(
-            f'Connecting to collection {collection_name} on MongoDB at url {MONGO_URL}')
-        client = pymongo.MongoClient(MONGO_URL)
-        database = client.edutask
-
-        # create the collection if it does not yet exist
-        if collection_name not in database.list_collection_names():
-            validator = getValidator(collection_name)
-            database.create_collection(collection_name, validator=validator)
-
-        self.collection = database[collection_name]
-
-    def create(self, data: dict):
+        self.collection_name = collection_name
+        self.refetch = refetch
+        self.defaults = defaults or {}
+        self.cache = cache
+        self.generation = None
+        self._collection = None
+        # serializes the binding of concurrent requests (reentrant, since collection binds while holding it)
+        self.lock = threading.RLock()
+
+    def bind(self):
+        """Bind this data access object to its collection using the shared, pooled client of the process (see src.util.clients).
+        When the collection is first created, it will be associated to its validator. In addition, the indexes specified for the
+        collection are ensured (see src.util.indexes). The generation of the binding is only recorded once the collection is
+        ready, such that concurrent requests wait for the binding instead of obtaining no collection.
+        """
+        with self.lock, timed(f'bind collection {self.collection_name}'):
+            # connect to the MongoDB and select the appropriate database (a reset of the clients meanwhile leaves the
+            # generation outdated, such that the next access binds again)
+            print(f'Connecting to collection {self.collection_name}')
+            generation = getGeneration()
+            database = getClient().edutask
+
+            # create the collection if it does not yet exist
+            if self.collection_name not in database.list_collection_names():
+                validator = getValidator(self.collection_name)
+                database.create_collection(self.collection_name, validator=validator)
+
+            collection = database[self.collection_name]
+            ensureIndexes(self, collection)
+            self._collection = collection
+            self.generation = generation
+
+    @property
+    def collection(self):
+        """The collection associated to this data access object. The collection is bound on first access, and rebound in case the
+        client registry was reset since the last binding (e.g., in a freshly forked worker process).
+        """
+        if self.generation != getGeneration():
+            with self.lock:
+                # another thread may have bound the collection while this one waited
+                if self.generation != getGeneration():
+                    self.bind()
+        return self._collection
+
+    @instrumented('create')
+    def create(self, data: dict, refetch: bool = None):
         """Creates a new document in the collection associated to this data access object. The creation of a new document must comply to the corresponding validator, which defines the data structure of the collection. In particular, the validator has to make sure that: (1) the data for the new object contains all required properties, (2) every property complies to the bson data type constraint (see https://www.mongodb.com/docs/manual/reference/bson-types/, though we currently only consider Strings and Booleans), (3) and the values of a property flagged with 'uniqueItems' are unique among all documents of the collection.
 
         parameters:
             data -- a dict containing key-value pairs compliant to the validator
+            refetch -- overrides the refetch setting of this data access object for this call
 
         returns:
             object -- the newly created MongoDB document (parsed to a JSON object) containing the input data and an _id attribute
@@ -52,23 +88,91 @@ class DAO:
             WriteError - in case at least one of the validator criteria is violated
         """
         localdata = dict(data)
+        if refetch is None:
+            refetch = self.refetch
 
         try:
-            # insert the object into the database
+            # insert the object into the database (insert_one adds the generated _id to localdata)
             inserted_id = self.collection.insert_one(localdata).inserted_id
 
-            # fetch and return the created object
-            obj = self.collection.find_one({'_id': inserted_id})
-            return self.to_json(obj)
+            if refetch:
+                # fetch and return the created object
+                obj = self.collection.find_one({'_id': inserted_id})
+                return self.to_json(obj)
+
+            # build the created object locally from the inserted data
+            return self.to_json(self.apply_defaults(localdata))
         except Exception as e:
             # forward any pymongo.errors.WriteError that occurs during insert_one
             raise
 
-    def findOne(self, id: str):
+    @instrumented('create_many')
+    def create_many(self, data: list, ordered: bool = True, refetch: bool = None):
+        """Creates several new documents in the collection associated to this data access object with a single insert_many operation. Each document must comply to the validator of the collection (see create).
+
+        parameters:
+            data -- list of dicts containing key-value pairs compliant to the validator
+            ordered -- if True, the documents are inserted in the given order and the insertion stops at the first invalid document, otherwise all valid documents are inserted
+            refetch -- overrides the refetch setting of this data access object for this call
+
+        returns:
+            result -- dict containing the newly created documents (parsed to JSON objects) under the key 'created' and a list of the failures under the key 'errors', each failure consisting of the index of the document in the data list, an error code and a message
+
+        raises:
+            Exception -- in case any database operation fails for another reason than an invalid document
+        """
+        localdata = [dict(obj) for obj in data]
+        if refetch is None:
+            refetch = self.refetch
+        if len(localdata) == 0:
+            return {'created': [], 'errors': []}
+
+        errors = []
+        try:
+            # insert the objects into the database (insert_many adds the generated _id to each dict)
+            self.collection.insert_many(localdata, ordered=ordered)
+            inserted = localdata
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                errors.append({'index': error['index'], 'code': error['code'], 'message': error['errmsg']})
+            failed = [error['index'] for error in errors]
+
+            if ordered:
+                # an ordered insert stops at the first failure
+                inserted = localdata[:min(failed, default=len(localdata))]
+            else:
+                inserted = [obj for index, obj in enumerate(localdata) if index not in failed]
+        except Exception as e:
+            raise
+
+        if refetch:
+            objs = {obj['_id']: obj for obj in self.collection.find({'_id': {'$in': [obj['_id'] for obj in inserted]}})}
+            created = [self.to_json(objs[obj['_id']]) for obj in inserted if obj['_id'] in objs]
+        else:
+            created = [self.to_json(self.apply_defaults(obj)) for obj in inserted]
+        return {'created': created, 'errors': errors}
+
+    def apply_defaults(self, obj: dict):
+        """Complement a locally built document with the default values of this data access object for all absent fields.
+
+        parameters:
+            obj -- the document
+
+        returns:
+            object -- the document including the default values
+        """
+        for key, value in self.defaults.items():
+            if key not in obj:
+                obj[key] = copy.deepcopy(value)
+        return obj
+
+    @instrumented('findOne')
+    def findOne(self, id: str, projection: dict = None):
         """Find one specific object in the collection with the _id property equal to the given id.
 
         parameters: 
             id -- id value of the requested object
+            projection -- optional MongoDB projection which limits the returned fields (e.g., {'tasks': 1})
 
         returns:
             object -- MongoDB document (parsed to json object)
@@ -77,18 +181,32 @@ class DAO:
             Exception -- in case any database operation fails
         """
         try:
-            obj = self.collection.find_one({'_id': ObjectId(id)})
-            return self.to_json(obj)
+            id = ObjectId(id)
+            # only complete documents are cached, simple projections can be applied to them in memory
+            cacheable = self.cache is not None and (projection is None or isSimple(projection))
+            if cacheable:
+                cached = self.cache.get(self.collection_name, str(id))
+                if cached is not None:
+                    return project(cached, projection)
+
+            obj = self.to_json(self.collection.find_one({'_id': id}, projection))
+            if cacheable and projection is None and obj is not None:
+                self.cache.set(self.collection_name, str(id), obj)
+            return obj
         except Exception as e:
             raise
 
     # find all objects that comply to the optional filter
-    def find(self, filter=None, toid: list = None):
+    @instrumented('find')
+    def find(self, filter=None, toid: list = None, limit: int = None, after: str = None, projection: dict = None):
         """Find all objects contained in the collection which comply to the given filter. 
 
         parameters: 
             filter -- dict containing key value pairs of properties and applicable filters
             toid -- list of properties (contained in the filter) which are MongoDB ObjectIDs and hence need to be converted
+            limit -- maximum number of objects to return (keyset pagination, the objects are ordered by their _id)
+            after -- id value of the last object of the previous page, only objects with a greater _id are returned
+            projection -- optional MongoDB projection which limits the returned fields (e.g., {'title': 1})
 
         returns:
             [object] -- list of objects compliant to the given filter
@@ -96,6 +214,57 @@ class DAO:
         raises:
             Exception -- in case any database operation fails
         """
+        try:
+            return list(self.find_iter(filter=filter, toid=toid, limit=limit, after=after, projection=projection))
+        except Exception as e:
+            raise
+
+    def find_iter(self, filter=None, toid: list = None, limit: int = None, after: str = None, projection: dict = None, batch_size: int = None):
+        """Find all objects contained in the collection which comply to the given filter like find, but yield the objects one by one while iterating over the database cursor instead of materializing all of them at once.
+
+        parameters: 
+            filter -- dict containing key value pairs of properties and applicable filters
+            toid -- list of properties (contained in the filter) which are MongoDB ObjectIDs and hence need to be converted
+            limit -- maximum number of objects to return (keyset pagination, the objects are ordered by their _id)
+            after -- id value of the last object of the previous page, only objects with a greater _id are returned
+            projection -- optional MongoDB projection which limits the returned fields (e.g., {'title': 1})
+            batch_size -- number of documents the database returns per batch of the cursor
+
+        returns:
+            generator -- yields the objects compliant to the given filter
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        filter = self.convert_ids(filter, toid)
+
+        if after is not None:
+            filter = {'$and': [filter, {'_id': {'$gt': ObjectId(after)}}]}
+
+        cursor = self.collection.find(filter, projection)
+        if limit is not None or after is not None:
+            # keyset pagination on the (always indexed) _id
+            cursor = cursor.sort('_id', 1)
+            if limit is not None:
+                cursor = cursor.limit(limit)
+        if batch_size is not None:
+            cursor = cursor.batch_size(batch_size)
+
+        for obj in cursor:
+            yield self.to_json(obj)
+
+    def convert_ids(self, filter=None, toid: list = None):
+        """Convert the values of the given properties of a filter, which are lists of ids in the jsonified form ({'$oid': ...}), to a {'$in': [ObjectId, ...]} clause.
+
+        parameters: 
+            filter -- dict containing key value pairs of properties and applicable filters
+            toid -- list of properties (contained in the filter) which are MongoDB ObjectIDs and hence need to be converted
+
+        returns:
+            filter -- the converted filter
+        """
+        if filter is None:
+            filter = {}
 
         # if the filter contains attributes that are IDs, then they need to be converted
         if toid and len(toid) > 0:
@@ -105,41 +274,95 @@ class DAO:
                     conv = ObjectId(element['$oid'])
                     converted.append(conv)
                 filter[i] = {'$in': converted}
+        return filter
 
-        objs = []
-        try:
-            dbobjs = self.collection.find(filter)
+    @instrumented('aggregate')
+    def aggregate(self, pipeline: list):
+        """Run an aggregation pipeline (see https://www.mongodb.com/docs/manual/core/aggregation-pipeline/) on the collection.
+
+        parameters:
+            pipeline -- list of aggregation stages
 
-            for obj in dbobjs:
-                objs.append(self.to_json(obj))
+        returns:
+            [object] -- list of resulting documents (parsed to json objects)
 
-            return objs
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            return [self.to_json(obj) for obj in self.collection.aggregate(pipeline)]
         except Exception as e:
             raise
 
-    def update(self, id: str, update_data: dict):
-        """Find one specific object in the collection with the _id property equal to the given id and update its data according to the update_data.
+    @instrumented('update')
+    def update(self, id: str, update_data: dict, upsert: bool = False, return_document: bool = False):
+        """Find one specific object in the collection with the _id property equal to the given id and update its data according to the update_data. Every update increments the version counter (_version) of the object, which is used to compute entity tags (see src.util.etags).
 
         parameters: 
             id -- id value of the requested object
             update_data -- dict containing the update operation (top-level key values must be valid MongoDB update operators, see https://www.mongodb.com/docs/manual/reference/operator/update/#std-label-update-operators)
+            upsert -- if True, insert a new object with the given id in case no object matches
+            return_document -- if True, return the updated object, which is obtained atomically with the update in the same round trip (find_one_and_update)
 
         returns:
             True -- if the update was successful
             False -- otherwise
+            object -- the updated object (parsed to a JSON object) if return_document is True
+            None -- if return_document is True and no object matches (and upsert is False)
 
         raises:
             Exception -- in case any database operation fails
         """
         try:
+            update_data = versionUpdate(update_data)
+            if return_document:
+                obj = self.collection.find_one_and_update(
+                    {'_id': ObjectId(id)},
+                    update_data,
+                    upsert=upsert,
+                    return_document=ReturnDocument.AFTER
+                )
+                self.invalidate(id)
+                return self.to_json(obj)
+
             update_result = self.collection.update_one(
                 {'_id': ObjectId(id)},
-                update_data
+                update_data,
+                upsert=upsert
             )
+            self.invalidate(id)
             return update_result.acknowledged
         except Exception as e:
             raise
 
+    @instrumented('replace')
+    def replace(self, id: str, document: dict, upsert: bool = False):
+        """Find one specific object in the collection with the _id property equal to the given id and replace it as a whole by the given document, i.e., fields absent from the document are removed. In contrast to update, the version counter (_version) is not incremented, the replaced object obtains the one of the document (if any).
+
+        parameters:
+            id -- id value of the requested object
+            document -- the new document (without update operators)
+            upsert -- if True, insert the document with the given id in case no object matches
+
+        returns:
+            True -- if the replacement was successful
+            False -- otherwise
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        try:
+            result = self.collection.replace_one(
+                {'_id': ObjectId(id)},
+                document,
+                upsert=upsert
+            )
+            self.invalidate(id)
+            return result.acknowledged
+        except Exception as e:
+            raise
+
+    @instrumented('delete')
     def delete(self, id: str):
         """Find one specific object in the collection with the _id property equal to the given id and remove it from the collection
 
@@ -157,10 +380,136 @@ class DAO:
             result = self.collection.delete_one(
                 {'_id': ObjectId(id)}
             )
+            self.invalidate(id)
             return result.acknowledged
         except Exception as e:
             raise
 
+    @instrumented('delete_many')
+    def delete_many(self, ids: list, session=None):
+        """Remove all objects with an _id property contained in the given list of ids from the collection with a single operation
+
+        parameters: 
+            ids -- list of id values of the objects to remove
+            session -- optional pymongo.client_session.ClientSession (e.g., to delete within a transaction)
+
+        returns:
+            n -- number of deleted objects
+
+        raises:
+            Exception -- in case any database operation fails
+        """
+        if len(ids) == 0:
+            return 0
+        try:
+            result = self.collection.delete_many(
+                {'_id': {'$in': [ObjectId(id) for id in ids]}},
+                session=session
+            )
+            for id in ids:
+                self.invalidate(id)
+            return result.deleted_count
+        except Exception as e:
+            raise
+
+    @instrumented('bulk_write')
+    def bulk_write(self, operations: list, ordered: bool = True, session=None):
+        """Execute several create, update and delete operations on the collection associated to this data access object with a single bulk_write operation (see https://www.mongodb.com/docs/manual/core/bulk-write-operations/). Each operation behaves like the respective method (see create, update and delete), in particular every update increments the version counter of the object.
+
+        parameters:
+            operations -- list of dicts, each containing the kind of operation under the key op ('create', 'update' or 'delete'), the id value of the object to update or delete under the key id, and the new document (create) or the update operation (update) under the key data
+            ordered -- if True, the operations are executed in the given order and the execution stops at the first failure, otherwise all operations are attempted
+            session -- optional pymongo.client_session.ClientSession (e.g., to write within a transaction)
+
+        returns:
+            result -- dict containing a list with the result of each operation under the key 'results' (the newly created document parsed to a JSON object for a create operation, True for an update or delete operation, None if the operation failed or was not executed) and a list of the failures under the key 'errors', each failure consisting of the index of the operation, an error code and a message
+
+        raises:
+            ValueError -- in case the kind of an operation is unknown
+            Exception -- in case any database operation fails for another reason than an invalid operation
+        """
+        requests, documents = self.bulk_requests(operations)
+        if len(requests) == 0:
+            return {'results': [], 'errors': []}
+
+        errors = []
+        try:
+            self.collection.bulk_write(requests, ordered=ordered, session=session)
+        except BulkWriteError as e:
+            errors = self.bulk_errors(e)
+        except Exception as e:
+            raise
+        results = self.bulk_results(operations, documents, errors, ordered)
+
+        created = [document for document in results if isinstance(document, dict)]
+        if self.refetch and len(created) > 0:
+            objs = {obj['_id']: obj for obj in self.collection.find({'_id': {'$in': [obj['_id'] for obj in created]}}, session=session)}
+            results = [self.to_json(objs.get(obj['_id'])) if isinstance(obj, dict) else obj for obj in results]
+        else:
+            results = [self.to_json(self.apply_defaults(obj)) if isinstance(obj, dict) else obj for obj in results]
+        return {'results': results, 'errors': errors}
+
+    def bulk_requests(self, operations: list):
+        """Translate the operations of bulk_write into the requests of the driver.
+
+        returns:
+            requests -- list of pymongo write requests (InsertOne, UpdateOne, DeleteOne)
+            documents -- dict mapping the index of each create operation to the document to be inserted (including its _id)
+
+        raises:
+            ValueError -- in case the kind of an operation is unknown
+        """
+        requests, documents = [], {}
+        for index, operation in enumerate(operations):
+            if operation['op'] == 'create':
+                # the _id is generated here, such that the created document can be built locally (see create)
+                documents[index] = dict(operation['data'])
+                documents[index].setdefault('_id', ObjectId())
+                requests.append(InsertOne(documents[index]))
+            elif operation['op'] == 'update':
+                requests.append(UpdateOne({'_id': ObjectId(operation['id'])}, versionUpdate(operation['data'])))
+            elif operation['op'] == 'delete':
+                requests.append(DeleteOne({'_id': ObjectId(operation['id'])}))
+            else:
+                raise ValueError(f'Unknown operation {operation["op"]}')
+        return requests, documents
+
+    def bulk_errors(self, e: BulkWriteError):
+        """Obtain the failures of a bulk write (index, code and message of each failed operation)."""
+        return [{'index': error['index'], 'code': error['code'], 'message': error['errmsg']} for error in e.details.get('writeErrors', [])]
+
+    def bulk_results(self, operations: list, documents: dict, errors: list, ordered: bool):
+        """Determine the result of each operation of a bulk write (see bulk_write) and invalidate the cached copies of the
+        updated and deleted objects.
+
+        returns:
+            results -- list with the inserted document (not yet parsed to a JSON object) of each executed create operation,
+                True for each executed update or delete operation and None for each operation which failed or was not executed
+        """
+        failed = [error['index'] for error in errors]
+        # an ordered bulk write stops at the first failure
+        executed = min(failed, default=len(operations)) if ordered else len(operations)
+
+        results = []
+        for index, operation in enumerate(operations):
+            if operation['op'] != 'create':
+                self.invalidate(operation['id'])
+            if index in failed or index >= executed:
+                results.append(None)
+            elif operation['op'] == 'create':
+                results.append(documents[index])
+            else:
+                results.append(True)
+        return results
+
+    def start_session(self):
+        """Start a client session on the client of this data access object, which allows to execute operations on several collections within a multi-document transaction (requires a replica set, see https://www.mongodb.com/docs/manual/core/transactions/)
+
+        returns:
+            session -- pymongo.client_session.ClientSession to be used as a context manager
+        """
+        return self.collection.database.client.start_session()
+
     def drop(self):
         """Remove the entire collection
 
@@ -169,9 +518,20 @@ class DAO:
         """
         try:
             self.collection.drop()
+            if self.cache is not None:
+                self.cache.clear(self.collection_name)
         except Exception as e:
             raise
 
+    def invalidate(self, id: str):
+        """Remove the object with the given id from the cache of this data access object (if any).
+
+        parameters:
+            id -- id value of the modified object
+        """
+        if self.cache is not None:
+            self.cache.delete(self.collection_name, str(ObjectId(id)))
+
     def to_json(self, data):
         """Transform a MongoDB document into a json object.
 
@@ -181,4 +541,4 @@ class DAO:
         returns:
             dict -- the document converted to JSON
         """
-        return json.loads(json_util.dumps(data))
+        return bsonToJson(data)
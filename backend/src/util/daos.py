@@ -1,9 +1,15 @@
+import asyncio
+
 from src.util.dao import DAO
+from src.util.asyncdao import AsyncDAO
+from src.util.cache import getCache, caches
+from src.util.settings import onReload
+from src.util.clients import getGeneration
 
 daos = {}
 def getDao(collection_name: str):
     """Obtain a data access object of a collection. The purpose of the realization using the singleton pattern is
-    to avoid multiple data access objects for the same collection
+    to avoid multiple data access objects for the same collection. The data access object connects to the database on its first use.
 
     parameters:
         collection_name -- the name of the collection
@@ -12,5 +18,52 @@ def getDao(collection_name: str):
         validator -- DAO to the given collection
     """
     if collection_name not in daos:
-        daos[collection_name] = DAO(collection_name=collection_name)
-    return daos[collection_name]
\ No newline at end of file
+        daos[collection_name] = DAO(collection_name=collection_name, cache=getCache())
+    return daos[collection_name]
+
+# the asynchronous data access objects of each event loop, and the collections prepared per generation of the clients
+asyncdaos = {}
+prepared = set()
+async def getAsyncDao(collection_name: str):
+    """Obtain the asynchronous data access object of a collection for the running event loop (see getDao), since it uses the
+    asyncio client of that loop (see src.util.clients.getAsyncClient). The collection is prepared (i.e., created and indexed)
+    only once per process and client generation.
+
+    parameters:
+        collection_name -- the name of the collection
+
+    returns:
+        dao -- AsyncDAO to the given collection
+    """
+    loop = asyncio.get_running_loop()
+    for other in [other for other in asyncdaos if other.is_closed()]:
+        asyncdaos.pop(other, None)
+
+    loopdaos = asyncdaos.setdefault(loop, {})
+    if collection_name not in loopdaos:
+        dao = AsyncDAO(collection_name=collection_name, cache=getCache())
+        key = (getGeneration(), collection_name)
+        if key not in prepared:
+            # marked in advance, such that concurrent loops do not create the collection twice
+            prepared.add(key)
+            try:
+                await dao.prepare()
+            except Exception:
+                prepared.discard(key)
+                raise
+        loopdaos[collection_name] = dao
+    return loopdaos[collection_name]
+
+
+def recacheOnReload(old, new):
+    """Replace the cache of all data access objects when the cache settings change on a reload of the settings (see
+    src.util.settings.onReload). The new cache starts empty.
+    """
+    if old is None or any(getattr(old, field) != getattr(new, field) for field in ['dao_cache', 'dao_cache_size', 'dao_cache_ttl', 'redis_url']):
+        caches.clear()
+        cache = getCache()
+        for dao in list(daos.values()) + [dao for loopdaos in list(asyncdaos.values()) for dao in loopdaos.values()]:
+            dao.cache = cache
+
+
+onReload(recacheOnReload)
@@ -0,0 +1,98 @@
+# coding=utf-8
+import hashlib
+
+from flask import Response, jsonify, request
+
+# name of the version counter of each document, which is incremented by every update of a data access object (see DAO.update)
+VERSION = '_version'
+
+
+def versionUpdate(update_data: dict):
+    """Extend an update operation such that it increments the version counter of the updated document. Changes of the version
+    counter by the update operation itself (e.g., a client-supplied $set of it, which would conflict with the increment) are
+    removed, as the counter is maintained by the server only.
+
+    parameters:
+        update_data -- dict containing the update operation
+
+    returns:
+        update_data -- a copy of the update operation including the increment
+    """
+    operators = {}
+    for operator, fields in update_data.items():
+        if isinstance(fields, dict):
+            fields = {field: value for field, value in fields.items() if field != VERSION and not field.startswith(f'{VERSION}.')}
+            if len(fields) == 0:
+                continue
+        operators[operator] = fields
+    operators['$inc'] = dict(operators.get('$inc', {}), **{VERSION: 1})
+    return operators
+
+def withVersion(projection: dict = None):
+    """Extend a projection such that it includes the version counter, which the entity tag is computed from. The counter is
+    removed from the response again if it was not requested (see conditionalResponse).
+
+    parameters:
+        projection -- MongoDB projection (or None)
+
+    returns:
+        projection -- the projection including the version counter
+    """
+    if projection is None or all(not value for key, value in projection.items() if key != '_id'):
+        return projection
+    return dict(projection, **{VERSION: 1})
+
+def collectVersions(obj, versions: list):
+    if isinstance(obj, list):
+        for item in obj:
+            collectVersions(item, versions)
+    elif isinstance(obj, dict):
+        if isinstance(obj.get('_id'), dict):
+            versions.append(f"{obj['_id'].get('$oid')}:{obj.get(VERSION, 0)}")
+        for value in obj.values():
+            if isinstance(value, (dict, list)):
+                collectVersions(value, versions)
+
+def computeEtag(obj):
+    """Compute a strong entity tag of a response from the ids and version counters of the contained documents (including
+    populated ones, e.g. the todos of a task) and the query string of the request, without serializing the response. A
+    document without a version counter has version 0.
+
+    parameters:
+        obj -- a document or a list of documents (parsed to JSON objects)
+
+    returns:
+        etag -- the entity tag (without quotes)
+    """
+    versions = []
+    collectVersions(obj, versions)
+    versions.append(request.query_string.decode())
+    return hashlib.sha1('|'.join(versions).encode()).hexdigest()
+
+def withoutVersion(obj):
+    if isinstance(obj, list):
+        return [withoutVersion(item) for item in obj]
+    if isinstance(obj, dict):
+        return {key: value for key, value in obj.items() if key != VERSION}
+    return obj
+
+def conditionalResponse(obj, projection: dict = None):
+    """Respond with the given object and its entity tag (see computeEtag), or with 304 Not Modified and no body if the tag
+    matches the If-None-Match header of the request.
+
+    parameters:
+        obj -- a document or a list of documents (parsed to JSON objects)
+        projection -- the projection requested by the client (before withVersion), such that a version counter which was
+            only added for the entity tag is removed from the response
+
+    returns:
+        response -- flask.Response
+    """
+    etag = computeEtag(obj)
+    # weak comparison, since the client may have received a compressed representation with a weak tag (see src.util.compression)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(withoutVersion(obj) if withVersion(projection) != projection else obj)
+    response.set_etag(etag)
+    return response
@@ -0,0 +1,55 @@
+import json
+import os
+
+from pymongo.errors import OperationFailure
+
+indexes = {}
+def getIndexes(collection_name: str):
+    """Obtain the index specification of a collection which is stored as a json file with the same name next to the validators. Each
+    index is a dict containing the indexed fields and their sort order under the key 'keys' and optional index options (e.g., 'unique',
+    see https://www.mongodb.com/docs/manual/reference/method/db.collection.createIndex/).
+
+    parameters:
+        collection_name -- the name of the collection, which should also be the filename
+
+    returns:
+        indexes -- list of index specifications (empty if no specification file exists)
+    """
+    if collection_name not in indexes:
+        filename = f'./src/static/indexes/{collection_name}.json'
+        indexes[collection_name] = []
+        if os.path.exists(filename):
+            with open(filename, 'r') as f:
+                indexes[collection_name] = json.load(f)
+    return indexes[collection_name]
+
+def getIndexedCollections():
+    """Obtain the names of all collections for which an index specification exists (see getIndexes).
+
+    returns:
+        collection_names -- sorted list of collection names
+    """
+    return sorted(os.path.splitext(filename)[0] for filename in os.listdir('./src/static/indexes') if filename.endswith('.json'))
+
+def ensureIndexes(dao, collection=None):
+    """Create all indexes specified for the collection of a data access object. Creating an index that already exists has no
+    effect, hence this can be executed at every startup. Indexes which cannot be created (e.g., a unique index on a field that
+    already contains duplicates) are reported but do not prevent the startup.
+
+    parameters:
+        dao -- data access object of the collection
+        collection -- the collection to create the indexes on (default: the collection of the data access object), e.g. while the data access object is being bound
+
+    returns:
+        names -- list of the names of all successfully ensured indexes
+    """
+    if collection is None:
+        collection = dao.collection
+    names = []
+    for spec in getIndexes(dao.collection_name):
+        options = {key: value for key, value in spec.items() if key != 'keys'}
+        try:
+            names.append(collection.create_index(list(spec['keys'].items()), **options))
+        except OperationFailure as e:
+            print(f'Warning: could not create index {spec} on collection {dao.collection_name}: {e}')
+    return names
@@ -0,0 +1,69 @@
+# coding=utf-8
+from flask.json.provider import DefaultJSONProvider
+
+from src.util.settings import getSettings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider of flask which serializes with the optional orjson package (pip install orjson), which is several times
+    faster than the json module of the standard library. The output is equivalent to the default provider: keys are sorted,
+    and values which orjson does not support natively (e.g., datetimes, which flask formats as HTTP dates) are converted by
+    DefaultJSONProvider.default. Non-ASCII characters are written as UTF-8 rather than escaped. Values orjson cannot serialize
+    at all (e.g., integers exceeding 64 bit) fall back to the default provider.
+    """
+    OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson is not None else 0
+
+    def encode(self, obj, indent: bool = False):
+        """Serialize data as JSON to bytes.
+
+        parameters:
+            obj -- the data to serialize
+            indent -- whether to indent the output by two spaces
+
+        returns:
+            bytes -- UTF-8 encoded JSON
+        """
+        try:
+            return orjson.dumps(obj, default=self.default, option=self.OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+        except TypeError:
+            return super().dumps(obj, indent=2 if indent else None, separators=None if indent else (',', ':')).encode()
+
+    def dumps(self, obj, **kwargs):
+        if len(kwargs.keys() - {'indent', 'separators'}) > 0:
+            # options of the json module are only supported by the default provider
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj, indent=kwargs.get('indent') is not None).decode()
+
+    def loads(self, s, **kwargs):
+        if len(kwargs) > 0:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # encodes directly to bytes instead of building a string which the response has to encode again
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.encode(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+
+def getJsonProvider(app):
+    """Create the JSON provider of the application as configured by the settings: JSON_BACKEND selects 'orjson' (requires the
+    orjson package), 'default' (the json module of the standard library) or 'auto' (orjson if it is installed).
+
+    parameters:
+        app -- the flask application
+
+    returns:
+        provider -- flask.json.provider.JSONProvider
+    """
+    backend = getSettings().json_backend.lower()
+    if backend == 'orjson' and orjson is None:
+        raise ImportError('The orjson JSON backend requires the orjson package (pip install orjson)')
+    if backend == 'orjson' or (backend == 'auto' and orjson is not None):
+        return OrjsonProvider(app)
+    return DefaultJSONProvider(app)
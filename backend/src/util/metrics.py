@@ -0,0 +1,193 @@
+# coding=utf-8
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+
+from src.util.clients import getPoolStats
+from src.util.cache import getCache
+
+# upper bounds (in seconds) of the histogram buckets, fine grained at the lower end to resolve single database round trips
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def formatLabels(names, values, extra: str = None):
+    labels = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        labels.append(extra)
+    return '{' + ','.join(labels) + '}' if len(labels) > 0 else ''
+
+
+class Metric:
+    """Base class of the metrics of the process, which are kept in memory and rendered in the Prometheus text exposition format
+    (see https://prometheus.io/docs/instrumenting/exposition_formats/).
+    """
+    kind = None
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        """
+        parameters:
+            name -- the name of the metric
+            help -- a description of the metric
+            labels -- the names of the labels, the values of which are given on every observation
+        """
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def render(self):
+        """Render the metric in the Prometheus text format.
+
+        returns:
+            lines -- list of lines (without line breaks)
+        """
+        with self.lock:
+            values = {key: self.copy(value) for key, value in self.values.items()}
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        for key, value in values.items():
+            lines.extend(self.samples(key, value))
+        return lines
+
+    def copy(self, value):
+        return value
+
+    def samples(self, key, value):
+        return [f'{self.name}{formatLabels(self.labels, key)} {value}']
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self.lock:
+            self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            observations = self.values.get(labelvalues)
+            if observations is None:
+                # number of observations per bucket (the last one is +Inf), sum and count
+                observations = self.values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            observations[0][index] += 1
+            observations[1] += value
+            observations[2] += 1
+
+    def copy(self, value):
+        return [list(value[0]), value[1], value[2]]
+
+    def samples(self, key, value):
+        counts, total, count = value
+        lines, cumulative = [], 0
+        for bound, n in zip(list(self.buckets) + ['+Inf'], counts):
+            cumulative += n
+            le = f'le="{bound}"'
+            lines.append(f'{self.name}_bucket{formatLabels(self.labels, key, le)} {cumulative}')
+        lines.append(f'{self.name}_sum{formatLabels(self.labels, key)} {total}')
+        lines.append(f'{self.name}_count{formatLabels(self.labels, key)} {count}')
+        return lines
+
+
+requestDuration = Histogram('edutask_http_request_duration_seconds', 'Duration of the HTTP requests per route', ('method', 'route', 'status'))
+daoDuration = Histogram('edutask_dao_operation_duration_seconds', 'Duration of the operations of the data access objects', ('collection', 'operation'))
+daoErrors = Counter('edutask_dao_errors_total', 'Number of operations of the data access objects which raised an exception', ('collection', 'operation'))
+registry = [requestDuration, daoDuration, daoErrors]
+
+
+def instrumented(operation: str):
+    """Decorator of the methods of a data access object, which records the duration and the failures of every call tagged with
+    the collection of the data access object. Supports plain methods as well as coroutines (see src.util.asyncdao).
+
+    parameters:
+        operation -- the name of the operation (e.g., 'findOne')
+    """
+    def decorator(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def wrapper(self, *args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await method(self, *args, **kwargs)
+                except Exception:
+                    daoErrors.inc(self.collection_name, operation)
+                    raise
+                finally:
+                    daoDuration.observe(time.perf_counter() - start, self.collection_name, operation)
+        else:
+            @functools.wraps(method)
+            def wrapper(self, *args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return method(self, *args, **kwargs)
+                except Exception:
+                    daoErrors.inc(self.collection_name, operation)
+                    raise
+                finally:
+                    daoDuration.observe(time.perf_counter() - start, self.collection_name, operation)
+        return wrapper
+    return decorator
+
+
+def observeRequest(method: str, route: str, status: int, duration: float):
+    """Record the duration of a handled HTTP request.
+
+    parameters:
+        method -- the HTTP method
+        route -- the URL rule which matched the request (e.g., /tasks/ofuser/<id>), such that the number of label values is bounded
+        status -- the status code of the response
+        duration -- the duration in seconds
+    """
+    requestDuration.observe(duration, method, route, str(status))
+
+
+def gauge(name: str, help: str, kind: str, samples: list):
+    lines = [f'# HELP {name} {help}', f'# TYPE {name} {kind}']
+    lines.extend(f'{name}{formatLabels(labelnames, labelvalues)} {value}' for labelnames, labelvalues, value in samples)
+    return lines
+
+def renderMetrics():
+    """Render all metrics of this process in the Prometheus text format: the recorded request and data access object metrics
+    plus the current state of the connection pools (see src.util.clients.getPoolStats) and the counters of the cache (see
+    src.util.cache). Note that every worker process of a pre-fork server keeps its own metrics.
+
+    returns:
+        text -- the metrics in the Prometheus text format
+    """
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+
+    pools = getPoolStats()
+    server = ('server',)
+    lines.extend(gauge('edutask_mongo_pool_connections', 'Number of open connections of the pool', 'gauge',
+        [(server, (address, ), stats['connections']) for address, stats in pools.items()]))
+    lines.extend(gauge('edutask_mongo_pool_checked_out', 'Number of connections of the pool currently in use', 'gauge',
+        [(server, (address, ), stats['checked_out']) for address, stats in pools.items()]))
+    lines.extend(gauge('edutask_mongo_pool_checkout_failures_total', 'Number of failed connection checkouts', 'counter',
+        [(server, (address, ), stats['checkout_failures']) for address, stats in pools.items()]))
+    lines.extend(gauge('edutask_mongo_heartbeat_up', 'Whether the latest heartbeat of the server succeeded', 'gauge',
+        [(server, (address, ), int(stats['heartbeat'] == 'succeeded')) for address, stats in pools.items() if stats['heartbeat'] is not None]))
+    lines.extend(gauge('edutask_mongo_heartbeat_duration_seconds', 'Duration of the latest heartbeat of the server', 'gauge',
+        [(server, (address, ), stats['heartbeat_ms'] / 1000) for address, stats in pools.items() if stats['heartbeat_ms'] is not None]))
+
+    cache = getCache()
+    cachestats = cache.stats() if cache is not None else {}
+    for counter in ['hits', 'misses']:
+        lines.extend(gauge(f'edutask_dao_cache_{counter}_total', f'Number of cache {counter} of findOne', 'counter',
+            [(('collection', ), (collection_name, ), counters[counter]) for collection_name, counters in cachestats.items()]))
+
+    return '\n'.join(lines) + '\n'
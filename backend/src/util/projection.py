@@ -0,0 +1,50 @@
+def parseFields(fields: str):
+    """Convert a comma-separated list of field names (e.g., the fields query parameter of a request) into a MongoDB projection
+    (see https://www.mongodb.com/docs/manual/tutorial/project-fields-from-query-results/). The _id is always included.
+
+    parameters:
+        fields -- comma-separated field names, e.g. 'title,description'
+
+    returns:
+        projection -- dict mapping each field name to 1
+        None -- if no fields are given
+    """
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(',') if name.strip() != '']
+    if len(names) == 0:
+        return None
+    return {name: 1 for name in names}
+
+def isSimple(projection: dict):
+    """Check whether a projection only includes or only excludes top-level fields, such that it can be applied to a document in memory.
+
+    parameters:
+        projection -- MongoDB projection
+
+    returns:
+        True -- if the projection can be applied by project
+        False -- otherwise (e.g., for dotted field names or projection operators)
+    """
+    values = {bool(value) for key, value in projection.items() if key != '_id'}
+    return len(values) <= 1 \
+        and all('.' not in key and not key.startswith('$') for key in projection) \
+        and all(isinstance(value, (int, bool)) for value in projection.values())
+
+def project(obj: dict, projection: dict):
+    """Apply a simple projection (see isSimple) to a document in memory, like the database would do.
+
+    parameters:
+        obj -- the document
+        projection -- MongoDB projection
+
+    returns:
+        object -- the projected document
+    """
+    if obj is None or projection is None:
+        return obj
+    include = [key for key, value in projection.items() if key != '_id' and value]
+    exclude = [key for key, value in projection.items() if not value]
+    if len(include) > 0:
+        return {key: value for key, value in obj.items() if key in include or (key == '_id' and '_id' not in exclude)}
+    return {key: value for key, value in obj.items() if key not in exclude}
@@ -0,0 +1,68 @@
+# coding=utf-8
+import json
+import math
+from datetime import datetime
+
+from bson import json_util
+from bson.objectid import ObjectId
+
+# types which are represented identically in BSON and JSON
+PLAIN_TYPES = (str, int, bool, type(None))
+EPOCH = datetime(1970, 1, 1)
+
+
+def bsonToJson(data):
+    """Transform a MongoDB document (or any BSON value) into a json object. The result is identical to
+    json.loads(json_util.dumps(data)) in the default relaxed extended JSON mode (e.g., ObjectIds become {'$oid': ...} and
+    datetimes become {'$date': ...}), but the document is walked only once instead of being dumped to a string and parsed again.
+    Rare BSON types (e.g., Decimal128, Binary or Regex) are delegated to bson.json_util.
+
+    parameters:
+        data -- the MongoDB document or BSON value
+
+    returns:
+        object -- the value converted to JSON
+    """
+    if type(data) is dict:
+        return {key: value if type(value) in PLAIN_TYPES else bsonToJson(value) for key, value in data.items()}
+    if type(data) is list:
+        return [value if type(value) in PLAIN_TYPES else bsonToJson(value) for value in data]
+    if isinstance(data, PLAIN_TYPES):
+        return data
+    if type(data) is ObjectId:
+        return {'$oid': str(data)}
+    if type(data) is datetime and data.tzinfo is None and data >= EPOCH:
+        return {'$date': dateToJson(data)}
+    if type(data) is float and math.isfinite(data):
+        return data
+    if isinstance(data, dict) or type(data) is tuple:
+        return bsonToJson(dict(data) if isinstance(data, dict) else list(data))
+
+    return json.loads(json_util.dumps(data))
+
+
+def jsonToBson(data):
+    """Transform a json object in the extended JSON form produced by bsonToJson back into a MongoDB document (e.g., {'$oid': ...}
+    becomes an ObjectId and {'$date': ...} a datetime), such that it can be written to the database.
+
+    parameters:
+        data -- the json object
+
+    returns:
+        object -- the MongoDB document
+    """
+    return json.loads(json.dumps(data), object_hook=json_util.object_hook)
+
+
+def dateToJson(date: datetime):
+    """Format a naive (i.e., UTC) datetime after the epoch as ISO-8601 string with millisecond precision, as done by bson.json_util.
+
+    parameters:
+        date -- naive datetime
+
+    returns:
+        str -- the formatted date, e.g. 2023-01-01T12:00:00.123Z
+    """
+    millis = date.microsecond // 1000
+    fracsecs = f'.{millis:03d}' if millis else ''
+    return f'{date.year:04d}-{date.month:02d}-{date.day:02d}T{date.hour:02d}:{date.minute:02d}:{date.second:02d}{fracsecs}Z'
@@ -0,0 +1,132 @@
+# coding=utf-8
+import os
+import signal
+import threading
+from dataclasses import dataclass, fields
+
+from dotenv import dotenv_values
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Immutable configuration of the server. Each field is read from the environment variable of the same name in upper case
+    (e.g., mongo_max_pool_size from MONGO_MAX_POOL_SIZE), which takes precedence over the local .env file, and falls back to
+    the default value given here.
+    """
+    version: str = None
+    mongo_url: str = None
+    # connection pool of the MongoDB clients (see src.util.clients)
+    mongo_max_pool_size: int = 50
+    mongo_min_pool_size: int = 0
+    mongo_wait_queue_timeout_ms: int = 2000
+    mongo_max_idle_time_ms: int = 60000
+    # command monitoring of the MongoDB clients (see src.util.commands)
+    mongo_command_monitoring: bool = False
+    mongo_slow_query_ms: float = 100
+    mongo_nplusone_threshold: int = 10
+    # cache in front of the reads of the data access objects (see src.util.cache)
+    dao_cache: str = 'none'
+    dao_cache_size: int = 1024
+    dao_cache_ttl: float = 30
+    redis_url: str = 'redis://localhost:6379/0'
+    # serialization and compression of the responses (see src.util.jsonprovider and src.util.compression)
+    json_backend: str = 'auto'
+    compression: str = 'br,gzip'
+    compression_min_size: int = 1024
+    compression_level: int = 6
+    brotli_quality: int = 4
+    # denormalized read model of the tasks (see TaskController.refresh_views)
+    task_view: bool = False
+    # population of a single task with a $lookup aggregation instead of separate queries (see TaskController.get)
+    task_lookup: bool = False
+
+
+def loadSettings(envfile: str = '.env'):
+    """Load the settings from the .env file and the environment variables.
+
+    parameters:
+        envfile -- path of the .env file
+
+    returns:
+        settings -- Settings
+    """
+    values = {**dotenv_values(envfile), **os.environ}
+    config = {}
+    for field in fields(Settings):
+        value = values.get(field.name.upper())
+        if value is None:
+            continue
+        if field.type == bool:
+            config[field.name] = value.lower() in ('1', 'true', 'yes', 'on')
+        elif field.type in (int, float):
+            config[field.name] = field.type(value)
+        else:
+            config[field.name] = value
+    return Settings(**config)
+
+
+settings = None
+listeners = []
+lock = threading.Lock()
+# set by the signal handler of installReloadSignal, the reload itself is performed by the next call of getSettings
+pending = False
+
+def getSettings():
+    """Obtain the settings of the process, which are loaded once on first use and then served from memory until they are
+    explicitly reloaded (see reloadSettings) or a reload was requested by a signal (see installReloadSignal).
+
+    returns:
+        settings -- Settings
+    """
+    global settings, pending
+    if pending:
+        with lock:
+            # only one thread performs the requested reload
+            requested, pending = pending, False
+        if requested:
+            return reloadSettings()
+    if settings is None:
+        with lock:
+            if settings is None:
+                settings = loadSettings()
+    return settings
+
+def reloadSettings():
+    """Load the settings again and notify all listeners registered via onReload.
+
+    returns:
+        settings -- the reloaded Settings
+    """
+    global settings
+    with lock:
+        old, settings = settings, loadSettings()
+    for listener in listeners:
+        listener(old, settings)
+    return settings
+
+def onReload(listener):
+    """Register a function which is called with the old and the new settings whenever the settings are reloaded.
+
+    parameters:
+        listener -- function accepting two Settings (the old one may be None)
+    """
+    listeners.append(listener)
+
+def requestReload(signum=None, frame=None):
+    """Request a reload of the settings, which is performed by the next call of getSettings. Safe to be called from a signal
+    handler, which interrupts the main thread at an arbitrary point (e.g., while it holds the lock of the settings), since it
+    only sets a flag.
+    """
+    global pending
+    pending = True
+
+def installReloadSignal(signum: int = getattr(signal, 'SIGUSR2', None)):
+    """Reload the settings whenever the process receives the given signal (by default SIGUSR2, e.g. kill -USR2 <pid>), which
+    takes effect with the next request (see requestReload). Must be called from the main thread of each process that serves
+    requests (for gunicorn, see post_worker_init in gunicorn.conf.py).
+
+    parameters:
+        signum -- the number of the signal
+    """
+    if signum is not None:
+        signal.signal(signum, requestReload)
@@ -0,0 +1,39 @@
+# coding=utf-8
+import threading
+import time
+from contextlib import contextmanager
+
+# point in time at which the server process started loading its modules
+started = time.perf_counter()
+timings = []
+lock = threading.Lock()
+
+@contextmanager
+def timed(name: str):
+    """Measure the duration of a startup phase (e.g., creating the application or binding a data access object) and record it
+    for the startup timing report.
+
+    parameters:
+        name -- the name of the phase
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        with lock:
+            timings.append({'phase': name, 'start_ms': round((start - started) * 1000, 2), 'duration_ms': round((time.perf_counter() - start) * 1000, 2)})
+
+def getTimings():
+    """Obtain the recorded startup phases.
+
+    returns:
+        timings -- list of dicts containing the name of each phase, its start relative to the process start and its duration (in ms)
+    """
+    with lock:
+        return list(timings)
+
+def printTimings():
+    """Print the startup timing report, which lists all phases recorded so far."""
+    print('Startup timing report:')
+    for timing in getTimings():
+        print(f"  {timing['phase']:<30} started after {timing['start_ms']:>9.2f} ms, took {timing['duration_ms']:>9.2f} ms")
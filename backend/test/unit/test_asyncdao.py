@@ -0,0 +1,49 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson.objectid import ObjectId
+from pymongo.errors import BulkWriteError
+from src.util.asyncdao import AsyncDAO
+from src.util.cache import LRUCache
+
+class TestAsyncDAO:
+    @pytest.fixture
+    def dao(self):
+        """Fixture that creates an AsyncDAO for the user collection on a mocked motor client."""
+        with patch('src.util.asyncdao.getAsyncClient') as mockedgetAsyncClient:
+            collection = MagicMock()
+            collection.replace_one = AsyncMock()
+            collection.bulk_write = AsyncMock()
+            mockedgetAsyncClient.return_value.edutask.__getitem__.return_value = collection
+            dao = AsyncDAO(collection_name='user', cache=LRUCache())
+            yield dao
+
+    @pytest.mark.unit
+    def test_replace_is_awaited(self, dao):
+        """test case 1: a replacement is awaited on the motor collection and invalidates the cached copy"""
+        id = ObjectId()
+        dao.cache.set('user', str(id), {'email': 'a'})
+        document = {'_id': id, '_version': 1, 'email': 'b'}
+
+        assert asyncio.run(dao.replace(str(id), document, upsert=True)) is dao.collection.replace_one.return_value.acknowledged
+
+        dao.collection.replace_one.assert_awaited_once_with({'_id': id}, document, upsert=True)
+        assert dao.cache.get('user', str(id)) is None
+
+    @pytest.mark.unit
+    def test_bulk_write_ordered_stops_at_failure(self, dao):
+        """test case 2: a bulk write is awaited on the motor collection and reports the operations executed before the first failure"""
+        ids = [str(ObjectId()) for _ in range(2)]
+        dao.collection.bulk_write.side_effect = BulkWriteError({'writeErrors': [{'index': 1, 'code': 121, 'errmsg': 'Document failed validation'}]})
+        operations = [
+            {'op': 'create', 'data': {'email': 'c'}},
+            {'op': 'update', 'id': ids[0], 'data': {'$set': {'email': 1}}},
+            {'op': 'delete', 'id': ids[1]}
+        ]
+
+        result = asyncio.run(dao.bulk_write(operations))
+
+        dao.collection.bulk_write.assert_awaited_once()
+        assert result['results'][0]['email'] == 'c' and '_id' in result['results'][0]
+        assert result['results'][1:] == [None, None]
+        assert result['errors'] == [{'index': 1, 'code': 121, 'message': 'Document failed validation'}]
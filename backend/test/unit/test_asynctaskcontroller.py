@@ -0,0 +1,71 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock
+from src.controllers.asynctaskcontroller import AsyncTaskController
+
+class TestAsyncTaskController:
+    @pytest.fixture
+    def task_controller(self):
+        """Fixture that creates an AsyncTaskController with mocked asynchronous DAOs."""
+        return AsyncTaskController(tasks_dao=AsyncMock(), videos_dao=AsyncMock(), todos_dao=AsyncMock(), users_dao=AsyncMock())
+
+    @pytest.fixture
+    def task(self):
+        return {'_id': {'$oid': 't1'}, 'video': {'$oid': 'v1'}, 'todos': [{'$oid': 'd1'}]}
+
+    @pytest.mark.unit
+    def test_populate_task_fetches_concurrently(self, task_controller, task):
+        """test case 1: the video and the todos are fetched concurrently, i.e., the video fetch can wait for the todo fetch"""
+        todosfetched = asyncio.Event()
+
+        async def findvideos(**kwargs):
+            await asyncio.wait_for(todosfetched.wait(), timeout=1)
+            return [{'_id': {'$oid': 'v1'}, 'url': 'a'}]
+
+        async def findtodos(**kwargs):
+            todosfetched.set()
+            return [{'_id': {'$oid': 'd1'}, 'done': False}]
+
+        task_controller.videos_dao.find.side_effect = findvideos
+        task_controller.todos_dao.find.side_effect = findtodos
+
+        result = asyncio.run(task_controller.populate_task(task))
+
+        assert result['video']['url'] == 'a'
+        assert result['todos'] == [{'_id': {'$oid': 'd1'}, 'done': False}]
+
+    @pytest.mark.unit
+    def test_get_tasks_of_user(self, task_controller, task):
+        """test case 2: the tasks of a user are obtained with one query per collection"""
+        task_controller.users_dao.findOne.return_value = {'tasks': [{'$oid': 't1'}]}
+        task_controller.dao.find.return_value = [task]
+        task_controller.videos_dao.find.return_value = [{'_id': {'$oid': 'v1'}}]
+        task_controller.todos_dao.find.return_value = []
+
+        result = asyncio.run(task_controller.get_tasks_of_user('u1'))
+
+        assert result[0]['video'] == {'_id': {'$oid': 'v1'}}
+        task_controller.videos_dao.find.assert_awaited_once()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('method, args', [
+        ('update', ('t1', {'$set': {'title': 't'}})),
+        ('delete', ('t1',)),
+        ('bulk_write', ([{'op': 'delete', 'id': 't1'}],)),
+        ('refresh_views', (['t1'],)),
+        ('get_all', ())
+    ])
+    def test_writes_not_offered(self, task_controller, method, args):
+        """test case 3: the methods which are not offered asynchronously raise instead of returning un-awaited coroutines"""
+        with pytest.raises(NotImplementedError):
+            getattr(task_controller, method)(*args)
+        task_controller.dao.update.assert_not_called()
+        task_controller.dao.delete.assert_not_called()
+
+    @pytest.mark.unit
+    def test_delete_of_unknown_user(self, task_controller):
+        """test case 4: an unknown user causes no deletions"""
+        task_controller.users_dao.findOne.return_value = None
+
+        assert asyncio.run(task_controller.delete_of_user('u1')) == {'tasks': 0, 'videos': 0, 'todos': 0}
+        task_controller.dao.delete_many.assert_not_called()
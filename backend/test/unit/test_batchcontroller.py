@@ -0,0 +1,114 @@
+import pytest
+from unittest.mock import MagicMock, Mock
+from bson.objectid import ObjectId
+from pymongo.errors import WriteError
+from src.controllers.batchcontroller import BatchController
+
+class TestBatchController:
+    @pytest.fixture
+    def batch_controller(self):
+        """Fixture that creates a BatchController with mocked controllers, the bulk writes of which succeed."""
+        controllers = {name: Mock() for name in ['user', 'task', 'todo']}
+        for controller in controllers.values():
+            controller.bulk_write.side_effect = lambda operations, session=None: {'results': [True] * len(operations), 'errors': []}
+        return BatchController(controllers=controllers, taskcontroller=controllers['task'])
+
+    @pytest.fixture
+    def ids(self):
+        return [str(ObjectId()) for _ in range(3)]
+
+    @pytest.mark.unit
+    def test_execute_groups_consecutive_operations(self, batch_controller, ids):
+        """test case 1: consecutive operations on the same collection are executed with a single bulk write"""
+        operations = [{'op': 'update', 'collection': 'todo', 'id': id, 'data': {'$set': {'done': True}}} for id in ids]
+        operations.append({'op': 'update', 'collection': 'task', 'id': ids[0], 'data': {'$set': {'title': 't'}}})
+
+        results = batch_controller.execute(operations)
+
+        assert results == [{'status': 'ok', 'result': True}] * 4
+        assert batch_controller.controllers['todo'].bulk_write.call_count == 1
+        assert batch_controller.controllers['todo'].bulk_write.call_args.args[0] == operations[:3]
+        batch_controller.controllers['todo'].after_bulk_write.assert_called_once_with(operations[:3])
+        assert batch_controller.controllers['task'].bulk_write.call_count == 1
+
+    @pytest.mark.unit
+    def test_execute_stops_at_failure(self, batch_controller, ids):
+        """test case 2: the operations following a failed operation are skipped"""
+        batch_controller.taskcontroller.create.side_effect = WriteError('Document failed validation', code=121)
+        operations = [
+            {'op': 'create', 'collection': 'task', 'data': {'title': 't'}},
+            {'op': 'delete', 'collection': 'todo', 'id': ids[0]}
+        ]
+
+        results = batch_controller.execute(operations)
+
+        assert results == [{'status': 'error', 'code': 400, 'message': 'Invalid input data', 'error': 'WriteError: Document failed validation'},
+                           {'status': 'skipped'}]
+        batch_controller.controllers['todo'].bulk_write.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('operation', [
+        {'op': 'replace', 'collection': 'todo', 'data': {}},
+        {'op': 'update', 'collection': 'video', 'id': '0' * 24, 'data': {}},
+        {'op': 'delete', 'collection': 'todo', 'id': 'invalid'},
+        {'op': 'update', 'collection': 'todo', 'id': '0' * 24, 'data': {'done': True}},
+        {'op': 'update', 'collection': 'task', 'id': '0' * 24, 'data': {}}
+    ])
+    def test_execute_rejects_malformed_operations(self, batch_controller, operation):
+        """test case 3: a batch containing a malformed operation is rejected before any operation is executed"""
+        with pytest.raises(ValueError):
+            batch_controller.execute([{'op': 'create', 'collection': 'user', 'data': {}}, operation])
+        batch_controller.controllers['user'].bulk_write.assert_not_called()
+
+    @pytest.mark.unit
+    def test_transaction_requires_bulk_operations(self, batch_controller, ids):
+        """test case 4: operations which write to several collections cannot be executed within a transaction"""
+        with pytest.raises(ValueError):
+            batch_controller.execute([{'op': 'delete', 'collection': 'user', 'id': ids[0]}], transaction=True)
+        batch_controller.taskcontroller.dao.start_session.assert_not_called()
+
+    @pytest.fixture
+    def session(self, batch_controller):
+        """Fixture that mimics a session of the task DAO, the transaction of which runs the given callback once."""
+        session = MagicMock()
+        session.with_transaction.side_effect = lambda callback: callback(session)
+        batch_controller.taskcontroller.dao.start_session.return_value = MagicMock()
+        batch_controller.taskcontroller.dao.start_session.return_value.__enter__.return_value = session
+        return session
+
+    @pytest.mark.unit
+    def test_transaction_commits(self, batch_controller, session, ids):
+        """test case 5: the operations of a committed transaction are written within its session and maintain their dependent objects afterwards"""
+        operations = [
+            {'op': 'update', 'collection': 'todo', 'id': ids[0], 'data': {'$set': {'done': True}}},
+            {'op': 'delete', 'collection': 'task', 'id': ids[1]}
+        ]
+
+        results = batch_controller.execute(operations, transaction=True)
+
+        assert results == [{'status': 'ok', 'result': True}] * 2
+        assert batch_controller.controllers['todo'].bulk_write.call_args.kwargs['session'] is session
+        batch_controller.controllers['todo'].after_bulk_write.assert_called_once_with(operations[:1])
+        batch_controller.controllers['task'].after_bulk_write.assert_called_once_with(operations[1:])
+
+    @pytest.mark.unit
+    def test_transaction_aborts(self, batch_controller, session, ids):
+        """test case 6: a failed operation aborts the transaction, only the failure is reported and no dependent objects are maintained"""
+        batch_controller.controllers['task'].bulk_write.side_effect = lambda operations, session=None: {
+            'results': [None], 'errors': [{'index': 0, 'code': 121, 'message': 'Document failed validation'}]}
+        operations = [
+            {'op': 'update', 'collection': 'todo', 'id': ids[0], 'data': {'$set': {'done': True}}},
+            {'op': 'update', 'collection': 'task', 'id': ids[1], 'data': {'$set': {'title': 1}}},
+            {'op': 'delete', 'collection': 'todo', 'id': ids[2]}
+        ]
+
+        results = batch_controller.execute(operations, transaction=True)
+
+        assert results == [
+            {'status': 'aborted'},
+            {'status': 'error', 'code': 400, 'message': 'Invalid input data', 'error': 'WriteError: Document failed validation'},
+            {'status': 'aborted'}
+        ]
+        assert batch_controller.controllers['todo'].bulk_write.call_count == 1
+        batch_controller.controllers['todo'].after_bulk_write.assert_not_called()
+        batch_controller.controllers['task'].after_bulk_write.assert_not_called()
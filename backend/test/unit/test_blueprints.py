@@ -0,0 +1,126 @@
+import pytest
+import asyncio
+from unittest.mock import Mock, patch
+from flask import Flask
+
+import src.util.clients as clients
+import src.util.daos as daos
+from src.blueprints.userblueprint import user_blueprint
+from src.blueprints.taskblueprint import task_blueprint
+from src.blueprints.todoblueprint import todo_blueprint
+from src.blueprints.batchblueprint import batch_blueprint
+from src.blueprints.asynctaskblueprint import async_task_blueprint
+
+class LoopBoundClient:
+    """Stand-in of a motor client, which is bound to the event loop of its first operation and fails on any other loop."""
+
+    def __init__(self, *args, **kwargs):
+        self.loop = None
+        self.edutask = self
+        self.database = self
+        self.close = Mock()
+
+    def __getitem__(self, name):
+        return self
+
+    def check(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        elif self.loop is not loop:
+            raise RuntimeError('Event loop is closed')
+
+    async def list_collection_names(self):
+        self.check()
+        return ['task', 'video', 'todo', 'user']
+
+    async def create_index(self, keys, **options):
+        self.check()
+
+    async def find_one(self, filter, projection=None):
+        self.check()
+        return None
+
+    async def aggregate(self, pipeline):
+        self.check()
+        for obj in []:
+            yield obj
+
+class TestBlueprints:
+    @pytest.fixture
+    def client(self):
+        """Fixture of a test client of an application with the blueprints, the controllers of which are mocked."""
+        app = Flask('test')
+        app.register_blueprint(user_blueprint, url_prefix='/users')
+        app.register_blueprint(task_blueprint, url_prefix='/tasks')
+        app.register_blueprint(todo_blueprint, url_prefix='/todos')
+        app.register_blueprint(batch_blueprint, url_prefix='/batch')
+        with patch('src.blueprints.userblueprint.controller', Mock()) as usercontroller, \
+                patch('src.blueprints.taskblueprint.controller', Mock()) as taskcontroller, \
+                patch('src.blueprints.todoblueprint.controller', Mock()) as todocontroller, \
+                patch('src.blueprints.batchblueprint.controller', Mock()) as batchcontroller:
+            usercontroller.get_all.return_value = []
+            batchcontroller.execute.return_value = [
+                {'status': 'error', 'code': 400, 'message': 'Invalid input data', 'error': 'WriteError: Document failed validation'},
+                {'status': 'skipped'}]
+            for controller in (usercontroller, taskcontroller, todocontroller):
+                # no object matches the id of an update
+                controller.update.return_value = None
+            yield app.test_client()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('query', ['limit=0', 'limit=-1', 'limit=x', 'after=invalid', 'format=ndjson&after=invalid'])
+    def test_get_users_rejects_invalid_pagination(self, client, query):
+        """test case 1: invalid pagination parameters are rejected before a response is started"""
+        assert client.get(f'/users/all?{query}').status_code == 400
+
+    @pytest.mark.unit
+    def test_get_users_empty_page(self, client):
+        """test case 2: an empty page has no cursor to a next page"""
+        response = client.get('/users/all?limit=1')
+
+        assert response.status_code == 200
+        assert 'X-Next-Cursor' not in response.headers
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('url, data', [
+        ('/users/' + '1' * 24, {'firstName': 'Jane'}),
+        ('/tasks/byid/' + '1' * 24, {'data': "{'$set': {'title': 't'}}"}),
+        ('/todos/byid/' + '1' * 24, {'data': "{'$set': {'done': true}}"})
+    ])
+    def test_update_unknown_id(self, client, url, data):
+        """test case 3: the update of an object which does not exist is answered with 404 instead of null"""
+        assert client.put(url, data=data).status_code == 404
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('body', ['[]', '"operations"', 'null', 'invalid'])
+    def test_batch_rejects_body_without_object(self, client, body):
+        """test case 4: a batch the body of which is no JSON object is rejected"""
+        assert client.post('/batch', data=body, content_type='application/json').status_code == 400
+
+    @pytest.mark.unit
+    def test_batch_logs_causes_of_failures(self, client, capsys):
+        """test case 5: the cause of a failed operation of a batch is logged instead of returned to the client"""
+        response = client.post('/batch', json={'operations': []})
+
+        assert response.get_json() == {'results': [{'status': 'error', 'code': 400, 'message': 'Invalid input data'}, {'status': 'skipped'}]}
+        assert 'WriteError: Document failed validation' in capsys.readouterr().out
+
+    @pytest.mark.unit
+    def test_async_routes_on_new_event_loops(self):
+        """test case 6: the coroutine routes serve consecutive requests, each of which runs on a new event loop under WSGI"""
+        app = Flask('test')
+        app.register_blueprint(async_task_blueprint, url_prefix='/async/tasks')
+        clients.resetClients(close=False)
+        daos.asyncdaos.clear()
+        created = []
+        with patch('src.util.clients.motor_asyncio.AsyncIOMotorClient', side_effect=lambda *args, **kwargs: created.append(LoopBoundClient()) or created[-1]):
+            responses = [app.test_client().get('/async/tasks/byid/' + '1' * 24) for _ in range(2)]
+        clients.resetClients(close=False)
+        daos.asyncdaos.clear()
+
+        assert [response.status_code for response in responses] == [200, 200]
+        assert len(created) == 2
+        # the client of the closed event loop of the first request is closed by the second one
+        created[0].close.assert_called_once()
+        created[1].close.assert_not_called()
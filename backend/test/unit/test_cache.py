@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import patch
+from src.util.cache import LRUCache
+
+class TestLRUCache:
+    @pytest.fixture
+    def cache(self):
+        return LRUCache(maxsize=2, ttl=30)
+
+    @pytest.mark.unit
+    def test_hit_returns_copy(self, cache):
+        """test case 1: a cached document is returned as a copy and counted as hit"""
+        cache.set('user', '1', {'tasks': []})
+        obj = cache.get('user', '1')
+        obj['tasks'].append('x')
+
+        assert cache.get('user', '1') == {'tasks': []}
+        assert cache.stats() == {'user': {'hits': 2, 'misses': 0}}
+
+    @pytest.mark.unit
+    def test_miss(self, cache):
+        """test case 2: an unknown document is counted as miss"""
+        assert cache.get('user', '1') is None
+        assert cache.stats() == {'user': {'hits': 0, 'misses': 1}}
+
+    @pytest.mark.unit
+    def test_expiry(self, cache):
+        """test case 3: a document expires after the ttl"""
+        with patch('src.util.cache.time.monotonic') as mockedmonotonic:
+            mockedmonotonic.return_value = 0
+            cache.set('user', '1', {})
+            mockedmonotonic.return_value = 31
+            assert cache.get('user', '1') is None
+
+    @pytest.mark.unit
+    def test_eviction_of_least_recently_used(self, cache):
+        """test case 4: exceeding the maximum size evicts the least recently used document"""
+        cache.set('user', '1', {})
+        cache.set('user', '2', {})
+        cache.get('user', '1')
+        cache.set('user', '3', {})
+
+        assert cache.get('user', '2') is None
+        assert cache.get('user', '1') == {}
+
+    @pytest.mark.unit
+    def test_clear_collection(self, cache):
+        """test case 5: clearing a collection only removes its documents"""
+        cache.set('user', '1', {})
+        cache.set('task', '1', {})
+        cache.clear('user')
+
+        assert cache.get('user', '1') is None
+        assert cache.get('task', '1') == {}
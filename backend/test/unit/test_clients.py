@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import patch, Mock
+
+import src.util.clients as clients
+from src.util.settings import reloadSettings
+
+class TestClients:
+    @pytest.fixture
+    def mockedclient(self, monkeypatch):
+        """Fixture that patches the pymongo.MongoClient within the clients module and starts with an empty registry."""
+        monkeypatch.setenv("MONGO_URL", "mongodb://localhost:27017")
+        reloadSettings()
+        clients.resetClients(close=False)
+        with patch('src.util.clients.pymongo.MongoClient') as mockedMongoClient:
+            yield mockedMongoClient
+        monkeypatch.undo()
+        reloadSettings()
+        clients.resetClients(close=False)
+
+    @pytest.mark.unit
+    def test_client_is_shared(self, mockedclient):
+        """test case 1: repeated calls obtain the same client"""
+        assert clients.getClient() == clients.getClient()
+        assert mockedclient.call_count == 1
+
+    @pytest.mark.unit
+    def test_pool_options_from_environment(self, mockedclient, monkeypatch):
+        """test case 2: the pool configuration is taken from the environment"""
+        monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "7")
+        reloadSettings()
+        clients.getClient()
+
+        _, kwargs = mockedclient.call_args
+        assert kwargs['maxPoolSize'] == 7
+        assert kwargs['connect'] == False
+
+    @pytest.mark.unit
+    def test_reinit_after_fork(self, mockedclient):
+        """test case 3: the fork hook discards the client without closing it and advances the generation"""
+        client = clients.getClient()
+        generation = clients.getGeneration()
+
+        clients.reinitAfterFork()
+
+        client.close.assert_not_called()
+        assert clients.getGeneration() == generation + 1
+        clients.getClient()
+        assert mockedclient.call_count == 2
+
+    @pytest.mark.unit
+    def test_reset_closes_after_grace_period(self, mockedclient):
+        """test case 4: clients replaced on a reload are closed only after a grace period"""
+        client = clients.getClient()
+        with patch('src.util.clients.threading.Timer') as mockedTimer:
+            clients.resetClients(grace=60)
+
+        client.close.assert_not_called()
+        mockedTimer.assert_called_once_with(60, clients.closeClients, [[client]])
+        mockedTimer.return_value.start.assert_called_once()
+
+    @pytest.mark.unit
+    def test_pool_stats_from_events(self):
+        """test case 5: the pool monitor maintains the state of each server from the monitoring events"""
+        monitor = clients.PoolMonitor()
+        address = ('localhost', 27017)
+
+        monitor.connection_created(Mock(address=address))
+        monitor.connection_created(Mock(address=address))
+        monitor.connection_checked_out(Mock(address=address))
+        monitor.failed(Mock(connection_id=address, duration=0.5))
+
+        assert monitor.stats()['localhost:27017']['connections'] == 2
+        assert monitor.stats()['localhost:27017']['checked_out'] == 1
+        assert monitor.stats()['localhost:27017']['heartbeat'] == 'failed'
@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import Mock
+from bson.objectid import ObjectId
+
+from src.util.commands import CommandMonitor, redact, startQueries, finishQueries
+
+def started(request_id, command_name='find', command=None):
+    return Mock(command_name=command_name, command=command or {'find': 'task', 'filter': {'_id': {'$in': [ObjectId()]}}},
+        connection_id=('localhost', 27017), request_id=request_id)
+
+class TestCommands:
+    @pytest.mark.unit
+    def test_redact_filter(self):
+        """test case 1: the shape of a filter keeps the field names and operators but no values"""
+        shape = redact({'$and': [{'email': 'jane.doe@gmail.com'}, {'_id': {'$in': [ObjectId(), ObjectId()]}}]})
+        assert shape == {'$and': [{'email': '?'}, {'_id': {'$in': '?'}}]}
+
+    @pytest.mark.unit
+    def test_slow_query_is_logged(self, monkeypatch, capsys):
+        """test case 2: a command slower than the threshold is logged with its collection and redacted filter"""
+        monkeypatch.setattr('src.util.commands.getSettings', lambda: Mock(mongo_slow_query_ms=100))
+        monitor = CommandMonitor()
+
+        monitor.started(started(1))
+        monitor.succeeded(Mock(command_name='find', connection_id=('localhost', 27017), request_id=1, duration_micros=50000))
+        monitor.started(started(2))
+        monitor.succeeded(Mock(command_name='find', connection_id=('localhost', 27017), request_id=2, duration_micros=250000))
+
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 1
+        assert '"event": "slow_query"' in lines[0]
+        assert '"collection": "task"' in lines[0]
+        assert '"filter": {"_id": {"$in": "?"}}' in lines[0]
+
+    @pytest.mark.unit
+    def test_nplusone_is_flagged(self, monkeypatch, capsys):
+        """test case 3: repeating the same command on the same collection within a request is flagged"""
+        monkeypatch.setattr('src.util.commands.getSettings', lambda: Mock(mongo_nplusone_threshold=3))
+        monitor = CommandMonitor()
+
+        startQueries()
+        for request_id in range(3):
+            monitor.started(started(request_id))
+        monitor.started(started(3, 'insert', {'insert': 'todo'}))
+        count = finishQueries('/tasks/ofuser/<id>')
+
+        assert count == 4
+        output = capsys.readouterr().out
+        assert '"event": "n_plus_one"' in output
+        assert '"collection": "task"' in output
+        assert '"collection": "todo"' not in output
@@ -0,0 +1,53 @@
+import pytest
+import gzip
+from flask import Flask, jsonify
+
+from src.util.compression import compressResponse
+from src.util.jsonprovider import OrjsonProvider, orjson
+from src.util.settings import reloadSettings
+
+class TestCompression:
+    @pytest.fixture
+    def app(self, monkeypatch):
+        """Fixture of an application which compresses its responses with gzip from 100 bytes on."""
+        monkeypatch.setenv('COMPRESSION', 'gzip')
+        monkeypatch.setenv('COMPRESSION_MIN_SIZE', '100')
+        reloadSettings()
+        app = Flask('test')
+        app.after_request(compressResponse)
+        app.add_url_rule('/small', 'small', view_func=lambda: jsonify({'a': 1}))
+        app.add_url_rule('/large', 'large', view_func=lambda: jsonify([{'description': 'Watch video'}] * 100))
+        yield app
+        monkeypatch.undo()
+        reloadSettings()
+
+    @pytest.mark.unit
+    def test_large_response_is_compressed(self, app):
+        """test case 1: a large response is compressed if the client accepts gzip"""
+        response = app.test_client().get('/large', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.get_data()).startswith(b'[{"description"')
+        assert response.headers['Content-Length'] == str(len(response.get_data()))
+
+    @pytest.mark.unit
+    def test_small_response_is_not_compressed(self, app):
+        """test case 2: a response below the threshold is not compressed"""
+        response = app.test_client().get('/small', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+        assert response.headers['Vary'] == 'Accept-Encoding'
+
+    @pytest.mark.unit
+    def test_encoding_not_accepted(self, app):
+        """test case 3: a response is not compressed if the client does not accept any configured coding"""
+        response = app.test_client().get('/large', headers={'Accept-Encoding': 'br'})
+        assert 'Content-Encoding' not in response.headers
+
+    @pytest.mark.unit
+    def test_orjson_provider_matches_default(self):
+        """test case 4: the orjson provider produces the same output as the default provider"""
+        if orjson is None:
+            pytest.skip('orjson is not installed')
+        app = Flask('test')
+        data = {'b': [1, 2.5, None, True], 'a': {'$oid': '0' * 24}, 'c': 2 ** 70}
+        with app.app_context():
+            assert OrjsonProvider(app).dumps(data) == app.json.dumps(data, separators=(',', ':'))
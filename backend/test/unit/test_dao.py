@@ -0,0 +1,192 @@
+import pytest
+import threading
+import time
+from unittest.mock import MagicMock, patch
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from src.util.dao import DAO
+from src.util.cache import LRUCache
+
+class TestDAO:
+    @pytest.fixture
+    def dao(self):
+        """Fixture that creates a DAO for the user collection on a mocked client."""
+        with patch('src.util.dao.getClient') as mockedgetClient:
+            database = MagicMock()
+            database.list_collection_names.return_value = ['user']
+            mockedgetClient.return_value.edutask = database
+            dao = DAO(collection_name='user')
+            yield dao
+
+    @pytest.fixture
+    def data(self):
+        return {'firstName': 'Jane', 'lastName': 'Doe', 'email': 'jane.doe@gmail.com'}
+
+    @pytest.fixture
+    def inserted_id(self, dao):
+        """Fixture that mimics insert_one, which adds the generated _id to the inserted document."""
+        inserted_id = ObjectId()
+        def insert_one(document):
+            document['_id'] = inserted_id
+            return MagicMock(inserted_id=inserted_id)
+        dao.collection.insert_one.side_effect = insert_one
+        return inserted_id
+
+    @pytest.mark.unit
+    def test_create_builds_document_locally(self, dao, data, inserted_id):
+        """test case 1: the created document is built without a refetch"""
+        result = dao.create(data)
+
+        dao.collection.find_one.assert_not_called()
+        assert result == {**data, '_id': {'$oid': str(inserted_id)}}
+        assert '_id' not in data
+
+    @pytest.mark.unit
+    def test_create_applies_defaults(self, dao, data, inserted_id):
+        """test case 2: default values are added for absent fields only"""
+        dao.defaults = {'tasks': [], 'email': 'default'}
+        result = dao.create(data)
+
+        assert result['tasks'] == []
+        assert result['email'] == data['email']
+
+    @pytest.mark.unit
+    def test_create_refetch(self, dao, data, inserted_id):
+        """test case 3: with refetch enabled, the stored document is returned"""
+        dao.collection.find_one.return_value = {**data, '_id': inserted_id, 'tasks': []}
+        result = dao.create(data, refetch=True)
+
+        dao.collection.find_one.assert_called_once_with({'_id': inserted_id})
+        assert result['tasks'] == []
+
+    @pytest.fixture
+    def bulk(self, dao):
+        """Fixture of three documents where insert_many rejects the second one."""
+        data = [{'email': 'a'}, {'email': 'b'}, {'email': 'c'}]
+        def insert_many(documents, ordered):
+            for document in documents:
+                document['_id'] = ObjectId()
+            raise BulkWriteError({'writeErrors': [{'index': 1, 'code': 121, 'errmsg': 'Document failed validation'}]})
+        dao.collection.insert_many.side_effect = insert_many
+        return data
+
+    @pytest.mark.unit
+    def test_create_many_ordered_stops_at_failure(self, dao, bulk):
+        """test case 4: an ordered bulk creation returns the documents before the failure"""
+        result = dao.create_many(bulk, ordered=True)
+
+        assert [obj['email'] for obj in result['created']] == ['a']
+        assert result['errors'] == [{'index': 1, 'code': 121, 'message': 'Document failed validation'}]
+
+    @pytest.mark.unit
+    def test_create_many_unordered_skips_failure(self, dao, bulk):
+        """test case 5: an unordered bulk creation returns all valid documents"""
+        result = dao.create_many(bulk, ordered=False)
+
+        assert [obj['email'] for obj in result['created']] == ['a', 'c']
+        assert len(result['errors']) == 1
+
+    @pytest.mark.unit
+    def test_create_many_empty(self, dao):
+        """test case 6: creating no documents does not access the database"""
+        assert dao.create_many([]) == {'created': [], 'errors': []}
+        dao.collection.insert_many.assert_not_called()
+
+    @pytest.mark.unit
+    def test_find_keyset_pagination(self, dao):
+        """test case 7: a page starts after the given id, is ordered by _id and limited"""
+        after = ObjectId()
+        cursor = dao.collection.find.return_value
+        cursor.sort.return_value.limit.return_value = iter([{'_id': ObjectId()}])
+
+        result = dao.find(limit=1, after=str(after))
+
+        dao.collection.find.assert_called_once_with({'$and': [{}, {'_id': {'$gt': after}}]}, None)
+        cursor.sort.assert_called_once_with('_id', 1)
+        cursor.sort.return_value.limit.assert_called_once_with(1)
+        assert len(result) == 1
+
+    @pytest.mark.unit
+    def test_findOne_read_through_cache(self, dao):
+        """test case 8: a cached document is read from the database only once until it is updated"""
+        dao.cache = LRUCache()
+        id = ObjectId()
+        dao.collection.find_one.return_value = {'_id': id, 'email': 'a'}
+
+        dao.findOne(str(id))
+        assert dao.findOne(str(id)) == {'_id': {'$oid': str(id)}, 'email': 'a'}
+        assert dao.collection.find_one.call_count == 1
+
+        dao.update(str(id), {'$set': {'email': 'b'}})
+        dao.findOne(str(id))
+        assert dao.collection.find_one.call_count == 2
+
+    @pytest.mark.unit
+    def test_update_return_document(self, dao):
+        """test case 9: the updated document is obtained in the same round trip as the update"""
+        id = ObjectId()
+        dao.collection.find_one_and_update.return_value = {'_id': id, 'email': 'b'}
+
+        result = dao.update(str(id), {'$set': {'email': 'b'}}, return_document=True)
+
+        assert result == {'_id': {'$oid': str(id)}, 'email': 'b'}
+        assert dao.collection.find_one_and_update.call_args.kwargs['return_document'] == ReturnDocument.AFTER
+        dao.collection.update_one.assert_not_called()
+        dao.collection.find_one.assert_not_called()
+
+    @pytest.mark.unit
+    def test_bulk_write_ordered_stops_at_failure(self, dao):
+        """test case 10: a bulk write returns the result of each operation executed before the first failure"""
+        dao.cache = LRUCache()
+        ids = [str(ObjectId()) for _ in range(3)]
+        dao.cache.set('user', ids[0], {'email': 'a'})
+        dao.collection.bulk_write.side_effect = BulkWriteError({'writeErrors': [{'index': 2, 'code': 121, 'errmsg': 'Document failed validation'}]})
+        operations = [
+            {'op': 'update', 'id': ids[0], 'data': {'$set': {'email': 'b'}}},
+            {'op': 'create', 'data': {'email': 'c'}},
+            {'op': 'update', 'id': ids[1], 'data': {'$set': {'email': 1}}},
+            {'op': 'delete', 'id': ids[2]}
+        ]
+
+        result = dao.bulk_write(operations)
+
+        requests = dao.collection.bulk_write.call_args.args[0]
+        assert requests[0]._doc == {'$set': {'email': 'b'}, '$inc': {'_version': 1}}
+        assert result['results'][0] is True
+        assert result['results'][1]['email'] == 'c' and '_id' in result['results'][1]
+        assert result['results'][2:] == [None, None]
+        assert result['errors'] == [{'index': 2, 'code': 121, 'message': 'Document failed validation'}]
+        assert dao.cache.get('user', ids[0]) is None
+
+    @pytest.mark.unit
+    def test_concurrent_first_access_binds_once(self):
+        """test case 11: concurrent requests wait for the binding of the collection instead of obtaining none"""
+        with patch('src.util.dao.getClient') as mockedgetClient:
+            database = MagicMock()
+            database.list_collection_names.side_effect = lambda: time.sleep(0.05) or ['user']
+            mockedgetClient.return_value.edutask = database
+            dao = DAO(collection_name='user')
+
+            collections = []
+            threads = [threading.Thread(target=lambda: collections.append(dao.collection)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert collections == [database['user']] * 4
+            assert database.list_collection_names.call_count == 1
+
+    @pytest.mark.unit
+    def test_replace_invalidates_cache(self, dao):
+        """test case 12: a replacement writes the whole document without incrementing the version and invalidates the cached copy"""
+        dao.cache = LRUCache()
+        id = ObjectId()
+        dao.cache.set('user', str(id), {'email': 'a', 'firstName': 'Jane'})
+        document = {'_id': id, '_version': 2, 'email': 'b'}
+
+        assert dao.replace(str(id), document, upsert=True) is dao.collection.replace_one.return_value.acknowledged
+
+        dao.collection.replace_one.assert_called_once_with({'_id': id}, document, upsert=True)
+        assert dao.cache.get('user', str(id)) is None
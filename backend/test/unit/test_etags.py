@@ -0,0 +1,66 @@
+import pytest
+from flask import Flask
+
+from src.util.etags import versionUpdate, withVersion, computeEtag, conditionalResponse
+
+class TestEtags:
+    @pytest.fixture
+    def app(self):
+        return Flask('test')
+
+    @pytest.fixture
+    def task(self):
+        return {'_id': {'$oid': 't1'}, '_version': 2, 'todos': [{'_id': {'$oid': 'd1'}, 'done': False}]}
+
+    @pytest.mark.unit
+    def test_version_update(self):
+        """test case 1: every update increments the version counter in addition to its own increments"""
+        assert versionUpdate({'$set': {'done': True}}) == {'$set': {'done': True}, '$inc': {'_version': 1}}
+        assert versionUpdate({'$inc': {'count': 2}}) == {'$inc': {'count': 2, '_version': 1}}
+
+    @pytest.mark.unit
+    def test_version_update_ignores_client_versions(self):
+        """test case 2: changes of the version counter by the client are removed, such that they do not conflict with the increment"""
+        assert versionUpdate({'$set': {'_version': 7, 'done': True}}) == {'$set': {'done': True}, '$inc': {'_version': 1}}
+        assert versionUpdate({'$set': {'_version': 7}, '$unset': {'_version': ''}}) == {'$inc': {'_version': 1}}
+        assert versionUpdate({'$inc': {'_version': 5}}) == {'$inc': {'_version': 1}}
+
+    @pytest.mark.unit
+    def test_with_version(self):
+        """test case 3: only projections which include fields need to include the version counter explicitly"""
+        assert withVersion(None) is None
+        assert withVersion({'title': 1}) == {'title': 1, '_version': 1}
+        assert withVersion({'todos': 0}) == {'todos': 0}
+
+    @pytest.mark.unit
+    def test_etag_changes_with_populated_documents(self, app, task):
+        """test case 4: the entity tag changes when a populated document is updated"""
+        with app.test_request_context('/tasks/byid/t1'):
+            etag = computeEtag(task)
+            task['todos'][0]['_version'] = 1
+            assert computeEtag(task) != etag
+
+    @pytest.mark.unit
+    def test_not_modified(self, app, task):
+        """test case 5: a request carrying the current entity tag is answered with 304 and no body"""
+        with app.test_request_context('/tasks/byid/t1'):
+            etag = computeEtag(task)
+        with app.test_request_context('/tasks/byid/t1', headers={'If-None-Match': f'"{etag}"'}):
+            response = conditionalResponse(task)
+        assert response.status_code == 304
+        assert response.get_data() == b''
+
+    @pytest.mark.unit
+    def test_version_only_in_requested_fields(self, app, task):
+        """test case 6: the version counter fetched for the entity tag of a projected response is not part of the response"""
+        with app.test_request_context('/tasks/byid/t1?fields=title'):
+            assert '_version' not in conditionalResponse(dict(task, title='t'), projection={'title': 1}).get_json()
+            etag = computeEtag(task)
+        with app.test_request_context('/tasks/byid/t1?fields=title,_version'):
+            assert conditionalResponse(task, projection={'title': 1, '_version': 1}).get_json()['_version'] == 2
+        with app.test_request_context('/tasks/byid/t1'):
+            assert conditionalResponse(task).get_json()['_version'] == 2
+        # the entity tag still changes with the version
+        task['_version'] = 3
+        with app.test_request_context('/tasks/byid/t1?fields=title'):
+            assert computeEtag(task) != etag
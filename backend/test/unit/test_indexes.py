@@ -0,0 +1,37 @@
+import pytest
+from unittest.mock import MagicMock
+from pymongo.errors import OperationFailure
+from src.util.indexes import getIndexes, ensureIndexes, getIndexedCollections
+
+class TestIndexes:
+    @pytest.fixture
+    def dao(self):
+        """Fixture of a mocked DAO of the user collection."""
+        dao = MagicMock()
+        dao.collection_name = 'user'
+        return dao
+
+    @pytest.mark.unit
+    def test_unique_email_index(self, dao):
+        """test case 1: the unique email index of the user collection is created"""
+        ensureIndexes(dao)
+        dao.collection.create_index.assert_any_call([('email', 1)], unique=True)
+
+    @pytest.mark.unit
+    def test_failing_index_does_not_raise(self, dao, capfd):
+        """test case 2: an index that cannot be created is reported instead of raising"""
+        dao.collection.create_index.side_effect = OperationFailure('E11000 duplicate key error')
+        assert ensureIndexes(dao) == []
+
+        out, _ = capfd.readouterr()
+        assert 'Warning' in out
+
+    @pytest.mark.unit
+    def test_missing_specification(self):
+        """test case 3: a collection without specification file has no indexes"""
+        assert getIndexes('nonexistent') == []
+
+    @pytest.mark.unit
+    def test_indexed_collections(self):
+        """test case 4: every collection with a specification file is indexed, including the task read model"""
+        assert getIndexedCollections() == ['task', 'task_view', 'todo', 'user', 'video']
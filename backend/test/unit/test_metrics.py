@@ -0,0 +1,46 @@
+import pytest
+import asyncio
+
+from src.util.metrics import Histogram, instrumented, daoDuration, daoErrors
+
+class Instrumented:
+    collection_name = 'test'
+
+    @instrumented('find')
+    def find(self):
+        return []
+
+    @instrumented('findOne')
+    async def findOne(self):
+        raise ValueError('not found')
+
+class TestMetrics:
+    @pytest.mark.unit
+    def test_histogram_renders_cumulative_buckets(self):
+        """test case 1: the buckets of a histogram are cumulative and include +Inf"""
+        histogram = Histogram('test_seconds', 'Test', ('route', ), buckets=(0.1, 1))
+        histogram.observe(0.05, '/a')
+        histogram.observe(0.5, '/a')
+        histogram.observe(5, '/a')
+
+        lines = histogram.render()
+
+        assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{route="/a",le="1"} 2' in lines
+        assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+        assert 'test_seconds_count{route="/a"} 3' in lines
+
+    @pytest.mark.unit
+    def test_instrumented_method(self):
+        """test case 2: every call of an instrumented method is recorded under its collection and operation"""
+        before = daoDuration.values.get(('test', 'find'), [None, 0, 0])[2]
+        assert Instrumented().find() == []
+        assert daoDuration.values[('test', 'find')][2] == before + 1
+
+    @pytest.mark.unit
+    def test_instrumented_coroutine_counts_errors(self):
+        """test case 3: an instrumented coroutine which raises is counted as an error"""
+        before = daoErrors.values.get(('test', 'findOne'), 0)
+        with pytest.raises(ValueError):
+            asyncio.run(Instrumented().findOne())
+        assert daoErrors.values[('test', 'findOne')] == before + 1
@@ -0,0 +1,23 @@
+import pytest
+from src.util.projection import parseFields, isSimple, project
+
+@pytest.mark.unit
+@pytest.mark.parametrize('fields, expected', [
+    (None, None), ('', None), (' , ', None), ('title', {'title': 1}), ('title, description', {'title': 1, 'description': 1})])
+def test_parseFields(fields, expected):
+    assert parseFields(fields) == expected
+
+@pytest.mark.unit
+@pytest.mark.parametrize('projection, expected', [
+    ({'tasks': 1}, True), ({'tasks': 0}, True), ({'_id': 0, 'tasks': 1}, True),
+    ({'tasks': 1, 'email': 0}, False), ({'video.url': 1}, False), ({'todos': {'$slice': 1}}, False)])
+def test_isSimple(projection, expected):
+    assert isSimple(projection) == expected
+
+@pytest.mark.unit
+@pytest.mark.parametrize('projection, expected', [
+    ({'tasks': 1}, {'_id': 1, 'tasks': []}),
+    ({'_id': 0, 'tasks': 1}, {'tasks': []}),
+    ({'tasks': 0}, {'_id': 1, 'email': 'a'})])
+def test_project(projection, expected):
+    assert project({'_id': 1, 'email': 'a', 'tasks': []}, projection) == expected
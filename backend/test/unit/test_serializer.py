@@ -0,0 +1,23 @@
+import pytest
+import json
+from datetime import datetime, timezone, timedelta
+from bson import json_util, Int64, Decimal128, Regex
+from bson.objectid import ObjectId
+from bson.son import SON
+from src.util.serializer import bsonToJson
+
+@pytest.mark.unit
+@pytest.mark.parametrize('data', [
+    None,
+    {'_id': ObjectId(), 'firstName': 'Jane', 'tasks': [ObjectId(), ObjectId()]},
+    {'startdate': datetime(2023, 4, 1, 12, 30, 5, 123456), 'duedate': datetime(2023, 4, 1)},
+    {'old': datetime(1960, 1, 1), 'aware': datetime(2023, 1, 1, tzinfo=timezone(timedelta(hours=2)))},
+    {'done': True, 'count': 3, 'ratio': 0.5, 'nan': float('nan'), 'inf': float('-inf'), 'long': Int64(5)},
+    {'nested': {'todos': [{'_id': ObjectId(), 'done': False}], 'empty': []}, 'tuple': (1, 'a')},
+    {'decimal': Decimal128('1.1'), 'regex': Regex('^a', 'i'), 'bytes': b'abc', 'son': SON([('b', 1), ('a', ObjectId())])}
+])
+def test_bsonToJson_equivalent_to_json_util(data):
+    """bsonToJson produces the same extended JSON as the json_util dumps/loads round trip"""
+    expected = json.loads(json_util.dumps(data))
+    # NaN never equals itself, hence compare the serialized forms
+    assert json.dumps(bsonToJson(data), sort_keys=True) == json.dumps(expected, sort_keys=True)
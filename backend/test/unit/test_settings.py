@@ -0,0 +1,75 @@
+import pytest
+import dataclasses
+
+from src.util.settings import loadSettings, reloadSettings, requestReload, getSettings, onReload, listeners
+from src.util.cache import LRUCache
+
+class TestSettings:
+    @pytest.mark.unit
+    def test_environment_overrides_envfile(self, tmp_path, monkeypatch):
+        """test case 1: the environment takes precedence over the .env file, values are cast to the type of the field"""
+        envfile = tmp_path / '.env'
+        envfile.write_text('VERSION=1.0\nMONGO_MAX_POOL_SIZE=10\n')
+        monkeypatch.setenv('MONGO_MAX_POOL_SIZE', '20')
+
+        settings = loadSettings(str(envfile))
+
+        assert settings.version == '1.0'
+        assert settings.mongo_max_pool_size == 20
+        assert settings.dao_cache == 'none'
+
+    @pytest.mark.unit
+    def test_settings_are_immutable(self):
+        """test case 2: the settings cannot be modified"""
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            getSettings().version = '2.0'
+
+    @pytest.mark.unit
+    def test_reload_notifies_listeners(self, monkeypatch):
+        """test case 3: a reload loads the changed environment and notifies the listeners"""
+        calls = []
+        onReload(lambda old, new: calls.append((old, new)))
+        monkeypatch.setenv('DAO_CACHE_TTL', '5')
+        try:
+            settings = reloadSettings()
+        finally:
+            listeners.pop()
+            monkeypatch.undo()
+            reloadSettings()
+
+        assert settings.dao_cache_ttl == 5
+        assert calls[0][1] == settings
+
+    @pytest.mark.unit
+    def test_signal_only_requests_reload(self, monkeypatch):
+        """test case 4: the signal handler only requests a reload, which the next access performs"""
+        calls = []
+        onReload(lambda old, new: calls.append(new))
+        monkeypatch.setenv('DAO_CACHE_TTL', '5')
+        try:
+            requestReload()
+            assert calls == []
+            settings = getSettings()
+            assert getSettings() is settings
+        finally:
+            listeners.pop()
+            monkeypatch.undo()
+            reloadSettings()
+
+        assert settings.dao_cache_ttl == 5
+        assert calls == [settings]
+
+    @pytest.mark.unit
+    def test_reload_rebuilds_cache(self, monkeypatch):
+        """test case 5: a changed cache setting replaces the cache of the data access objects"""
+        from src.util.daos import getDao, daos
+        dao = getDao('user')
+        monkeypatch.setenv('DAO_CACHE', 'lru')
+        try:
+            reloadSettings()
+            assert isinstance(dao.cache, LRUCache)
+        finally:
+            monkeypatch.undo()
+            reloadSettings()
+            daos.clear()
+        assert dao.cache is None
@@ -0,0 +1,38 @@
+import pytest
+from unittest.mock import patch
+
+class TestStartup:
+    @pytest.mark.unit
+    def test_create_app_without_database(self):
+        """test case 1: creating the application does not connect to the database"""
+        with patch('src.util.clients.pymongo.MongoClient') as mockedMongoClient, \
+                patch('src.util.clients.motor_asyncio.AsyncIOMotorClient') as mockedAsyncClient:
+            from main import create_app
+            app = create_app()
+
+            assert 'task_blueprint' in app.blueprints
+            mockedMongoClient.assert_not_called()
+            mockedAsyncClient.assert_not_called()
+
+    @pytest.mark.unit
+    def test_startup_timing_report(self, capfd):
+        """test case 2: creating the application records and prints its startup phases"""
+        from main import create_app
+        from src.util.timing import getTimings
+        create_app()
+
+        assert 'create app' in [timing['phase'] for timing in getTimings()]
+        out, _ = capfd.readouterr()
+        assert 'Startup timing report' in out
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('heartbeats, status', [([], 503), (['succeeded'], 200), (['succeeded', 'failed'], 503), ([None], 503)])
+    def test_ready_requires_successful_heartbeat(self, heartbeats, status):
+        """test case 3: the server is only ready once a heartbeat succeeded and none failed"""
+        from main import create_app
+        pools = {f'mongodb{i}:27017': {'heartbeat': heartbeat} for i, heartbeat in enumerate(heartbeats)}
+        with patch('main.getPoolStats', return_value=pools), patch('main.connectInBackground') as mockedconnect:
+            response = create_app().test_client().get('/ready')
+
+        assert response.status_code == status
+        assert mockedconnect.called == ('succeeded' not in heartbeats)
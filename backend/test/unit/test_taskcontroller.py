@@ -0,0 +1,214 @@
+import pytest
+from unittest.mock import Mock
+from pymongo.errors import OperationFailure, WriteError
+from bson.objectid import ObjectId
+from src.controllers.taskcontroller import TaskController, LOOKUP_TODOS
+
+class TestTaskController:
+    @pytest.fixture
+    def task_controller(self):
+        """Fixture that creates a TaskController with mocked DAOs (without a read cache)."""
+        return TaskController(tasks_dao=Mock(cache=None), videos_dao=Mock(), todos_dao=Mock(), users_dao=Mock())
+
+    @pytest.fixture
+    def tasks(self):
+        """Fixture of two unpopulated tasks sharing no references."""
+        return [
+            {'_id': {'$oid': 't1'}, 'video': {'$oid': 'v1'}, 'todos': [{'$oid': 'd1'}, {'$oid': 'd2'}]},
+            {'_id': {'$oid': 't2'}, 'video': {'$oid': 'v2'}, 'todos': [{'$oid': 'd3'}]}
+        ]
+
+    @pytest.fixture
+    def populated(self, task_controller, tasks):
+        """Fixture that populates the tasks with mocked videos and todos."""
+        task_controller.videos_dao.find.return_value = [
+            {'_id': {'$oid': 'v2'}, 'url': 'b'}, {'_id': {'$oid': 'v1'}, 'url': 'a'}]
+        task_controller.todos_dao.find.return_value = [
+            {'_id': {'$oid': 'd3'}}, {'_id': {'$oid': 'd1'}}, {'_id': {'$oid': 'd2'}}]
+        return task_controller.populate_tasks(tasks)
+
+    @pytest.mark.unit
+    def test_populate_tasks_single_query_per_collection(self, task_controller, populated):
+        """test case 1: videos and todos of all tasks are fetched with one query each"""
+        assert task_controller.videos_dao.find.call_count == 1
+        assert task_controller.todos_dao.find.call_count == 1
+        task_controller.videos_dao.findOne.assert_not_called()
+
+    @pytest.mark.unit
+    def test_populate_tasks_assigns_references(self, populated):
+        """test case 2: every task obtains its own video and todos in the order of its references"""
+        assert populated[0]['video']['url'] == 'a'
+        assert populated[1]['video']['url'] == 'b'
+        assert [todo['_id']['$oid'] for todo in populated[0]['todos']] == ['d1', 'd2']
+        assert [todo['_id']['$oid'] for todo in populated[1]['todos']] == ['d3']
+
+    @pytest.mark.unit
+    def test_populate_tasks_empty(self, task_controller):
+        """test case 3: populating no tasks does not query the database"""
+        assert task_controller.populate_tasks([]) == []
+        task_controller.videos_dao.find.assert_not_called()
+        task_controller.todos_dao.find.assert_not_called()
+
+    @pytest.mark.unit
+    def test_create_inserts_todos_at_once(self, task_controller):
+        """test case 4: all todos of a new task are created with a single bulk operation"""
+        task_controller.videos_dao.create.return_value = {'_id': {'$oid': '0' * 24}}
+        task_controller.todos_dao.create_many.return_value = {
+            'created': [{'_id': {'$oid': '1' * 24}}, {'_id': {'$oid': '2' * 24}}], 'errors': []}
+        task_controller.dao.create.return_value = {'_id': {'$oid': '3' * 24}}
+
+        task_controller.create({'userid': '4' * 24, 'title': 't', 'description': 'd', 'url': 'u', 'todos': ['a', 'b']})
+
+        task_controller.todos_dao.create_many.assert_called_once()
+        task_controller.todos_dao.create.assert_not_called()
+        assert len(task_controller.dao.create.call_args.args[0]['todos']) == 2
+
+    @pytest.mark.unit
+    def test_create_invalid_todo(self, task_controller):
+        """test case 5: a todo failing validation raises a WriteError"""
+        task_controller.videos_dao.create.return_value = {'_id': {'$oid': '0' * 24}}
+        task_controller.todos_dao.create_many.return_value = {
+            'created': [], 'errors': [{'index': 0, 'code': 121, 'message': 'Document failed validation'}]}
+
+        with pytest.raises(WriteError):
+            task_controller.create({'userid': '4' * 24, 'title': 't', 'description': 'd', 'url': 'u', 'todos': ['a']})
+
+    @pytest.mark.unit
+    def test_delete_of_user_single_operation_per_collection(self, task_controller, tasks):
+        """test case 6: the dependent objects of all tasks are deleted with one operation per collection"""
+        task_controller.users_dao.findOne.return_value = {'tasks': [{'$oid': 't1'}, {'$oid': 't2'}]}
+        task_controller.dao.find.return_value = tasks
+        task_controller.videos_dao.delete_many.return_value = 2
+        task_controller.todos_dao.delete_many.return_value = 3
+        task_controller.dao.delete_many.return_value = 2
+
+        result = task_controller.delete_of_user('u1')
+
+        assert result == {'videos': 2, 'todos': 3, 'tasks': 2}
+        task_controller.todos_dao.delete_many.assert_called_once_with(['d1', 'd2', 'd3'], session=None)
+        task_controller.dao.delete.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('user', [{}, {'tasks': []}, None])
+    def test_delete_of_user_without_tasks(self, task_controller, user):
+        """test case 7: a user without tasks, or an unknown user, causes no deletions"""
+        task_controller.users_dao.findOne.return_value = user
+
+        assert task_controller.delete_of_user('u1') == {'tasks': 0, 'videos': 0, 'todos': 0}
+        task_controller.dao.find.assert_not_called()
+
+    @pytest.mark.unit
+    def test_create_writes_view_locally(self, task_controller):
+        """test case 8: with the read model enabled, a new task is written to it populated without reading it back"""
+        task_controller.views_dao = Mock()
+        task_controller.videos_dao.create.return_value = {'_id': {'$oid': '0' * 24}, 'url': 'u'}
+        task_controller.todos_dao.create_many.return_value = {
+            'created': [{'_id': {'$oid': '1' * 24}, 'description': 'a', 'done': False}], 'errors': []}
+        task_controller.dao.create.return_value = {'_id': {'$oid': '3' * 24}, 'title': 't', 'video': {'$oid': '0' * 24}, 'todos': [{'$oid': '1' * 24}]}
+
+        task_controller.create({'userid': '4' * 24, 'title': 't', 'description': 'd', 'url': 'u', 'todos': ['a']})
+
+        view = task_controller.views_dao.create.call_args.args[0]
+        assert view['userid'] == ObjectId('4' * 24)
+        assert view['video'] == {'_id': ObjectId('0' * 24), 'url': 'u'}
+        assert view['todos'] == [{'_id': ObjectId('1' * 24), 'description': 'a', 'done': False}]
+        task_controller.dao.find.assert_not_called()
+
+    @pytest.mark.unit
+    def test_get_tasks_of_user_from_view(self, task_controller):
+        """test case 9: with the read model enabled, the tasks of a user are obtained with a single query"""
+        task_controller.views_dao = Mock()
+        task_controller.views_dao.find.return_value = [{'_id': {'$oid': 't1'}}]
+
+        assert task_controller.get_tasks_of_user('4' * 24) == [{'_id': {'$oid': 't1'}}]
+        task_controller.views_dao.find.assert_called_once_with(filter={'userid': ObjectId('4' * 24)}, projection={'userid': 0})
+        task_controller.users_dao.findOne.assert_not_called()
+        task_controller.dao.find.assert_not_called()
+
+    @pytest.mark.unit
+    def test_refresh_views_removes_deleted_tasks(self, task_controller):
+        """test case 10: refreshing the read model replaces the documents of existing tasks and removes those of deleted ones"""
+        task_controller.views_dao = Mock()
+        task_controller.dao.find.return_value = [{'_id': {'$oid': '1' * 24}, '_version': 3, 'title': 't'}]
+        task_controller.users_dao.find.return_value = [{'_id': {'$oid': '4' * 24}, 'tasks': [{'$oid': '1' * 24}]}]
+
+        task_controller.refresh_views(['1' * 24, '2' * 24])
+
+        task_controller.views_dao.replace.assert_called_once_with(
+            '1' * 24, {'_id': ObjectId('1' * 24), '_version': 3, 'title': 't', 'userid': ObjectId('4' * 24)}, upsert=True)
+        task_controller.views_dao.update.assert_not_called()
+        task_controller.views_dao.delete_many.assert_called_once_with(['2' * 24], session=None)
+
+    @pytest.mark.unit
+    def test_create_returns_populated_task(self, task_controller):
+        """test case 11: the new task is returned populated without reading any object back"""
+        task_controller.videos_dao.create.return_value = {'_id': {'$oid': '0' * 24}, 'url': 'u'}
+        task_controller.todos_dao.create_many.return_value = {
+            'created': [{'_id': {'$oid': '1' * 24}, 'description': 'a', 'done': False}], 'errors': []}
+        task_controller.dao.create.return_value = {'_id': {'$oid': '3' * 24}, 'title': 't', 'video': {'$oid': '0' * 24}, 'todos': [{'$oid': '1' * 24}]}
+
+        task = task_controller.create({'userid': '4' * 24, 'title': 't', 'description': 'd', 'url': 'u', 'todos': ['a']}, return_task=True)
+
+        assert task['video'] == {'_id': {'$oid': '0' * 24}, 'url': 'u'}
+        assert task['todos'] == [{'_id': {'$oid': '1' * 24}, 'description': 'a', 'done': False}]
+        task_controller.dao.find.assert_not_called()
+        task_controller.users_dao.findOne.assert_not_called()
+
+    @pytest.mark.unit
+    def test_get_single_aggregation(self, task_controller):
+        """test case 12: a task is populated with a single aggregation, its todos in the order of the references"""
+        task_controller.lookup = True
+        task_controller.dao.aggregate.return_value = [{'_id': {'$oid': '3' * 24}, 'video': {'_id': {'$oid': '0' * 24}, 'url': 'u'},
+            'todos': [{'$oid': '2' * 24}, {'$oid': '1' * 24}], LOOKUP_TODOS: [{'_id': {'$oid': '1' * 24}}, {'_id': {'$oid': '2' * 24}}]}]
+
+        task = task_controller.get('3' * 24, projection={'title': 1})
+
+        pipeline = task_controller.dao.aggregate.call_args.args[0]
+        assert pipeline[:2] == [{'$match': {'_id': ObjectId('3' * 24)}}, {'$project': {'title': 1}}]
+        assert task == {'_id': {'$oid': '3' * 24}, 'video': {'_id': {'$oid': '0' * 24}, 'url': 'u'},
+                        'todos': [{'_id': {'$oid': '2' * 24}}, {'_id': {'$oid': '1' * 24}}]}
+        task_controller.dao.findOne.assert_not_called()
+        task_controller.todos_dao.find.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('error, lookup', [
+        (NotImplementedError('$lookup'), False),
+        (OperationFailure('Unrecognized pipeline stage name', code=40324), False),
+        (OperationFailure('Bad projection specification', code=31253), True)
+    ])
+    def test_get_falls_back_without_lookup(self, task_controller, error, lookup):
+        """test case 13: a failed aggregation falls back to separate queries, which are kept if $lookup is unsupported"""
+        task_controller.lookup = True
+        task_controller.dao.aggregate.side_effect = error
+        task_controller.dao.findOne.return_value = {'_id': {'$oid': '3' * 24}, 'todos': [{'$oid': '1' * 24}]}
+        task_controller.todos_dao.find.return_value = [{'_id': {'$oid': '1' * 24}}]
+
+        task = task_controller.get('3' * 24)
+
+        assert task['todos'] == [{'_id': {'$oid': '1' * 24}}]
+        assert task_controller.lookup == lookup
+
+    @pytest.mark.unit
+    def test_get_through_cache(self, task_controller):
+        """test case 14: with a read cache, a task is obtained through it instead of the aggregation"""
+        task_controller.lookup = True
+        task_controller.dao.cache = Mock()
+        task_controller.dao.findOne.return_value = {'_id': {'$oid': '3' * 24}, 'todos': [{'$oid': '1' * 24}]}
+        task_controller.todos_dao.find.return_value = [{'_id': {'$oid': '1' * 24}}]
+
+        task = task_controller.get('3' * 24)
+
+        assert task['todos'] == [{'_id': {'$oid': '1' * 24}}]
+        task_controller.dao.findOne.assert_called_once_with('3' * 24, projection=None)
+        task_controller.dao.aggregate.assert_not_called()
+        assert task_controller.lookup
+
+    @pytest.mark.unit
+    def test_get_without_lookup_by_default(self, task_controller):
+        """test case 15: unless enabled, a task is obtained with separate queries instead of the aggregation"""
+        task_controller.dao.findOne.return_value = {'_id': {'$oid': '3' * 24}, 'todos': []}
+
+        task_controller.get('3' * 24)
+
+        task_controller.dao.findOne.assert_called_once()
+        task_controller.dao.aggregate.assert_not_called()
@@ -0,0 +1,6 @@
+# coding=utf-8
+# WSGI entry point of the server for production, run with the pre-fork server gunicorn and its configuration in gunicorn.conf.py:
+#   gunicorn -c gunicorn.conf.py wsgi:app
+from main import create_app
+
+app = create_app()
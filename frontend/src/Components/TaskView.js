@@ -26,7 +26,8 @@ function TaskView(props) {
   const updateTasks = () => {
     fetch(`http://localhost:${process.env.REACT_APP_BACKEND_PORT}/tasks/ofuser/${props.user._id}`, {
       method: 'get',
-      headers: { 'Cache-Control': 'no-cache' }
+      // revalidate the cached tasks with the server (answered with 304 Not Modified if they are unchanged)
+      cache: 'no-cache'
     })
       .then(res => res.json())
       .then(tasklist => {